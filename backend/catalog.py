@@ -0,0 +1,468 @@
+import contextlib
+import gc
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import logging
+from collections import Counter
+from collections.abc import Mapping
+
+from backend.chain import ChainGraph
+from backend.columnar import ColumnarPlayers, PlayerView
+from backend.lookup import PlayerIndex, name_keys
+
+logger = logging.getLogger(__name__)
+
+# Minimal set of players so the game can at least run without a data file
+FALLBACK_PLAYERS = (
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Patrick", "lastName": "Mahomes", "position": "QB", "team": "KC", "college": "Texas Tech"},
+    {"firstName": "Aaron", "lastName": "Donald", "position": "DT", "team": "LAR", "college": "Pittsburgh"}
+)
+
+
+# Fields that identify a player record; they make up the catalog version hash
+PLAYER_FIELDS = ("firstName", "lastName", "position", "team", "college")
+NAME_FIELDS = ("firstName", "lastName")
+# Fields holding short codes, stored upper-case
+CODE_FIELDS = ("position", "team")
+
+# Quote marks and stray symbols trimmed from the ends of names, e.g. "'Omar"
+NAME_ARTIFACTS = "'\"`\u2018\u2019\u201c\u201d*,;:_"
+# A name needs at least one letter or digit
+NAME_CHARACTER = re.compile(r'[^\W_]')
+# Values the source data uses for "unknown"
+PLACEHOLDERS = frozenset(("none", "null", "nan", "n/a", "na", "unknown", "-"))
+
+# Share of rejected records above which a catalog counts as degraded
+MAX_REJECTED_FRACTION = float(os.environ.get('CATALOG_MAX_REJECTED', 0.01))
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_SEPARATOR = re.compile(r'[ \t\n\r]*,[ \t\n\r]*')
+# Names and values that cleaning would leave as they are: single spaces between
+# words, and for names a letter or digit first and no artifact last
+_CLEAN_VALUE = re.compile(r'(?:\S+(?: \S+)*)?')
+_CLEAN_NAME = re.compile(r'(?:[^\W_](?:(?: ?\S)*[^\s' + re.escape(NAME_ARTIFACTS) + r'])?)?')
+
+
+class CatalogMismatchError(ValueError):
+    """Raised when a game snapshot was taken against a different catalog."""
+
+
+def resolve_data_path(data_path=None):
+    """Return the absolute path of the player data file."""
+    script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    default_path = os.path.join(script_dir, 'data', 'players.json')
+
+    # Get data path from environment variable, fallback to default path
+    if data_path is None:
+        data_path = os.environ.get('PLAYER_DATA_PATH', default_path)
+
+    # Handle both absolute and relative paths
+    if not os.path.isabs(data_path):
+        data_path = os.path.join(script_dir, data_path)
+    return data_path
+
+
+def columnar_path_for(data_path):
+    """Return the path of the columnar catalog that sits next to a JSON file."""
+    return os.path.splitext(data_path)[0] + '.bin'
+
+
+def validate_player(record, known_clean=None):
+    """Check one raw player record; return (player, None), or (None, reason) if it is rejected.
+
+    Names are trimmed of whitespace and scraping artifacts such as the
+    leading apostrophe in "'Omar", and placeholder values like "None" are
+    emptied. A record is rejected unless both names are left. A record that needs no changes is returned as it is.
+
+    known_clean, from new_clean_sets() and kept across the records of one
+    load, remembers values already found clean. Most names, teams and
+    colleges repeat, so most records are checked with a few set lookups.
+    """
+    if type(record) is dict and known_clean is not None:
+        names, codes, values = known_clean
+        get = record.get
+        try:
+            if (get('firstName') in names and get('lastName') in names and get('position') in codes
+                    and get('team') in codes and get('college') in values
+                    and record['firstName'] and record['lastName']):
+                return record, None
+        except TypeError:
+            pass  # An unhashable value, rejected below
+    elif not isinstance(record, Mapping):
+        return None, "not_an_object"
+    player = {}
+    changed = False
+    for field, clean, kind in _CLEANERS:
+        value = record.get(field)
+        if value is None:
+            if field in NAME_FIELDS:
+                return None, "missing_name"
+            if field not in record:
+                continue
+            value, changed = '', True
+        elif not isinstance(value, str):
+            return None, "bad_value"
+        cleaned = clean(value)
+        if cleaned == value:
+            if known_clean is not None:
+                known_clean[kind].add(value)
+            cleaned = value
+        else:
+            changed = True
+        player[field] = cleaned
+    # Answers need both names, and the game reads the first letter of each
+    if not player['firstName'] or not player['lastName']:
+        return None, "missing_name"
+    if not changed:
+        return record, None
+    for field, value in record.items():
+        player.setdefault(field, value)
+    return player, None
+
+
+def new_clean_sets():
+    """Return empty known-clean sets (names, codes, other values) for validate_player."""
+    return set(), set(), set()
+
+
+# The patterns below let already clean values skip building new strings
+def _clean_name(value):
+    if _CLEAN_NAME.fullmatch(value):
+        return value
+    value = ' '.join(value.split())
+    if not NAME_CHARACTER.search(value):
+        return ''
+    return value.strip(NAME_ARTIFACTS).strip()
+
+
+def _clean_value(value):
+    if _CLEAN_VALUE.fullmatch(value) and value.lower() not in PLACEHOLDERS:
+        return value
+    value = ' '.join(value.split())
+    return '' if value.lower() in PLACEHOLDERS else value
+
+
+def _clean_code(value):
+    value = _clean_value(value)
+    upper = value.upper()
+    return value if upper == value else upper
+
+
+# Field, cleaner, and which of the known-clean sets its clean values go to
+_CLEANERS = (("firstName", _clean_name, 0), ("lastName", _clean_name, 0), ("position", _clean_code, 1),
+             ("team", _clean_code, 1), ("college", _clean_value, 2))
+
+
+def iter_json_array(file, chunk_size=1 << 16):
+    """Yield the elements of the JSON array in a text file, decoding one element at a time.
+
+    Raises ValueError if the file isn't a well-formed array; the elements
+    before the error have already been yielded by then.
+    """
+    decode = json.JSONDecoder().raw_decode
+    buffer, pos, eof = '', 0, False
+    expect = '['  # what may come next: "[", a value (after ","), or "," / "]" (after a value)
+    while True:
+        # Keep a chunk of lookahead so most elements decode without a refill
+        if not eof and len(buffer) - pos < chunk_size:
+            chunk = file.read(chunk_size)
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Player data ends before the array is closed")
+            continue
+        char = buffer[pos]
+        if expect == '[':
+            if char != '[':
+                raise ValueError("Player data is not a JSON array")
+            pos, expect = pos + 1, '[value'
+            continue
+        if expect != 'value':
+            if char == ']':
+                return
+            if expect == ',':
+                if char != ',':
+                    raise ValueError(f"Expected ',' or ']' in player data, found {char!r}")
+                pos, expect = pos + 1, 'value'
+                continue
+        try:
+            value, end = decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            end = len(buffer)
+        if end == len(buffer) and not eof:
+            # The element may go on past the buffer; read more and decode it again
+            chunk = file.read(max(chunk_size, len(buffer)))
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+        yield value
+        # Skip straight to the next element in the common '}, {' case
+        match = _SEPARATOR.match(buffer, end)
+        if match is not None and match.end() < len(buffer):
+            pos, expect = match.end(), 'value'
+        else:
+            pos, expect = end, ','
+
+
+def _iter_json_file(file):
+    with file:
+        yield from iter_json_array(file)
+
+
+def open_players(data_path=None):
+    """Open the player data for reading, preferring the memory-mapped columnar catalog.
+
+    A ".bin" path is memory-mapped directly. For a JSON path, a newer
+    players.bin next to it is used instead when one exists, and the JSON file
+    is read if the columnar catalog is missing or can't be opened.
+
+    Returns a tuple of (players, source): a ColumnarPlayers, or an iterator
+    that streams the JSON records, and the path they come from. Raises
+    OSError if no data file can be opened.
+    """
+    data_path = resolve_data_path(data_path)
+    columnar_path = data_path if data_path.endswith('.bin') else columnar_path_for(data_path)
+    if os.path.exists(columnar_path) and (columnar_path == data_path or not os.path.exists(data_path)
+                                          or os.path.getmtime(columnar_path) >= os.path.getmtime(data_path)):
+        try:
+            players = ColumnarPlayers(columnar_path)
+            logger.info("Memory-mapped %d players from %s", len(players), columnar_path)
+            return players, columnar_path
+        except Exception as e:
+            logger.error("Error mapping columnar player data from %s: %s", columnar_path, e)
+
+    logger.info("Streaming player data from %s", data_path)
+    return _iter_json_file(open(data_path, 'r', encoding='utf-8')), data_path
+
+
+def load_players(data_path=None):
+    """Load NFL player data as a list (or memory-mapped ColumnarPlayers).
+
+    Returns a tuple of (players, source) where source is the path the players
+    were read from, or None when the fallback list had to be used. Records
+    are returned as stored; PlayerCatalog is what validates them.
+    """
+    try:
+        players, source = open_players(data_path)
+        if not isinstance(players, ColumnarPlayers):
+            players = list(players)
+        return players, source
+    except Exception as e:
+        logger.error("Error loading player data: %s", e)
+        return [dict(p) for p in FALLBACK_PLAYERS], None
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """Hold off garbage collection while a catalog is built.
+
+    Building allocates several objects per player, all of which stay alive;
+    letting the collector rescan them over and over costs a third of the load.
+    """
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if collecting:
+            gc.enable()
+
+
+class PlayerCatalog:
+    """Immutable collection of NFL players shared by every game in a process.
+
+    Games only keep references into the catalog, so the player database is
+    parsed once per worker instead of once per game.
+    """
+
+    def __init__(self, players, source=None):
+        self.rejected = Counter()   # reason -> records left out of the catalog
+        self.normalized = 0         # records whose values were cleaned up
+        self.error = None           # why reading the data stopped early, if it did
+        with _gc_paused():
+            self._build(players, source)
+        self.source = source
+        self.fallback = False       # True when the built-in players stand in for missing data
+        self.loaded_at = time.time()
+        self.load_seconds = None  # Time from_file took to read the data and build the catalog
+        self.source_mtime = self._stat_mtime(source)
+        if self.rejected:
+            logger.warning("Rejected %d player records from %s: %s", sum(self.rejected.values()), source,
+                           dict(self.rejected))
+
+    def _build(self, players, source):
+        """Validate every record and build the lookups, chain graph and version hash in one pass."""
+        columnar = players if isinstance(players, ColumnarPlayers) else None
+        accepted = []
+        self.index = index = PlayerIndex()
+        self._chain = graph = ChainGraph()
+        known_clean = new_clean_sets()
+        rows = []  # one "\x1f"-joined line per player, hashed into the version
+        try:
+            for record in (columnar.records() if columnar is not None else players):
+                player, reason = validate_player(record, known_clean)
+                if player is None:
+                    self.rejected[reason] += 1
+                    continue
+                if player is not record:
+                    self.normalized += 1
+                player_id = len(accepted)
+                accepted.append(player)
+                graph.add(player_id, player, index.add(player_id, player))
+                rows.append('\x1f'.join([player.get(field) or '' for field in PLAYER_FIELDS]))
+        except (OSError, ValueError) as e:
+            # Keep what was read; the catalog reports itself degraded
+            self.error = str(e)
+            logger.error("Error reading player data from %s: %s", source, e)
+        index.finish()
+        graph.finish()
+
+        if columnar is not None and not self.rejected and not self.normalized and self.error is None:
+            # Clean columnar data stays memory-mapped; records are views created on access
+            self.players = columnar
+            self._id_by_object = {}
+        else:
+            if columnar is not None:
+                logger.warning("Columnar catalog %s needed cleaning; rebuild it with backend.pipeline", source)
+            self.players = tuple(accepted)
+            self._id_by_object = {id(player): player_id for player_id, player in enumerate(self.players)}
+        index.players = self.players
+        rows.append('')
+        self.version = hashlib.sha1('\x1e'.join(rows).encode('utf-8')).hexdigest()[:16]
+
+    @property
+    def chain(self):
+        """The catalog's ChainGraph, built along with the lookups."""
+        return self._chain
+
+    @property
+    def degraded(self):
+        """True when the catalog is missing data: fallback players, a read error or too many rejects."""
+        rejected = sum(self.rejected.values())
+        return (self.fallback or self.error is not None or not self.players
+                or rejected > MAX_REJECTED_FRACTION * (rejected + len(self.players)))
+
+    def health(self):
+        """Return the load report /health shows for the catalog."""
+        return {
+            "players": len(self.players),
+            "source": self.source,
+            "version": self.version,
+            "degraded": self.degraded,
+            "fallback": self.fallback,
+            "error": self.error,
+            "rejected": dict(self.rejected),
+            "normalized": self.normalized,
+            "load_seconds": self.load_seconds,
+        }
+
+    @staticmethod
+    def _stat_mtime(path):
+        if not path:
+            return None
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    @classmethod
+    def from_file(cls, data_path=None):
+        """Load a catalog from the player data file, or the fallback players if it can't be opened."""
+        started = time.perf_counter()
+        try:
+            players, source = open_players(data_path)
+        except OSError as e:
+            logger.error("Error loading player data: %s; using the fallback players", e)
+            catalog = cls([dict(p) for p in FALLBACK_PLAYERS])
+            catalog.fallback = True
+            catalog.error = str(e)
+        else:
+            catalog = cls(players, source=source)
+            if not catalog.players:
+                logger.error("No valid players in %s; using the fallback players", source)
+                error = catalog.error or "no valid player records"
+                rejected = catalog.rejected
+                catalog = cls([dict(p) for p in FALLBACK_PLAYERS], source=source)
+                catalog.fallback = True
+                catalog.error = error
+                catalog.rejected = rejected
+        catalog.load_seconds = time.perf_counter() - started
+        logger.info("Loaded %d players in %.3fs (%d rejected, %d cleaned up)", len(catalog),
+                    catalog.load_seconds, sum(catalog.rejected.values()), catalog.normalized)
+        return catalog
+
+    def __len__(self):
+        return len(self.players)
+
+    def __iter__(self):
+        return iter(self.players)
+
+    def __getitem__(self, index):
+        return self.players[index]
+
+    def id_of(self, player):
+        """Return the catalog ID of a player record, or None if it isn't in the catalog.
+
+        Records taken from the catalog resolve by identity; equal copies
+        (e.g. from an old session dict) fall back to a name + team lookup.
+        """
+        if isinstance(player, PlayerView) and player.players is self.players:
+            return player.player_id
+        player_id = self._id_by_object.get(id(player))
+        if player_id is not None:
+            return player_id
+        full = ' '.join(name_keys(player['firstName'], player['lastName']))
+        team = (player.get('team') or '').upper()
+        for candidate in self.index.by_name_team.get((full, team), ()):
+            if (self.players[candidate].get('position') or '') == (player.get('position') or ''):
+                return candidate
+        return None
+
+    def is_stale(self):
+        """Return True if the data file changed since the catalog was loaded."""
+        if not self.source:
+            return False
+        return self._stat_mtime(self.source) != self.source_mtime
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Return the process-wide player catalog, loading it on first use."""
+    global _catalog
+    catalog = _catalog
+    if catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = PlayerCatalog.from_file()
+                logger.info(f"Loaded {len(_catalog)} NFL players into the shared catalog")
+            catalog = _catalog
+    return catalog
+
+
+def set_catalog(catalog):
+    """Install a catalog as the process-wide catalog and return it."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = catalog
+    return catalog
+
+
+def reload_catalog(data_path=None):
+    """Re-read the player data file and swap in the new catalog.
+
+    Games that are already running keep the catalog they were created with;
+    only games started after the reload see the new data.
+    """
+    catalog = PlayerCatalog.from_file(data_path)
+    logger.info(f"Reloaded {len(catalog)} NFL players into the shared catalog")
+    return set_catalog(catalog)
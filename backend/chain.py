@@ -0,0 +1,127 @@
+"""The game as a graph over letters.
+
+Naming a player is a move along the edge from the initial of their first name
+to the initial of their last name, which becomes the next required letter.
+ChainGraph holds the edges of a catalog and is built once per catalog;
+ChainUsage tracks what a single game has used up, so questions like "how many
+moves remain from letter X" are answered from counts instead of rescans.
+"""
+import random
+from collections import Counter
+
+from backend.lookup import name_initial
+
+
+def initials(player):
+    """Return the (first name, last name) initials of a player, see name_initial()."""
+    return name_initial(player['firstName']), name_initial(player['lastName'])
+
+
+def pick_unused(candidates, identity_keys, used_keys, attempts=8):
+    """Return a random ID from candidates whose identity key isn't in used_keys,
+    or None if every candidate has been used."""
+    if not candidates:
+        return None
+    # Random probes are uniform over the unused players and almost always
+    # succeed; only a nearly exhausted bucket needs the scan below
+    for _ in range(attempts):
+        player_id = random.choice(candidates)
+        key = identity_keys[player_id]
+        if key is None or key not in used_keys:
+            return player_id
+
+    # Walk the bucket from a random offset
+    start = random.randrange(len(candidates))
+    for offset in range(len(candidates)):
+        player_id = candidates[(start + offset) % len(candidates)]
+        key = identity_keys[player_id]
+        if key is None or key not in used_keys:
+            return player_id
+    return None
+
+
+class ChainGraph:
+    """Letter-to-letter transitions of every player in a catalog."""
+
+    def __init__(self, index=None):
+        self.edges = {}         # ("F", "L") -> ids of players moving from F to L
+        self.capacity = {}      # "F" -> players whose first name starts with F
+        self.successors = {}    # "F" -> {"L": players}, the edges leaving F
+        self.edge_of = []       # id -> ("F", "L")
+        self.ids_by_key = {}    # identity key -> ids, all taken up when the key is used
+        self.targets = set()
+
+        if index is not None:
+            for player_id, player in enumerate(index.players):
+                self.add(player_id, player, index.identity_keys[player_id])
+            self.finish()
+
+    def add(self, player_id, player, key):
+        """Add one player with its identity key; IDs must be added in ascending order."""
+        edge = initials(player)
+        self.edge_of.append(edge)
+        self.edges.setdefault(edge, []).append(player_id)
+        if key is not None:
+            self.ids_by_key.setdefault(key, []).append(player_id)
+
+    def finish(self):
+        """Count the capacity and successors of every letter once all players are added."""
+        for (first, last), ids in self.edges.items():
+            self.capacity[first] = self.capacity.get(first, 0) + len(ids)
+            self.successors.setdefault(first, {})[last] = len(ids)
+        self.targets = {last for _, last in self.edges}
+
+    def transitions(self, letter):
+        """Return {next letter: players} for the moves out of letter."""
+        return self.successors.get(letter, {})
+
+
+class ChainUsage:
+    """What one game has used of a ChainGraph, updated as players are used."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.used_by_letter = Counter()  # "F" -> used players whose first name starts with F
+        self.used_by_edge = Counter()    # ("F", "L") -> used players on the edge
+
+    def mark_used(self, key):
+        """Take every player with a newly used identity key out of the counts."""
+        for player_id in self.graph.ids_by_key.get(key, ()):
+            edge = self.graph.edge_of[player_id]
+            self.used_by_letter[edge[0]] += 1
+            self.used_by_edge[edge] += 1
+
+    def moves_remaining(self, letter):
+        """Return how many unused players can be named for a required letter."""
+        return self.graph.capacity.get(letter, 0) - self.used_by_letter[letter]
+
+    def edge_remaining(self, letter, next_letter):
+        """Return how many unused players move from letter to next_letter."""
+        return len(self.graph.edges.get((letter, next_letter), ())) - self.used_by_edge[(letter, next_letter)]
+
+    def is_dead_end(self, letter):
+        return self.moves_remaining(letter) <= 0
+
+    def next_letters(self, letter):
+        """Return {next letter: unused players} for the moves still open from letter."""
+        remaining = {}
+        for next_letter, count in self.graph.transitions(letter).items():
+            count -= self.used_by_edge[(letter, next_letter)]
+            if count > 0:
+                remaining[next_letter] = count
+        return remaining
+
+    def reachable(self, letter):
+        """Return the letters a chain from letter can still reach, letter included."""
+        seen = {letter}
+        frontier = [letter]
+        while frontier:
+            for next_letter in self.next_letters(frontier.pop()):
+                if next_letter not in seen:
+                    seen.add(next_letter)
+                    frontier.append(next_letter)
+        return seen
+
+    def dead_ends(self):
+        """Return the letters a move can lead to that have no unused players left."""
+        return sorted(letter for letter in self.graph.targets if self.is_dead_end(letter))
@@ -0,0 +1,199 @@
+"""Binary, columnar player catalog.
+
+Layout (little-endian, every section 4-byte aligned):
+
+    header      MAGIC, then u32 player count
+    names       for firstName and lastName: u32 blob length,
+                u32 offsets[count + 1], UTF-8 blob
+    tables      for team, position and college: u32 string count,
+                u32 blob length, u32 offsets[strings + 1], UTF-8 blob,
+                then u16 codes[count] (MISSING when the record has no value)
+
+The file is memory-mapped read-only, so forked workers share its pages.
+Records are only materialized as PlayerView objects when they are accessed.
+"""
+from collections.abc import Mapping, Sequence
+import mmap
+import struct
+import sys
+
+MAGIC = b"NFLCOL01"
+
+NAME_FIELDS = ("firstName", "lastName")
+TABLE_FIELDS = ("position", "team", "college")
+FIELDS = NAME_FIELDS + TABLE_FIELDS
+
+# Code stored for a record that doesn't have the field at all
+MISSING = 0xFFFF
+
+_U32 = struct.Struct("<I")
+
+
+def _align(buffer):
+    buffer.extend(b"\0" * (-len(buffer) % 4))
+
+
+def _write_strings(buffer, strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    buffer += _U32.pack(offsets[-1])
+    buffer += struct.pack(f"<{len(offsets)}I", *offsets)
+    buffer += b"".join(encoded)
+    _align(buffer)
+
+
+def write_columnar(players, path):
+    """Write a list of player dicts to a columnar catalog file."""
+    buffer = bytearray(MAGIC)
+    buffer += _U32.pack(len(players))
+
+    for field in NAME_FIELDS:
+        _write_strings(buffer, [player.get(field) or '' for player in players])
+
+    for field in TABLE_FIELDS:
+        # Intern every distinct value of the column into a small string table
+        table = {}
+        codes = []
+        for player in players:
+            if field not in player:
+                codes.append(MISSING)
+                continue
+            value = player[field] or ''
+            codes.append(table.setdefault(value, len(table)))
+        if len(table) >= MISSING:
+            raise ValueError(f"Too many distinct values for {field}: {len(table)}")
+        buffer += _U32.pack(len(table))
+        _write_strings(buffer, list(table))
+        buffer += struct.pack(f"<{len(codes)}H", *codes)
+        _align(buffer)
+
+    with open(path, "wb") as file:
+        file.write(buffer)
+
+
+class PlayerView(Mapping):
+    """Read-only, dict-like view of one player record in a columnar catalog."""
+
+    __slots__ = ("players", "player_id")
+
+    def __init__(self, players, player_id):
+        self.players = players
+        self.player_id = player_id
+
+    def __getitem__(self, key):
+        return self.players.field(self.player_id, key)
+
+    def __iter__(self):
+        return (field for field in FIELDS if self.players.has_field(self.player_id, field))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"PlayerView({dict(self)!r})"
+
+
+class ColumnarPlayers(Sequence):
+    """Sequence of PlayerView objects backed by a memory-mapped catalog file."""
+
+    def __init__(self, path):
+        if sys.byteorder != "little":
+            raise ValueError("Columnar catalogs can only be memory-mapped on little-endian hosts")
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a columnar player catalog")
+        pos = len(MAGIC)
+        (self._count,) = _U32.unpack_from(view, pos)
+        pos += 4
+
+        # Name columns stay in the mapping and are decoded on access
+        self._names = {}
+        for field in NAME_FIELDS:
+            offsets, blob, pos = self._read_strings(view, pos, self._count)
+            self._names[field] = (offsets, blob)
+
+        # The string tables are tiny, so they are decoded once and shared
+        self._tables = {}
+        for field in TABLE_FIELDS:
+            (size,) = _U32.unpack_from(view, pos)
+            offsets, blob, pos = self._read_strings(view, pos + 4, size)
+            strings = tuple(str(blob[offsets[i]:offsets[i + 1]], "utf-8") for i in range(size))
+            codes = view[pos:pos + 2 * self._count].cast("H")
+            pos += 2 * self._count
+            pos += -pos % 4
+            self._tables[field] = (strings, codes)
+
+    @staticmethod
+    def _read_strings(view, pos, count):
+        (blob_len,) = _U32.unpack_from(view, pos)
+        pos += 4
+        offsets = view[pos:pos + 4 * (count + 1)].cast("I")
+        pos += 4 * (count + 1)
+        blob = view[pos:pos + blob_len]
+        pos += blob_len
+        pos += -pos % 4
+        return offsets, blob, pos
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [PlayerView(self, i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("player index out of range")
+        return PlayerView(self, index)
+
+    def _decode_names(self, field):
+        offsets, blob = self._names[field]
+        offsets = offsets.tolist()
+        data = bytes(blob)
+        text = data.decode("utf-8")
+        if len(text) == len(data):
+            # All ASCII: byte offsets are character offsets, so slice the decoded text
+            return [text[offsets[i]:offsets[i + 1]] for i in range(self._count)]
+        return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self._count)]
+
+    def records(self):
+        """Yield every record as a plain dict, decoding each column in bulk.
+
+        Much faster than reading every field through PlayerView when the whole
+        catalog is scanned, as the catalog loader does.
+        """
+        names = [(field, self._decode_names(field)) for field in NAME_FIELDS]
+        tables = [(field, strings, codes.tolist()) for field, (strings, codes) in self._tables.items()]
+        for player_id in range(self._count):
+            record = {field: values[player_id] for field, values in names}
+            for field, strings, codes in tables:
+                code = codes[player_id]
+                if code != MISSING:
+                    record[field] = strings[code]
+            yield record
+
+    def has_field(self, player_id, field):
+        if field in self._names:
+            return True
+        if field in self._tables:
+            return self._tables[field][1][player_id] != MISSING
+        return False
+
+    def field(self, player_id, field):
+        """Decode one field of one record."""
+        names = self._names.get(field)
+        if names is not None:
+            offsets, blob = names
+            return str(blob[offsets[player_id]:offsets[player_id + 1]], "utf-8")
+        table = self._tables.get(field)
+        if table is not None:
+            strings, codes = table
+            code = codes[player_id]
+            if code != MISSING:
+                return strings[code]
+        raise KeyError(field)
@@ -0,0 +1,175 @@
+"""Per-game event channels that push game updates to connected clients.
+
+Routes publish the result dicts NFLGame already returns; result_events turns
+them into named events (answer, computer_move, life_lost, game_over) that the
+/events endpoint streams as Server-Sent Events. Each channel keeps a short
+history so a reconnecting client can resume from its Last-Event-ID.
+
+The bus is per worker process. When workers share a game store, the store
+provides a relay (see GameStore.event_relay) that carries every published
+event to the bus of every worker, under an ID the store assigns, so a stream
+hears about an answer whichever worker handled it, and a browser can resume
+from its Last-Event-ID on any worker. The stream also sends a periodic tick
+with the game's turn status, so a client that missed events can tell and
+fetch the full state.
+"""
+import itertools
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+
+# Seconds between ticks on an idle stream
+HEARTBEAT_SECONDS = 5
+
+# Result keys left out of answer events: the computer's move is its own event,
+# and listeners fetch the history against their own history_version
+ANSWER_OMITTED_KEYS = ("computer_turn", "used_players_details", "used_players_added")
+
+
+def result_events(result):
+    """Return the (event, data) pairs a submit_answer or timer result produces."""
+    if not isinstance(result, dict) or "valid" not in result:
+        return []
+    events = []
+    computer = result.get("computer_turn")
+    if result["valid"]:
+        events.append(("answer", {key: value for key, value in result.items() if key not in ANSWER_OMITTED_KEYS}))
+        if computer:
+            events.append(("computer_move", computer))
+            if not computer.get("success"):
+                events.append(("life_lost", computer))
+    elif result.get("error_type") == "timeout":
+        events.append(("life_lost", result))
+    if result.get("game_over") or (computer and computer.get("game_over")):
+        events.append(("game_over", {"lives": computer["lives"] if computer else result["lives"]}))
+    return events
+
+
+def format_event(event, data, event_id=None):
+    """Encode one event in the text/event-stream format."""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class _Channel:
+    __slots__ = ("events", "dropped_through", "listeners")
+
+    def __init__(self, history):
+        self.events = deque(maxlen=history)
+        # Highest event ID pushed out of the history
+        self.dropped_through = 0
+        self.listeners = set()
+
+
+class GameEventBus:
+    """In-process publish/subscribe of game events, keyed by session ID.
+
+    A relay, if given, has publish(session_id, events), which hands (event,
+    data) pairs to the shared store and returns the last one's ID, and
+    start(deliver), which starts passing
+    every worker's events to deliver(session_id, event_id, event, data) and
+    returns the ID of the last event published before it started.
+    """
+
+    def __init__(self, history=32, max_channels=10000, relay=None):
+        self.history = history
+        self.max_channels = max_channels
+        self.relay = relay
+        self._channels = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # Events up to this ID were published before this bus was listening
+        self._floor = 0
+        self._relay_pid = None
+
+    def _channel(self, session_id):
+        channel = self._channels.get(session_id)
+        if channel is None:
+            channel = self._channels[session_id] = _Channel(self.history)
+            self._evict()
+        else:
+            self._channels.move_to_end(session_id)
+        return channel
+
+    def _evict(self):
+        # Forget the least recently used channels nobody is listening to
+        for session_id in list(self._channels):
+            if len(self._channels) <= self.max_channels:
+                return
+            if not self._channels[session_id].listeners:
+                del self._channels[session_id]
+
+    def _start_relay(self):
+        # A forked worker inherits the bus but not the relay's thread, so start one per process
+        if self.relay is None or self._relay_pid == os.getpid():
+            return
+        with self._lock:
+            if self._relay_pid == os.getpid():
+                return
+            self._relay_pid = os.getpid()
+            self._floor = self.relay.start(self.deliver)
+
+    def publish(self, session_id, event, data):
+        """Publish one event to the session's listeners in every worker.
+        Returns the event's ID."""
+        return self.publish_events(session_id, [(event, data)])
+
+    def publish_result(self, session_id, result):
+        self.publish_events(session_id, result_events(result))
+
+    def publish_events(self, session_id, events):
+        """Publish (event, data) pairs, through the relay if there is one.
+        Returns the last event's ID, or None if there were none."""
+        if not events:
+            return None
+        if self.relay is not None:
+            self._start_relay()
+            return self.relay.publish(session_id, events)
+        for event, data in events:
+            event_id = next(self._ids)
+            self.deliver(session_id, event_id, event, data)
+        return event_id
+
+    def deliver(self, session_id, event_id, event, data):
+        """Append an event to the session's channel and wake its listeners."""
+        with self._lock:
+            channel = self._channel(session_id)
+            if len(channel.events) == channel.events.maxlen:
+                channel.dropped_through = channel.events[0][0]
+            channel.events.append((event_id, event, data))
+            listeners = list(channel.listeners)
+        for notify in listeners:
+            notify()
+
+    def since(self, session_id, last_id):
+        """Return (events, complete) for the events after last_id.
+
+        complete is False when some of those events have already left the
+        history, in which case the client should fetch the full state.
+        """
+        with self._lock:
+            channel = self._channels.get(session_id)
+            # Events from before the bus started listening may be missing too
+            dropped_through = max(channel.dropped_through if channel else 0, self._floor)
+            events = [entry for entry in channel.events if entry[0] > last_id] if channel else []
+            return events, last_id >= dropped_through
+
+    def last_id(self, session_id):
+        with self._lock:
+            channel = self._channels.get(session_id)
+            return channel.events[-1][0] if channel and channel.events else self._floor
+
+    def subscribe(self, session_id, notify):
+        """Call notify() (from any thread) whenever the session gets an event."""
+        self._start_relay()
+        with self._lock:
+            self._channel(session_id).listeners.add(notify)
+
+    def unsubscribe(self, session_id, notify):
+        with self._lock:
+            channel = self._channels.get(session_id)
+            if channel is not None:
+                channel.listeners.discard(notify)
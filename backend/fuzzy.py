@@ -0,0 +1,71 @@
+"""Typo-tolerant name search used for "did you mean" suggestions.
+
+Names are indexed by their character trigrams. An insertion, deletion or
+substitution touches at most 3 of the query's trigrams and a swap of
+neighbouring letters at most 4, so a name within edit distance k shares all
+but at most 4k of the query's trigrams. Counting shared trigrams narrows the
+names to a few candidates, and only those get the exact (bounded) edit
+distance check.
+"""
+from collections import Counter
+
+# Most candidates from the trigram count that get the edit distance check
+MAX_CANDIDATES = 64
+
+
+def trigrams(text):
+    """Return the set of trigrams of text, padded so short names still have some."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Edit distance between a and b counting a swap of neighbouring letters as one edit
+    (optimal string alignment), or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(previous[j] + 1,
+                       current[j - 1] + 1,
+                       previous[j - 1] + (char_a != char_b))
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit and (i == len(a) or min(previous) > limit):
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class TrigramIndex:
+    """Search a fixed list of names for the ones closest to a query."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.postings = {}  # trigram -> indexes into names
+        for position, name in enumerate(self.names):
+            for gram in trigrams(name):
+                self.postings.setdefault(gram, []).append(position)
+
+    def search(self, query, max_distance, limit):
+        """Return up to limit (distance, name) pairs within max_distance, closest first."""
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        min_shared = max(1, len(grams) - 4 * max_distance)
+
+        matches = []
+        for position, count in shared.most_common(MAX_CANDIDATES):
+            if count < min_shared:
+                break
+            name = self.names[position]
+            distance = edit_distance(query, name, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, -count, name))
+        matches.sort()
+        return [(distance, name) for distance, _, name in matches[:limit]]
@@ -1,143 +1,151 @@
-import json
 import random
 import os
+import secrets
+import time
 import logging
 
+from backend.catalog import CatalogMismatchError, get_catalog, load_players
+from backend.chain import ChainUsage, pick_unused
+from backend.logs import EventLog, configure_logging
+from backend.lookup import identity_key, name_initial, name_keys, parse_name
+from backend.metrics import REGISTRY
+from backend.opponent import DIFFICULTY_DEPTHS, LookaheadSearch
+
 # Configure logging
-logging_level = os.environ.get('LOGGING_LEVEL', 'DEBUG')
-numeric_level = getattr(logging, logging_level.upper(), logging.DEBUG)
-logging.basicConfig(level=numeric_level)
+configure_logging()
 logger = logging.getLogger(__name__)
+log_event = EventLog(logger)
+
+# Format version of the compact snapshot produced by NFLGame.to_dict
+SNAPSHOT_VERSION = 1
+
+# One character per entry of used_players_details in a snapshot
+TURN_CODES = {"starting": "s", "player": "p", "computer": "c"}
+TURN_NAMES = {code: turn for turn, code in TURN_CODES.items()}
+
+LOOKUPS = REGISTRY.counter('nfl_player_lookups_total', 'Typed names looked up, by the strategy that matched',
+                           ('strategy',))
 
 class NFLGame:
-    def __init__(self, game_mode="solo"):
-        self.players = self.load_players()
-        logger.info(f"Loaded {len(self.players)} NFL players")
+    # Random probes computer_turn makes before scanning the candidates for a letter
+    PICK_ATTEMPTS = 8
+    # Seconds a player has to name a player before losing a life
+    TURN_SECONDS = 120
+    # A client reporting a timeout this soon after the server applied it isn't penalized again
+    TIMEOUT_GRACE_SECONDS = 10
+    # Most typos a "did you mean" suggestion may be away from the typed name
+    FUZZY_MAX_DISTANCE = int(os.environ.get('FUZZY_MAX_DISTANCE', 2))
+    DID_YOU_MEAN_LIMIT = 5
+    
+    def __init__(self, game_mode="solo", catalog=None, difficulty="easy"):
+        # The player database is shared by every game in the process
+        self.catalog = catalog if catalog is not None else get_catalog()
+        self.players = self.catalog.players
         self.used_players = []
         self.used_players_details = []  # Store full player details for display
+        self.used_keys = set()  # identity_key() of every used player
+        self.chain = ChainUsage(self.catalog.chain)  # Unused players left per letter and edge
         self.lives = 3
         self.current_player = None
         self.next_required_letter = None
         self.game_over = False
         self.game_mode = game_mode  # "solo" or "vs_computer"
+        self.difficulty = difficulty  # How far ahead the computer looks, see DIFFICULTY_DEPTHS
         self.turn = "player"  # Whose turn it is: "player" or "computer"
+        self.turn_deadline = None  # Wall-clock time the current turn times out
+        self.last_timeout_at = None  # Deadline of the last timeout applied by the server
+        self.game_id = secrets.token_hex(4)  # Tells history versions of different games apart
+        self.state_version = 0  # Bumped by every change a client can see, see state_etag()
     
-    def load_players(self):
+    @staticmethod
+    def load_players():
         """Load NFL player data from the JSON file."""
-        script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        default_path = os.path.join(script_dir, 'data', 'players.json')
-        
-        # Get data path from environment variable, fallback to default path
-        data_path = os.environ.get('PLAYER_DATA_PATH', default_path)
-        
-        try:
-            # Handle both absolute and relative paths
-            if not os.path.isabs(data_path):
-                data_path = os.path.join(script_dir, data_path)
-                
-            logger.info(f"Attempting to load player data from: {data_path}")
-            with open(data_path, 'r') as file:
-                players = json.load(file)
-                logger.info(f"Successfully loaded {len(players)} players from {data_path}")
-                return players
-        except Exception as e:
-            logger.error(f"Error loading player data from {data_path}: {e}")
-            # Return a minimal set of players so the game can at least run
-            return [
-                {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
-                {"firstName": "Patrick", "lastName": "Mahomes", "position": "QB", "team": "KC", "college": "Texas Tech"},
-                {"firstName": "Aaron", "lastName": "Donald", "position": "DT", "team": "LAR", "college": "Pittsburgh"}
-            ]
+        players, _ = load_players()
+        return players
     
     def start_game(self, game_mode="solo"):
         """Start a new game with a random NFL player."""
         self.game_mode = game_mode
         self.used_players = []
         self.used_players_details = []
+        self.used_keys = set()
+        self.chain = ChainUsage(self.catalog.chain)
         self.lives = 3
         self.game_over = False
         self.turn = "player"
+        self.last_timeout_at = None
+        self.game_id = secrets.token_hex(4)
         
         # Select a random player to start
         self.current_player = random.choice(self.players)
-        self.used_players.append(self.current_player)
-        
-        # Add to detailed player list
-        self.used_players_details.append({
-            "name": f"{self.current_player['firstName']} {self.current_player['lastName']}",
-            "position": self.current_player['position'],
-            "college": self.current_player.get("college", "Unknown"),
-            "turn": "starting"
-        })
+        self._mark_used(self.current_player, "starting")
         
         # The next player's first name must start with the first letter of the current player's last name
-        self.next_required_letter = self.current_player["lastName"][0].upper()
+        self.next_required_letter = name_initial(self.current_player["lastName"])
+        self._start_turn_timer()
         
         return {
             "current_player": f"{self.current_player['firstName']} {self.current_player['lastName']} ({self.current_player['position']})",
             "next_required_letter": self.next_required_letter,
             "lives": self.lives,
             "used_players": len(self.used_players),
-            "used_players_details": self.used_players_details,
+            **self.history(),
             "game_over": self.game_over,
             "team": self.current_player.get("team", ""),
             "college": self.current_player.get("college", "Unknown"),
             "game_mode": self.game_mode,
-            "turn": self.turn
+            "turn": self.turn,
+            "seconds_remaining": self.seconds_remaining()
         }
     
+    def _identity_key(self, player):
+        """Return a player's identity key, precomputed by the index for catalog records."""
+        player_id = self.catalog.id_of(player)
+        if player_id is None:
+            return identity_key(player)
+        return self.catalog.index.identity_keys[player_id]
+    
     def _is_player_used(self, player):
         """Check if a player has already been used in this game.
         Players with the same name but different teams/positions are considered different players."""
-        for used_player in self.used_players:
-            # If first and last name match, check if team/position also match
-            if (used_player['firstName'].lower() == player['firstName'].lower() and
-                used_player['lastName'].lower() == player['lastName'].lower()):
-                
-                # Get team and position for additional comparison
-                used_team = used_player.get('team', '').lower()
-                player_team = player.get('team', '').lower()
-                used_position = used_player.get('position', '').lower()
-                player_position = player.get('position', '').lower()
-                used_college = used_player.get('college', '').lower()
-                player_college = player.get('college', '').lower()
-                
-                # If we have detailed info and it matches exactly, it's the same player
-                if (used_team and player_team and used_team == player_team and
-                    used_position and player_position and used_position == player_position):
-                    # If college info is available and it matches, definitely the same player
-                    if (used_college and player_college and used_college == player_college):
-                        return True
-                    
-                    # If team and position match (and we have both), likely the same player
-                    return True
-                
-                # If neither team nor position is available, fall back to just name comparison
-                if (not used_team and not player_team and 
-                    not used_position and not player_position):
-                    return True
-                
-                # Different team or position means different player with same name
-                # Continue checking other used players
-                continue
-            
-        # If we get here, no match was found
-        return False
+        key = self._identity_key(player)
+        return key is not None and key in self.used_keys
+    
+    def _mark_used(self, player, turn):
+        """Record a player as used and add it to the detailed player list."""
+        self.state_version += 1
+        self.used_players.append(player)
+        key = self._identity_key(player)
+        if key is not None and key not in self.used_keys:
+            self.used_keys.add(key)
+            self.chain.mark_used(key)
+        
+        self.used_players_details.append({
+            "name": f"{player['firstName']} {player['lastName']}",
+            "position": player['position'],
+            "college": player.get("college", "Unknown"),
+            "turn": turn
+        })
 
-    def submit_answer(self, answer):
-        """Submit a player name as an answer."""
-        logger.debug(f"submit_answer called with: {answer}")
+    def submit_answer(self, answer, since=None):
+        """Submit a player name as an answer.
+        
+        since is the history_version of the client's last response; see history().
+        """
+        # An answer that arrives after the deadline is too late
+        timeout_result = self.expire_turns()
+        if timeout_result:
+            return timeout_result
         
         if self.game_over:
-            logger.debug("Game is already over")
+            log_event("answer", logging.DEBUG, outcome="game_over")
             return {"error": "Game is over. Start a new game."}
         
         # Parse the input to get first and last name
         parts = answer.strip().split()
-        logger.debug(f"Split answer into parts: {parts}")
         
         if len(parts) < 2:
-            logger.debug("Not enough name parts provided")
+            log_event("answer", logging.DEBUG, outcome="format", parts=len(parts))
             return {
                 "valid": False,
                 "message": "Please enter both first and last name.",
@@ -147,11 +155,10 @@ class NFLGame:
             }
         
         first_name = parts[0]
-        logger.debug(f"First name: {first_name}, Required letter: {self.next_required_letter}")
         
-        # Check if the first name starts with the required letter
-        if not first_name.upper().startswith(self.next_required_letter):
-            logger.debug(f"First name does not start with required letter: {self.next_required_letter}")
+        # Check if the first name starts with the required letter, accents aside
+        if name_initial(first_name) != self.next_required_letter:
+            log_event("answer", logging.DEBUG, outcome="wrong_letter", letter=self.next_required_letter)
             return {
                 "valid": False,
                 "message": f"First name must start with '{self.next_required_letter}'.",
@@ -160,23 +167,25 @@ class NFLGame:
                 "error_type": "wrong_letter"
             }
         
-        # Find the player in our database - improved matching algorithm
-        found_player = self._find_player_in_database(parts)
+        # Find the player in our database - improved matching algorithm.
+        # The name is folded once, for the lookup and any suggestions.
+        query = parse_name(parts)
+        found_player = self._find_player_in_database(query)
         
         if not found_player:
-            logger.debug(f"Player not found in database: {answer}")
+            log_event("answer", logging.DEBUG, outcome="not_found", answer=answer)
             return {
                 "valid": False,
                 "message": "Player not found. Either the name is misspelled or the player doesn't exist in our database.",
                 "lives": self.lives,
                 "game_over": self.game_over,
-                "error_type": "not_found"
+                "error_type": "not_found",
+                "did_you_mean": self._did_you_mean(query)
             }
         
         # Check if player has already been used
         if self._is_player_used(found_player):
-            logger.debug(f"Player has already been used: {found_player['firstName']} {found_player['lastName']}")
-            
+            log_event("answer", logging.DEBUG, outcome="already_used", answer=answer)
             return {
                 "valid": False,
                 "message": "This player has already been used.",
@@ -186,18 +195,11 @@ class NFLGame:
             }
         
         # Valid answer
+        log_event("answer", logging.DEBUG, outcome="correct", answer=answer, chain=len(self.used_players))
         self.current_player = found_player
-        self.used_players.append(found_player)
-        
-        # Add to detailed player list
-        self.used_players_details.append({
-            "name": f"{found_player['firstName']} {found_player['lastName']}",
-            "position": found_player['position'],
-            "college": found_player.get("college", "Unknown"),
-            "turn": "player"
-        })
+        self._mark_used(found_player, "player")
         
-        self.next_required_letter = found_player["lastName"][0].upper()
+        self.next_required_letter = name_initial(found_player["lastName"])
         
         # Handle computer's turn if in vs_computer mode
         computer_turn_result = None
@@ -207,6 +209,7 @@ class NFLGame:
             computer_turn_result = self.computer_turn()
             # Set turn back to player for the next round
             self.turn = "player"
+        self._start_turn_timer()
         
         result = {
             "valid": True,
@@ -215,12 +218,13 @@ class NFLGame:
             "next_required_letter": self.next_required_letter,
             "lives": self.lives,
             "used_players": len(self.used_players),
-            "used_players_details": self.used_players_details,
+            **self.history(since),
             "game_over": self.game_over,
             "team": found_player.get("team", ""),
             "college": found_player.get("college", "Unknown"),
             "game_mode": self.game_mode,
-            "turn": self.turn
+            "turn": self.turn,
+            "seconds_remaining": self.seconds_remaining()
         }
         
         # Include computer turn details if applicable
@@ -237,260 +241,340 @@ class NFLGame:
         Supports formats:
         - "First Last"
         - "First Last Team" (for players with same names)
+        - "First Middle Last [Jr.] [Team]" (for names of more than two words)
+        
+        name_parts may also be a NameQuery from parse_name().
         """
-        # Check if a team identifier was provided (usually as a third part)
-        team_identifier = None
-        if len(name_parts) > 2:
-            team_identifier = name_parts[2].upper()  # Team identifiers are typically uppercase
-        
-        # Try exact match first (case insensitive)
-        name_to_match = ' '.join(name_parts[:2]).lower()
-        
-        # Debug the search
-        logger.debug(f"Searching for player: {name_to_match} with team identifier: {team_identifier}")
-        
-        # Strategy 1: Exact match with team if provided
-        if team_identifier:
-            matches = []
-            for player in self.players:
-                player_name = f"{player['firstName']} {player['lastName']}".lower()
-                if (name_to_match == player_name and 
-                    player.get('team', '').upper() == team_identifier):
-                    logger.debug(f"Found exact match with team: {player['firstName']} {player['lastName']} ({player['team']})")
-                    matches.append(player)
-            
-            if matches:
-                return matches[0]  # Return the first match
-        
-        # Strategy 2: Exact match (case insensitive) without team consideration
-        matches = []
-        for player in self.players:
-            player_name = f"{player['firstName']} {player['lastName']}".lower()
-            if name_to_match == player_name:
-                logger.debug(f"Found exact match: {player['firstName']} {player['lastName']}")
-                matches.append(player)
-        
-        # If exactly one match was found, return it
-        if len(matches) == 1:
-            return matches[0]
-        # If multiple matches found and no team specified, return the first one
-        elif len(matches) > 1 and not team_identifier:
-            logger.debug(f"Found multiple matches, returning first: {matches[0]['firstName']} {matches[0]['lastName']}")
-            return matches[0]
-        # If multiple matches found but none match the team, return the first
-        elif len(matches) > 1:
-            logger.debug(f"Found multiple matches but none for team {team_identifier}, returning first")
-            return matches[0]
-        
-        # Strategy 3: Common nickname match
-        nicknames = {
-            'mike': 'michael',
-            'chris': 'christopher',
-            'rob': 'robert',
-            'bob': 'robert',
-            'bobby': 'robert',
-            'will': 'william',
-            'bill': 'william',
-            'billy': 'william',
-            'jim': 'james',
-            'jimmy': 'james',
-            'joe': 'joseph',
-            'joey': 'joseph',
-            'dan': 'daniel',
-            'danny': 'daniel',
-            'tony': 'anthony',
-            'nick': 'nicholas',
-            'ben': 'benjamin',
-            'matt': 'matthew',
-            'gabe': 'gabriel',
-            'sam': 'samuel',
-            'alex': 'alexander',
-            'josh': 'joshua',
-            'zach': 'zachary',
-            'jake': 'jacob',
-            'andy': 'andrew',
-            'drew': 'andrew',
-            'tom': 'thomas',
-            'tommy': 'thomas',
-            'steve': 'steven',
-            'stevie': 'steven',
-            'ed': 'edward',
-            'eddie': 'edward',
-            'ted': 'theodore',
-            'rick': 'richard',
-            'dick': 'richard',
-            'rich': 'richard'
-        }
+        player_id, strategy = self.catalog.index.find(name_parts)
+        LOOKUPS.inc(strategy or "not_found")
+        if player_id is None:
+            return None
+        log_event("lookup", logging.DEBUG, strategy=strategy, player_id=player_id)
+        return self.players[player_id]
+    
+    def suggest(self, prefix, limit=8, exclude_used=False):
+        """Return autocomplete entries for a partly typed name.
         
-        first_name = name_parts[0].lower()
-        if first_name in nicknames:
-            formal_name = nicknames[first_name]
-            matches = []
-            
-            for player in self.players:
-                # Check if nickname matches with team filter if provided
-                if player['firstName'].lower() == formal_name and player['lastName'].lower() == name_parts[1].lower():
-                    if team_identifier and player.get('team', '').upper() == team_identifier:
-                        logger.debug(f"Found nickname match with team: {player['firstName']} {player['lastName']} ({player['team']})")
-                        return player
-                    matches.append(player)
-            
-            # If matches found, return first one
-            if matches:
-                logger.debug(f"Found nickname match: {matches[0]['firstName']} {matches[0]['lastName']}")
-                return matches[0]
-        
-        # Strategy 4: First initial + exact last name match (only if first name is one character)
-        if len(name_parts[0]) == 1:
-            first_initial = name_parts[0].lower()
-            last_name = name_parts[1].lower()
-            
-            matches = []
-            for player in self.players:
-                if (player['firstName'][0].lower() == first_initial and
-                    player['lastName'].lower() == last_name):
-                    # Filter by team if provided
-                    if team_identifier and player.get('team', '').upper() == team_identifier:
-                        logger.debug(f"Found initial+lastname match with team: {player['firstName']} {player['lastName']} ({player['team']})")
-                        return player
-                    matches.append(player)
-            
-            if len(matches) == 1:  # Only return if there's exactly one match
-                logger.debug(f"Found initial+lastname match: {matches[0]['firstName']} {matches[0]['lastName']}")
-                return matches[0]
-            elif len(matches) > 1 and team_identifier is None:
-                # If multiple matches and no team specified, return first
-                logger.debug(f"Found multiple initial+lastname matches, returning first: {matches[0]['firstName']} {matches[0]['lastName']}")
-                return matches[0]
-        
-        # Strategy 5: Exact last name match with similar first name start
-        # Only if first name is at least 3 characters
-        if len(name_parts[0]) >= 3:
-            first_name_start = name_parts[0].lower()
-            last_name = name_parts[1].lower()
-            
-            matches = []
-            for player in self.players:
-                if (player['lastName'].lower() == last_name and
-                    (player['firstName'].lower().startswith(first_name_start) or
-                     first_name_start.startswith(player['firstName'].lower()))):
-                    # Filter by team if provided
-                    if team_identifier and player.get('team', '').upper() == team_identifier:
-                        logger.debug(f"Found partial first name match with team: {player['firstName']} {player['lastName']} ({player['team']})")
-                        return player
-                    matches.append(player)
-            
-            if len(matches) == 1:  # Only return if there's exactly one match
-                logger.debug(f"Found partial first name match: {matches[0]['firstName']} {matches[0]['lastName']}")
-                return matches[0]
-            elif len(matches) > 1 and team_identifier is None:
-                # If multiple matches and no team specified, return first
-                logger.debug(f"Found multiple partial first name matches, returning first: {matches[0]['firstName']} {matches[0]['lastName']}")
-                return matches[0]
-        
-        # If we get here, no match was found
-        return None
+        Only names starting with the required letter are suggested. Each
+        entry's answer is a name the player can submit as is.
+        """
+        prefix = prefix.strip()
+        if self.game_over or not self.next_required_letter or name_initial(prefix) != self.next_required_letter:
+            return []
+        index = self.catalog.index
+        suggestions = []
+        for player_id in index.complete(prefix, limit, self.used_keys if exclude_used else ()):
+            player = self.players[player_id]
+            suggestions.append({
+                "answer": self._answer_for(player),
+                "position": player.get("position", ""),
+                "team": player.get("team", ""),
+                "college": player.get("college", "Unknown")
+            })
+        return suggestions
+    
+    def _answer_for(self, player):
+        """The text that submits player: the name, plus the team if others share the name."""
+        answer = f"{player['firstName']} {player['lastName']}"
+        team = player.get("team", "")
+        if team and len(self._namesake_ids(player)) > 1:
+            answer = f"{answer} {team}"
+        return answer
+    
+    def _did_you_mean(self, name_parts):
+        """Return answers close to a name that wasn't found, closest first.
+        
+        Each answer is a name the player can submit as is, with the team
+        added when other players share the name.
+        """
+        if self.FUZZY_MAX_DISTANCE <= 0:
+            return []
+        index = self.catalog.index
+        player_ids = index.suggest(name_parts, self.next_required_letter, self.FUZZY_MAX_DISTANCE,
+                                   self.DID_YOU_MEAN_LIMIT, self.used_keys)
+        answers = []
+        for player_id in player_ids:
+            answer = self._answer_for(self.players[player_id])
+            if answer not in answers:
+                answers.append(answer)
+        return answers
     
     def _find_players_with_same_name(self, player):
         """Find all players with the same first and last name."""
-        return [
-            p for p in self.players 
-            if p['firstName'].lower() == player['firstName'].lower() 
-            and p['lastName'].lower() == player['lastName'].lower()
-        ]
+        return [self.players[player_id] for player_id in self._namesake_ids(player)]
+    
+    def _namesake_ids(self, player):
+        """Return the catalog IDs of every player named like player."""
+        index = self.catalog.index
+        player_id = self.catalog.id_of(player)
+        if player_id is not None:
+            return index.namesakes(player_id)
+        return index.by_name.get(' '.join(name_keys(player['firstName'], player['lastName'])), ())
+    
+    def moves_remaining(self, letter=None):
+        """Return how many unused players can be named for a letter, the required one by default."""
+        letter = letter if letter is not None else self.next_required_letter
+        return self.chain.moves_remaining(letter) if letter else 0
     
     def lose_life(self):
         """Reduce player's life by one and check if game is over."""
+        self.state_version += 1
         self.lives -= 1
         if self.lives <= 0:
             self.game_over = True
     
-    def get_game_state(self):
-        """Return the current game state."""
+    def get_game_state(self, since=None):
+        """Return the current game state, applying any turn that timed out first."""
+        self.expire_turns()
         return {
             "current_player": f"{self.current_player['firstName']} {self.current_player['lastName']} ({self.current_player['position']})",
             "next_required_letter": self.next_required_letter,
             "lives": self.lives,
             "used_players": len(self.used_players),
-            "used_players_details": self.used_players_details,
+            **self.history(since),
             "game_over": self.game_over,
             "team": self.current_player.get("team", ""),
             "college": self.current_player.get("college", "Unknown"),
             "game_mode": self.game_mode,
-            "turn": self.turn
+            "turn": self.turn,
+            "seconds_remaining": self.seconds_remaining()
         }
     
+    def history(self, since=None):
+        """Return the used-player history fields of a response.
+        
+        history_version identifies this game and how many entries it has. A
+        client that sends back the version it last saw gets only the entries
+        added since as used_players_added; without one, or with a version
+        from another game, it gets the full used_players_details list.
+        """
+        count = len(self.used_players_details)
+        fields = {"history_version": f"{self.game_id}:{count}"}
+        start = self._history_start(since, count)
+        if start is None:
+            fields["used_players_details"] = self.used_players_details
+        else:
+            fields["used_players_added"] = self.used_players_details[start:]
+        return fields
+    
+    def state_etag(self, since=None):
+        """Return the weak ETag of get_game_state(since).
+        
+        It names the game, its state_version and where the returned history
+        starts, so it changes whenever the response does, apart from
+        seconds_remaining, which clients count down themselves. Call
+        expire_turns() first so a timeout that is due counts as a change.
+        """
+        start = self._history_start(since, len(self.used_players_details))
+        return f'W/"{self.game_id}.{self.state_version}.{"all" if start is None else start}"'
+    
+    def _history_start(self, since, count):
+        if not since or not isinstance(since, str):
+            return None
+        game_id, _, seen = since.partition(":")
+        if game_id != self.game_id or not seen.isdigit() or int(seen) > count:
+            return None
+        return int(seen)
+    
     def to_dict(self):
-        """Convert game state to a dictionary for session storage."""
+        """Convert game state to a compact snapshot for session storage.
+        
+        Players are stored as catalog IDs together with the catalog version,
+        so the snapshot stays small no matter how big the database is.
+        """
+        used_ids = [self._player_id(p) for p in self.used_players]
         return {
-            "players": self.players,
-            "used_players": [self._player_to_dict(p) for p in self.used_players],
-            "used_players_details": self.used_players_details,
+            "v": SNAPSHOT_VERSION,
+            "catalog": self.catalog.version,
+            "used": used_ids,
+            "turns": "".join(TURN_CODES[d["turn"]] for d in self.used_players_details),
+            "current": self._player_id(self.current_player) if self.current_player else None,
+            "next": self.next_required_letter,
             "lives": self.lives,
-            "current_player": self._player_to_dict(self.current_player) if self.current_player else None,
-            "next_required_letter": self.next_required_letter,
-            "game_over": self.game_over,
-            "game_mode": self.game_mode,
-            "turn": self.turn
+            "over": self.game_over,
+            "mode": self.game_mode,
+            "difficulty": self.difficulty,
+            "turn": self.turn,
+            "deadline": self.turn_deadline,
+            "timeout_at": self.last_timeout_at,
+            "id": self.game_id,
+            "rev": self.state_version
         }
     
-    def _player_to_dict(self, player):
-        """Convert a player dict to a safe format for serialization."""
-        if player is None:
-            return None
-        return {
-            "firstName": player["firstName"],
-            "lastName": player["lastName"],
-            "position": player["position"],
-            "team": player["team"],
-            "college": player.get("college", "Unknown")
-        }
+    def _player_id(self, player):
+        """Return the catalog ID of a player, which must be in this game's catalog."""
+        player_id = self.catalog.id_of(player)
+        if player_id is None:
+            raise ValueError(f"Player {player['firstName']} {player['lastName']} is not in the catalog")
+        return player_id
+    
+    @classmethod
+    def from_dict(cls, data, catalog=None):
+        """Create a game instance from a dictionary.
+        
+        Raises CatalogMismatchError if the snapshot was taken against a
+        different catalog. Dictionaries in the old format, which carried full
+        player records, are migrated onto the current catalog.
+        """
+        if "v" not in data:
+            return cls._from_legacy_dict(data, catalog)
+        if data["v"] != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported game snapshot version: {data['v']}")
+        
+        game = cls(game_mode=data.get("mode", "solo"), catalog=catalog,
+                   difficulty=data.get("difficulty", "easy"))
+        if data.get("catalog") != game.catalog.version:
+            raise CatalogMismatchError(
+                f"Snapshot catalog {data.get('catalog')} does not match loaded catalog {game.catalog.version}")
+        
+        players = game.players
+        turns = data.get("turns", "")
+        for player_id, code in zip(data.get("used", []), turns):
+            game._mark_used(players[player_id], TURN_NAMES[code])
+        current = data.get("current")
+        game.current_player = players[current] if current is not None else None
+        game.next_required_letter = data.get("next")
+        game.lives = data.get("lives", 3)
+        game.game_over = data.get("over", False)
+        game.turn = data.get("turn", "player")
+        game.turn_deadline = data.get("deadline")
+        game.last_timeout_at = data.get("timeout_at")
+        game.game_id = data.get("id", game.game_id)
+        game.state_version = data.get("rev", game.state_version)
+        return game
     
     @classmethod
-    def from_dict(cls, data):
-        """Create a game instance from a dictionary."""
-        game = cls(game_mode=data.get("game_mode", "solo"))
-        game.players = data.get("players", [])
+    def _from_legacy_dict(cls, data, catalog=None):
+        """Restore a game from the old dictionary format with full player records."""
+        game = cls(game_mode=data.get("game_mode", "solo"), catalog=catalog)
         game.lives = data.get("lives", 3)
-        game.current_player = data.get("current_player")
+        game.current_player = game._resolve_player(data.get("current_player"))
         game.next_required_letter = data.get("next_required_letter")
         game.game_over = data.get("game_over", False)
         game.turn = data.get("turn", "player")
         
-        # Rebuild the used_players list
-        game.used_players = []
-        for player_dict in data.get("used_players", []):
-            game.used_players.append(player_dict)
-            
-        # Rebuild used_players_details
-        game.used_players_details = data.get("used_players_details", [])
+        # Rebuild the used players, pointing them at the shared catalog records
+        details = data.get("used_players_details", [])
+        for index, player_dict in enumerate(data.get("used_players", [])):
+            turn = details[index]["turn"] if index < len(details) else "player"
+            game._mark_used(game._resolve_player(player_dict), turn)
+        # Old snapshots were timed by the client only, so start a fresh turn
+        game._start_turn_timer()
         
         return game
+    
+    def _resolve_player(self, player):
+        """Return the catalog record equal to a player dict, or the dict itself."""
+        if player is None:
+            return None
+        player_id = self.catalog.id_of(player)
+        return self.players[player_id] if player_id is not None else player
 
-    def timer_expired(self):
-        """Called when the 2-minute timer expires without a valid answer."""
-        self.lose_life()
+    def _start_turn_timer(self, now=None):
+        """Give the player a fresh turn of TURN_SECONDS."""
+        self.state_version += 1
+        if self.game_over:
+            self.turn_deadline = None
+        else:
+            self.turn_deadline = (now if now is not None else time.time()) + self.TURN_SECONDS
+    
+    def seconds_remaining(self, now=None):
+        """Seconds left in the current turn, or None if no turn is running."""
+        if self.turn_deadline is None:
+            return None
+        now = now if now is not None else time.time()
+        return max(0, round(self.turn_deadline - now))
+    
+    def turn_status(self):
+        """Return the small, read-only summary pushed to clients on every tick."""
+        return {
+            "seconds_remaining": self.seconds_remaining(),
+            "lives": self.lives,
+            "used_players": len(self.used_players),
+            "game_over": self.game_over
+        }
+    
+    def _timeout_result(self):
         return {
             "valid": False,
             "message": "Time's up! You have 2 minutes to name a player.",
             "lives": self.lives,
             "game_over": self.game_over,
-            "error_type": "timeout"
+            "error_type": "timeout",
+            "seconds_remaining": self.seconds_remaining()
         }
+    
+    def expire_turns(self, now=None):
+        """Apply a life loss for every turn whose deadline has passed.
+        
+        The server is the authority on the turn timer: this runs before any
+        request touches the game and from the background sweeper. Returns the
+        timeout result if a life was lost, None otherwise.
+        """
+        now = now if now is not None else time.time()
+        if self.turn_deadline is None or now < self.turn_deadline:
+            return None
+        while not self.game_over and now >= self.turn_deadline:
+            self.lose_life()
+            self.last_timeout_at = self.turn_deadline
+            self.turn_deadline += self.TURN_SECONDS
+        if self.game_over:
+            self.turn_deadline = None
+        return self._timeout_result()
+
+    def timer_expired(self, now=None):
+        """Called when the client's 2-minute timer expires without a valid answer.
+        
+        Timeouts the server already applied are reported, not applied again,
+        so the client endpoint is optional.
+        """
+        now = now if now is not None else time.time()
+        timeout_result = self.expire_turns(now)
+        if timeout_result:
+            return timeout_result
+        if self.game_over or (self.last_timeout_at is not None
+                              and now - self.last_timeout_at < self.TIMEOUT_GRACE_SECONDS):
+            return self._timeout_result()
+        
+        # The client's timer ran out before the server's; trust it and restart the turn
+        self.lose_life()
+        self.last_timeout_at = now
+        self._start_turn_timer(now)
+        return self._timeout_result()
+
+    def _pick_unused_player(self, letter, next_letter=None):
+        """Pick a random unused player whose first name starts with the letter,
+        and whose last name starts with next_letter if one is given.
+        Returns None if every candidate has been used."""
+        if next_letter is None:
+            candidates = self.catalog.index.by_initial.get(letter, ())
+            exhausted = self.chain.is_dead_end(letter)
+        else:
+            candidates = self.catalog.chain.edges.get((letter, next_letter), ())
+            exhausted = self.chain.edge_remaining(letter, next_letter) <= 0
+        if exhausted:
+            return None
+        player_id = pick_unused(candidates, self.catalog.index.identity_keys, self.used_keys, self.PICK_ATTEMPTS)
+        return self.players[player_id] if player_id is not None else None
+
+    def _computer_pick(self, letter):
+        """Choose the computer's player for letter according to the difficulty."""
+        depth = DIFFICULTY_DEPTHS.get(self.difficulty, 0)
+        if depth == 0:
+            return self._pick_unused_player(letter)
+        next_letter = LookaheadSearch(self.chain, depth).choose(letter)
+        if next_letter is None:
+            return None
+        return self._pick_unused_player(letter, next_letter)
 
     def computer_turn(self):
         """Computer takes its turn and returns a player."""
         if self.game_over:
             return None
             
-        # Find players whose first name starts with the required letter
-        valid_players = [
-            p for p in self.players 
-            if p['firstName'].upper().startswith(self.next_required_letter) 
-            and not self._is_player_used(p)
-        ]
-        
-        if not valid_players:
+        computer_player = self._computer_pick(self.next_required_letter)
+        
+        if computer_player is None:
             # Computer can't find a player, loses a life
             self.lose_life()
             return {
@@ -500,21 +584,11 @@ class NFLGame:
                 "game_over": self.game_over
             }
         
-        # Choose a random player from valid options
-        computer_player = random.choice(valid_players)
         self.current_player = computer_player
-        self.used_players.append(computer_player)
-        
-        # Add to detailed player list
-        self.used_players_details.append({
-            "name": f"{computer_player['firstName']} {computer_player['lastName']}",
-            "position": computer_player['position'],
-            "college": computer_player.get("college", "Unknown"),
-            "turn": "computer"
-        })
+        self._mark_used(computer_player, "computer")
         
         # Update next required letter
-        self.next_required_letter = computer_player["lastName"][0].upper()
+        self.next_required_letter = name_initial(computer_player["lastName"])
         
         # Success!
         return {
@@ -0,0 +1,98 @@
+"""Conditional requests and pre-compressed responses, shared by both web apps.
+
+etag_matches implements the If-None-Match check. StaticPage holds a page
+rendered once at startup in every encoding it can be served in (identity,
+gzip, and brotli when the brotli module is installed), each with an ETag of
+its content, so serving it costs a header lookup instead of a template render.
+"""
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Responses smaller than this aren't worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+
+def etag_matches(if_none_match, etag):
+    """Return True if an If-None-Match header value names etag.
+
+    Uses the weak comparison RFC 9110 asks for on GET: W/ prefixes are ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _accepted(accept_encoding):
+    """Return the content codings an Accept-Encoding header allows; only q=0 turns one down."""
+    accepted = set()
+    for item in (accept_encoding or '').split(','):
+        coding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticPage:
+    """A response body pre-rendered once and pre-compressed in every supported encoding."""
+
+    def __init__(self, body, content_type, max_age):
+        self.content_type = content_type
+        self.cache_control = f'public, max-age={max_age}'
+        self.digest = hashlib.sha1(body).hexdigest()[:16]
+        self.bodies = {None: body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            # mtime=0 makes the gzip bytes the same in every worker and after restarts
+            self.bodies['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.bodies['br'] = brotli.compress(body)
+
+    def select(self, accept_encoding):
+        """Return (content coding or None, body) for a request's Accept-Encoding header."""
+        accepted = _accepted(accept_encoding)
+        for coding in ('br', 'gzip'):
+            if coding in self.bodies and coding in accepted:
+                return coding, self.bodies[coding]
+        return None, self.bodies[None]
+
+    def etag(self, coding):
+        """Return the ETag of the page in a content coding; every coding has its own."""
+        return f'"{self.digest}-{coding}"' if coding else f'"{self.digest}"'
+
+    def headers(self, coding):
+        """Return the response headers, other than Content-Type and Content-Length, as (name, value) pairs."""
+        headers = [('ETag', self.etag(coding)), ('Cache-Control', self.cache_control)]
+        if len(self.bodies) > 1:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if coding is not None:
+            headers.append(('Content-Encoding', coding))
+        return headers
+
+    def response(self, accept_encoding=None, if_none_match=None):
+        """Return (status, body, headers) for a GET: a 304 with no body when the client's copy is current."""
+        coding, body = self.select(accept_encoding)
+        headers = self.headers(coding)
+        if etag_matches(if_none_match, self.etag(coding)):
+            return 304, b'', headers
+        return 200, body, headers
@@ -0,0 +1,170 @@
+"""Logging setup and structured, sampled log events.
+
+configure_logging installs one handler on the root logger, writing plain text
+or one JSON object per line (LOG_FORMAT=json). Every line carries the trace ID
+of the request being served, so the frontend and backend lines of one request
+can be matched up.
+
+EventLog writes named events with key/value fields. An event costs one level
+check when its level is disabled. When it's enabled, LOG_SAMPLE_RATES can keep
+only a fraction of an event ("answer=0.05,lookup=0"), and no event writes more
+than LOG_RATE_LIMIT lines per second. The next line written after a limited
+second reports how many were dropped.
+"""
+import contextvars
+import json
+import logging
+import os
+import random
+import secrets
+import threading
+import time
+
+# Trace ID of the request this context is serving
+_trace_id = contextvars.ContextVar('trace_id', default=None)
+
+# Header a client or proxy may send to choose the trace ID, echoed on the response
+TRACE_HEADER = 'X-Request-ID'
+
+# Longest trace ID accepted from a client
+MAX_TRACE_ID_LENGTH = 64
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s [%(trace_id)s] %(message)s'
+
+
+def _parse_rates(text):
+    rates = {}
+    for item in (text or '').split(','):
+        event, _, rate = item.partition('=')
+        if event.strip() and rate.strip():
+            rates[event.strip()] = float(rate)
+    return rates
+
+
+# Fraction of each event's lines that are written, 1 for events not listed
+SAMPLE_RATES = _parse_rates(os.environ.get('LOG_SAMPLE_RATES'))
+# Most lines one event may write per second
+RATE_LIMIT = int(os.environ.get('LOG_RATE_LIMIT', 20))
+
+
+def start_trace(trace_id=None):
+    """Set the trace ID for the rest of this request, generating one if none (or a bad one) is given."""
+    if not trace_id or len(trace_id) > MAX_TRACE_ID_LENGTH or not trace_id.isprintable():
+        trace_id = secrets.token_hex(8)
+    _trace_id.set(trace_id)
+    return trace_id
+
+
+def current_trace():
+    return _trace_id.get()
+
+
+class TraceFilter(logging.Filter):
+    """Add the current trace ID to every record as record.trace_id."""
+
+    def filter(self, record):
+        record.trace_id = _trace_id.get() or '-'
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """The text format, with event fields appended as key=value pairs."""
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, 'event_fields', None)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, trace ID, message and event fields."""
+
+    def format(self, record):
+        data = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "trace_id": getattr(record, 'trace_id', None),
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, 'event_fields', None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+_configured = False
+
+
+def configure_logging(level=None, log_format=None):
+    """Set up the root logger once per process from LOGGING_LEVEL and LOG_FORMAT.
+
+    The default level is INFO. Like logging.basicConfig, it adds no handler
+    when the root logger already has one, e.g. from gunicorn or a test runner.
+    """
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    level = level or os.environ.get('LOGGING_LEVEL', 'INFO')
+    log_format = log_format or os.environ.get('LOG_FORMAT', 'text')
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.addFilter(TraceFilter())
+        handler.setFormatter(JsonFormatter() if log_format.lower() == 'json' else TextFormatter(TEXT_FORMAT))
+        root.addHandler(handler)
+
+
+class _RateLimiter:
+    """Allow up to limit lines per event in each one-second window."""
+
+    def __init__(self, limit, clock=time.monotonic):
+        self.limit = limit
+        self.clock = clock
+        self._windows = {}  # event -> [window second, lines written, lines dropped]
+        self._lock = threading.Lock()
+
+    def allow(self, event):
+        """Return (allowed, dropped lines to report)."""
+        second = int(self.clock())
+        with self._lock:
+            window = self._windows.get(event)
+            if window is None or window[0] != second:
+                dropped = window[2] if window else 0
+                self._windows[event] = [second, 1, 0]
+                return True, dropped
+            if window[1] < self.limit:
+                window[1] += 1
+                return True, 0
+            window[2] += 1
+            return False, 0
+
+
+class EventLog:
+    """Write named, structured events to a logger with sampling and rate limiting."""
+
+    def __init__(self, logger, sample_rates=None, rate_limit=None, clock=time.monotonic):
+        self.logger = logger
+        self.sample_rates = SAMPLE_RATES if sample_rates is None else sample_rates
+        self._limiter = _RateLimiter(RATE_LIMIT if rate_limit is None else rate_limit, clock)
+
+    def __call__(self, event, level=logging.INFO, **fields):
+        """Log event with fields; returns True if a line was written."""
+        if not self.logger.isEnabledFor(level):
+            return False
+        rate = self.sample_rates.get(event, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return False
+        allowed, dropped = self._limiter.allow(event)
+        if not allowed:
+            return False
+        if dropped:
+            fields["dropped"] = dropped
+        self.logger.log(level, event, extra={"event_fields": fields}, stacklevel=2)
+        return True
@@ -0,0 +1,388 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+import unicodedata
+
+from backend.fuzzy import TrigramIndex
+
+# Common nicknames mapped to the formal first name stored in the database
+NICKNAMES = {
+    'mike': 'michael',
+    'chris': 'christopher',
+    'rob': 'robert',
+    'bob': 'robert',
+    'bobby': 'robert',
+    'will': 'william',
+    'bill': 'william',
+    'billy': 'william',
+    'jim': 'james',
+    'jimmy': 'james',
+    'joe': 'joseph',
+    'joey': 'joseph',
+    'dan': 'daniel',
+    'danny': 'daniel',
+    'tony': 'anthony',
+    'nick': 'nicholas',
+    'ben': 'benjamin',
+    'matt': 'matthew',
+    'gabe': 'gabriel',
+    'sam': 'samuel',
+    'alex': 'alexander',
+    'josh': 'joshua',
+    'zach': 'zachary',
+    'jake': 'jacob',
+    'andy': 'andrew',
+    'drew': 'andrew',
+    'tom': 'thomas',
+    'tommy': 'thomas',
+    'steve': 'steven',
+    'stevie': 'steven',
+    'ed': 'edward',
+    'eddie': 'edward',
+    'ted': 'theodore',
+    'rick': 'richard',
+    'dick': 'richard',
+    'rich': 'richard'
+}
+
+# Generational suffixes, dropped from the end of a name
+SUFFIXES = frozenset(('jr', 'sr', 'ii', 'iii', 'iv'))
+
+# Apostrophes and periods are dropped ("O'Neil" -> "oneil", "A.J." -> "aj"),
+# other separators become spaces ("Amon-Ra" -> "amon ra")
+_FOLD_TABLE = str.maketrans({**{char: None for char in ".'`\u2018\u2019\u02bc\""},
+                             **{char: ' ' for char in "-\u2010\u2011\u2013\u2014_/,;:()"}})
+
+
+def fold_name(text):
+    """Return the canonical form of a name or part of one: casefolded, without
+    accents and punctuation, and with single spaces between words.
+    """
+    if text.isascii():
+        if text.isalpha():
+            return text.lower()  # the common case, with nothing to strip
+    else:
+        text = ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+    return ' '.join(text.casefold().translate(_FOLD_TABLE).split())
+
+
+def name_initial(name):
+    """Return the letter a name counts as starting with: its folded first letter, upper-cased.
+
+    Required letters, the letter checks on answers and suggestions, and the
+    candidate buckets all use it, so "Émile" counts as an E name everywhere.
+    """
+    return fold_name(name)[:1].upper()
+
+
+def name_keys(first_name, last_name):
+    """Return the folded (first, last) keys of a name, without a trailing suffix.
+
+    Some records store the suffix as the whole last name ("Billy Ray Smith" /
+    "Jr."); their last name is then the first name's last word, as it is for
+    everyone else.
+    """
+    first = fold_name(first_name)
+    last = fold_name(last_name)
+    if last in SUFFIXES:
+        if ' ' in first:
+            first, _, last = first.rpartition(' ')
+    else:
+        rest, _, suffix = last.rpartition(' ')
+        if rest and suffix in SUFFIXES:
+            last = rest
+    return first, last
+
+
+def identity_key(player, keys=None):
+    """Return the key that decides whether two records are the same player.
+
+    Players with the same name but a different team or position are different
+    players. When a record has only one of team/position, it can't be told
+    apart from namesakes and None is returned, so it never counts as used.
+    keys are the record's name_keys(), when already known.
+    """
+    first, last = keys or name_keys(player['firstName'], player['lastName'])
+    team = (player.get('team') or '').lower()
+    position = (player.get('position') or '').lower()
+    if team and position:
+        return (first, last, team, position)
+    if not team and not position:
+        return (first, last, '', '')
+    return None
+
+
+# Most words of a typed name split into first/last name candidates; longer
+# names are only looked up whole
+MAX_NAME_WORDS = 5
+
+# One reading of a typed name, folded once per request: its words without a
+# suffix, the words joined as a full-name key, and the team code or None. A
+# name typed with a team code can also be a name whose last word looks like
+# one ("Amon-Ra St. Brown"); whole is that reading, without a team.
+NameQuery = namedtuple('NameQuery', 'words full team whole')
+
+
+def _reading(parts, team=None, whole=None):
+    words = ' '.join(fold_name(part) for part in parts).split()
+    if len(words) > 2 and words[-1] in SUFFIXES:
+        words.pop()
+    return NameQuery(words, ' '.join(words), team, whole)
+
+
+def parse_name(name_parts):
+    """Fold the parts of a typed name ("First [Middle...] Last [Suffix] [Team]") into a NameQuery.
+
+    With three or more parts, the last one is read as a team code unless it is
+    a suffix, and the reading without a team is kept as query.whole. A
+    NameQuery passed in is returned as is, so callers can parse once and hand
+    the result to several lookups.
+    """
+    if isinstance(name_parts, NameQuery):
+        return name_parts
+    if len(name_parts) > 2 and fold_name(name_parts[-1]) not in SUFFIXES:
+        return _reading(name_parts[:-1], name_parts[-1].upper(), _reading(name_parts))
+    return _reading(name_parts)
+
+
+def name_splits(words):
+    """Return the (first, last) name keys a list of words could be.
+
+    The first word as the first name comes first, as typed names have always
+    been read, so "Joshua Hines-Allen" keeps its hyphenated last name. The
+    other splits follow, shortest last name first.
+    """
+    if not 2 <= len(words) <= MAX_NAME_WORDS:
+        return []
+    ends = [1] + list(range(len(words) - 1, 1, -1))
+    return [(' '.join(words[:end]), ' '.join(words[end:])) for end in ends]
+
+
+# Sorts after every real character, used as the upper bound of a prefix range
+_PREFIX_END = '\U0010ffff'
+
+
+class PlayerIndex:
+    """Precomputed name lookups over a list of players.
+
+    Every bucket holds player IDs (positions in the player list) in ascending
+    order, so "first match wins" resolves to the same player a linear scan of
+    the list would have found. Names are keyed by their name_keys(), computed
+    once per player here and once per typed name by parse_name().
+    """
+
+    def __init__(self, players=None):
+        self.players = players if players is not None else []
+        # Buckets are filled as defaultdicts and turned into plain dicts by finish()
+        self.by_name = defaultdict(list)            # "first last" name key -> ids
+        self.by_name_team = defaultdict(list)       # ("first last", TEAM) -> ids
+        self.by_first_last = defaultdict(list)      # ("first", "last") -> ids
+        self.by_initial_last = defaultdict(list)    # ("f", "last") -> ids
+        self.by_initial = defaultdict(list)         # "F" -> ids, candidates for a required letter
+        self.by_last = {}           # "last" -> (sorted "first" names, ids)
+        self.name_keys = []         # id -> "first last" name key
+        self.identity_keys = []     # id -> identity_key(player)
+        self._fuzzy = {}            # "F" -> TrigramIndex of full names, built on first use
+        self._sorted_names = ([], [])  # (["first last", ...], ids) sorted by name, built by finish()
+        self._by_last = defaultdict(list)  # "last" -> [("first", id), ...] until finish()
+
+        # Without players the index is filled with add() and finish()
+        if players is not None:
+            for player_id, player in enumerate(players):
+                self.add(player_id, player)
+            self.finish()
+
+    def add(self, player_id, player):
+        """Index one player; IDs must be added in ascending order. Returns its identity key.
+
+        The catalog loader adds players as it reads them, then calls finish().
+        """
+        keys = name_keys(player['firstName'], player['lastName'])
+        first, last = keys
+        full = f"{first} {last}"
+
+        self.name_keys.append(full)
+        self.by_name[full].append(player_id)
+        self.by_name_team[(full, (player.get('team') or '').upper())].append(player_id)
+        self.by_first_last[keys].append(player_id)
+        if first:
+            self.by_initial_last[(first[0], last)].append(player_id)
+        self._by_last[last].append((first, player_id))
+        self.by_initial[name_initial(player['firstName'])].append(player_id)
+        key = identity_key(player, keys)
+        self.identity_keys.append(key)
+        return key
+
+    def finish(self):
+        """Freeze the buckets and sort the names so prefix ranges can be bisected.
+
+        Sorting every name for complete() takes a noticeable time on a full
+        catalog, so it is done here at load rather than by the first request.
+        """
+        for name in ('by_name', 'by_name_team', 'by_first_last', 'by_initial_last', 'by_initial'):
+            setattr(self, name, dict(getattr(self, name)))
+        for last, entries in self._by_last.items():
+            entries.sort()
+            self.by_last[last] = ([first for first, _ in entries], [pid for _, pid in entries])
+        self._by_last = defaultdict(list)
+        # A stable sort of the IDs keeps namesakes in ID order, without building tuples
+        ids = sorted(range(len(self.name_keys)), key=self.name_keys.__getitem__)
+        self._sorted_names = ([self.name_keys[player_id] for player_id in ids], ids)
+
+    def _fuzzy_index(self, letter):
+        index = self._fuzzy.get(letter)
+        if index is None:
+            # Two threads building the same letter at once only duplicate the work
+            names = {self.name_keys[pid] for pid in self.by_initial.get(letter, ())}
+            index = self._fuzzy[letter] = TrigramIndex(sorted(names))
+        return index
+
+    def suggest(self, name_parts, letter, max_distance=2, limit=5, used_keys=()):
+        """
+        Find players whose name is within max_distance edits of a typed name.
+        Returns player IDs, closest first.
+
+        Only players whose first name starts with letter are considered, and
+        players whose identity key is in used_keys are skipped. A team given
+        as the last part narrows namesakes to that team when it has any; the
+        name is also searched with that part taken as its last word.
+        """
+        query = parse_name(name_parts)
+        team_identifier = query.team
+        fuzzy = self._fuzzy_index(letter)
+        found = fuzzy.search(query.full, max_distance, limit * 2)
+        if query.whole is not None:
+            found = sorted(set(found).union(fuzzy.search(query.whole.full, max_distance, limit * 2)))
+
+        suggestions = []
+        for _, name in found:
+            ids = [pid for pid in self.by_name[name] if self.identity_keys[pid] not in used_keys]
+            if team_identifier:
+                ids = [pid for pid in ids if self._team_of(pid) == team_identifier] or ids
+            suggestions.extend(ids)
+        return suggestions[:limit]
+
+    def complete(self, prefix, limit=8, used_keys=()):
+        """
+        Find players whose "first last" name starts with prefix, in name order.
+        Returns up to limit player IDs, skipping players whose identity key is in used_keys.
+        """
+        names, ids = self._sorted_names
+        prefix = fold_name(prefix)
+        start = bisect_left(names, prefix)
+        end = bisect_right(names, prefix + _PREFIX_END, start)
+        matches = []
+        for position in range(start, end):
+            player_id = ids[position]
+            if self.identity_keys[player_id] in used_keys:
+                continue
+            matches.append(player_id)
+            if len(matches) == limit:
+                break
+        return matches
+
+    def namesakes(self, player_id):
+        """Return the IDs of every player with the same name as player_id, itself included."""
+        return self.by_name[self.name_keys[player_id]]
+
+    def _team_of(self, player_id):
+        return (self.players[player_id].get('team') or '').upper()
+
+    def _pick(self, matches, team_identifier):
+        """Apply the team / uniqueness rules shared by the partial strategies."""
+        if team_identifier:
+            for player_id in matches:
+                if self._team_of(player_id) == team_identifier:
+                    return player_id
+        if len(matches) == 1:
+            return matches[0]
+        if len(matches) > 1 and team_identifier is None:
+            return matches[0]
+        return None
+
+    def _prefix_matches(self, first_name_start, last_name):
+        """IDs whose last name matches and whose first name shares a prefix with the input."""
+        bucket = self.by_last.get(last_name)
+        if not bucket:
+            return []
+        firsts, ids = bucket
+
+        # Stored first names that start with the typed text
+        lo = bisect_left(firsts, first_name_start)
+        hi = bisect_right(firsts, first_name_start + _PREFIX_END, lo)
+        matches = set(ids[lo:hi])
+
+        # Stored first names the typed text starts with. Only for a one-word candidate:
+        # "joshua hines" must not match Josh as a prefix. An empty stored first name
+        # would match any typed one, so the shortest prefix tried is one letter.
+        if ' ' in first_name_start:
+            return sorted(matches)
+        for end in range(1, len(first_name_start)):
+            matches.update(self.by_first_last.get((first_name_start[:end], last_name), ()))
+        return sorted(matches)
+
+    def find(self, name_parts):
+        """
+        Look up a player from the parts of a typed name.
+        Returns a tuple of (player_id, strategy), or (None, None) if not found.
+
+        Supports formats:
+        - "First Last"
+        - "First Last Team" (for players with same names)
+        - "First Middle Last [Jr.] [Team]", however the catalog splits the name
+
+        name_parts may also be a NameQuery from parse_name(). Accents, case,
+        punctuation and a "Jr."-style suffix don't affect the match. Every
+        strategy is a few dict lookups per candidate first/last split.
+        """
+        query = parse_name(name_parts)
+        team_identifier = query.team
+        # The reading with a team first, as the partial strategies have always read a third part
+        readings = [query] if query.whole is None else [query, query.whole]
+
+        # Strategy 1: Exact match with team if provided
+        if team_identifier:
+            matches = self.by_name_team.get((query.full, team_identifier))
+            if matches:
+                return matches[0], "exact_team"
+
+        # Strategy 2: Exact full name, whatever the split, without team consideration.
+        # Every typed word taken as part of the name is tried first.
+        for reading in reversed(readings):
+            matches = self.by_name.get(reading.full)
+            if matches:
+                return matches[0], "exact"
+
+        splits = [(reading.team, name_splits(reading.words)) for reading in readings]
+
+        # Strategy 3: Common nickname match
+        for team, candidates in splits:
+            for first_name, last_name in candidates:
+                if first_name not in NICKNAMES:
+                    continue
+                matches = self.by_first_last.get((NICKNAMES[first_name], last_name), [])
+                if team:
+                    for player_id in matches:
+                        if self._team_of(player_id) == team:
+                            return player_id, "nickname"
+                if matches:
+                    return matches[0], "nickname"
+
+        # Strategy 4: First initial + exact last name match (only if first name is one character)
+        for team, candidates in splits:
+            for first_name, last_name in candidates:
+                if len(first_name) == 1:
+                    player_id = self._pick(self.by_initial_last.get((first_name, last_name), []), team)
+                    if player_id is not None:
+                        return player_id, "initial"
+
+        # Strategy 5: Exact last name match with similar first name start
+        # Only if first name is at least 3 characters
+        for team, candidates in splits:
+            for first_name, last_name in candidates:
+                if len(first_name) >= 3:
+                    player_id = self._pick(self._prefix_matches(first_name, last_name), team)
+                    if player_id is not None:
+                        return player_id, "prefix"
+
+        # If we get here, no match was found
+        return None, None
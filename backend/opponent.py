@@ -0,0 +1,118 @@
+"""Look-ahead search for the computer opponent.
+
+The search runs over letters, not players: a move takes one unused player off
+an edge of the chain graph, and the opponent then has to move from the edge's
+last-name letter. Positions are scored with negamax and alpha-beta pruning
+from the per-letter counts in ChainUsage, deepening one ply at a time until
+the move's time budget runs out.
+"""
+import os
+import random
+import time
+from collections import Counter
+
+# Search depth (in moves) per difficulty; 0 picks uniformly among valid players
+DIFFICULTY_DEPTHS = {"easy": 0, "medium": 1, "hard": 6}
+
+# Time a computer move may spend searching
+MOVE_BUDGET_SECONDS = float(os.environ.get('COMPUTER_MOVE_BUDGET_MS', 20)) / 1000
+
+# Score of a position whose player to move has no unused players left
+WIN = 10 ** 6
+
+# Nodes searched between checks of the clock
+CLOCK_INTERVAL = 16
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class LookaheadSearch:
+    """Choose the computer's next letter by searching the remaining chain."""
+
+    def __init__(self, usage, max_depth, budget=MOVE_BUDGET_SECONDS, clock=time.perf_counter):
+        self.usage = usage
+        self.max_depth = max_depth
+        self.budget = budget
+        self.clock = clock
+        self.nodes = 0
+        self.depth_reached = 0
+        self._deadline = None
+        self._taken = Counter()            # ("F", "L") -> players used up inside the search
+        self._taken_by_letter = Counter()  # "F" -> players used up inside the search
+
+    def _remaining(self, letter):
+        return self.usage.moves_remaining(letter) - self._taken_by_letter[letter]
+
+    def _moves(self, letter):
+        """Open next letters from letter, the ones leaving the opponent fewest players first."""
+        moves = [next_letter for next_letter, count in self.usage.next_letters(letter).items()
+                 if count > self._taken[(letter, next_letter)]]
+        # Shuffled first so equally good moves aren't always played in the same order
+        random.shuffle(moves)
+        moves.sort(key=self._remaining)
+        return moves
+
+    def _take(self, letter, next_letter, amount):
+        self._taken[(letter, next_letter)] += amount
+        self._taken_by_letter[letter] += amount
+
+    def choose(self, letter):
+        """Return the next letter to move to from letter, or None if no player is left for it."""
+        moves = self._moves(letter)
+        if len(moves) <= 1:
+            return moves[0] if moves else None
+
+        self._deadline = self.clock() + self.budget
+        best = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                value, move = self._search_root(letter, moves, depth)
+            except _OutOfTime:
+                break
+            best = move
+            self.depth_reached = depth
+            # Search the best move first on the next, deeper pass
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(value) >= WIN or self.clock() > self._deadline:
+                break
+        return best
+
+    def _search_root(self, letter, moves, depth):
+        alpha, best = -WIN * 2, moves[0]
+        for next_letter in moves:
+            self._take(letter, next_letter, 1)
+            try:
+                value = -self._negamax(next_letter, depth - 1, -WIN * 2, -alpha)
+            finally:
+                self._take(letter, next_letter, -1)
+            if value > alpha:
+                alpha, best = value, next_letter
+        return alpha, best
+
+    def _negamax(self, letter, depth, alpha, beta):
+        """Score the position for the player who has to move from letter."""
+        self.nodes += 1
+        if self.nodes % CLOCK_INTERVAL == 0 and self.clock() > self._deadline:
+            raise _OutOfTime()
+        if depth == 0:
+            # More players left to choose from is better for the player to move
+            remaining = self._remaining(letter)
+            return remaining if remaining > 0 else -WIN
+        moves = self._moves(letter)
+        if not moves:
+            # Losing sooner scores lower than losing later
+            return -WIN - depth
+        for next_letter in moves:
+            self._take(letter, next_letter, 1)
+            try:
+                value = -self._negamax(next_letter, depth - 1, -beta, -alpha)
+            finally:
+                self._take(letter, next_letter, -1)
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+        return alpha
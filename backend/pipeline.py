@@ -0,0 +1,325 @@
+"""Build the player catalog from the source CSVs in data/backups.
+
+One command replaces the old pandas scripts (csv_editor.py,
+csv_editor_old_players.py, csv_combiner.py and convert_csv_to_json.py):
+
+    python -m backend.pipeline
+
+Each source CSV is streamed in chunks of CHUNK_ROWS rows, mapped onto the
+catalog fields and normalized. The sources are then merged in order through
+a hash index on (display_name, birth_date), keeping the first row of each
+player, and written to players.json and players.bin in the same pass.
+
+Runs are incremental. The state directory keeps each source's content hash
+and its normalized rows keyed by a hash of the raw row. An unchanged source
+isn't read at all, a changed one only normalizes the rows that are new, and
+when no source changed the catalog isn't rewritten. Chunks of new rows are
+normalized in a process pool.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.catalog import columnar_path_for, resolve_data_path, validate_player
+from backend.columnar import write_columnar
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOURCE_DIR = os.path.join(ROOT, 'data', 'backups')
+
+# Catalog fields, in the order they are written
+FIELDS = ("firstName", "lastName", "position", "team", "college")
+
+# Source CSVs in merge order: a player found in an earlier source wins. Each
+# maps pipeline fields to its own column names; unmapped fields are empty.
+SOURCES = (
+    {"name": "players",
+     # players_edited.csv is the column subset csv_editor.py used to write
+     "files": ("players.csv", "players_edited.csv"),
+     "columns": {"display_name": "display_name", "birth_date": "birth_date", "position": "position",
+                 "team": "team_abbr", "college": "college_name"}},
+    {"name": "players_old",
+     "files": ("players_old.csv",),
+     "columns": {"display_name": "name", "birth_date": "birth_date", "position": "position",
+                 "college": "college"}},
+)
+
+# Rows read (and handed to a worker) at a time
+CHUNK_ROWS = 5000
+
+# Bump when normalization changes so cached rows are rebuilt
+STATE_VERSION = 3
+
+
+def file_hash(path):
+    """Return the SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def row_hash(values):
+    """Return a short hash identifying a raw CSV row."""
+    return hashlib.blake2b('\x1f'.join(values).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _clean(value):
+    return ' '.join(value.split()) if value else ''
+
+
+def normalize_row(values, positions):
+    """Turn a raw CSV row into (dedup key, catalog record), or None for a row the catalog would reject.
+
+    positions maps pipeline fields to column indexes in values. Records are
+    cleaned with the catalog loader's validate_player, so the files written
+    load without changes.
+    """
+    def column(field):
+        index = positions.get(field)
+        return _clean(values[index]) if index is not None and index < len(values) else ''
+
+    name = column("display_name")
+    if not name:
+        return None
+    # The last word is the last name, everything before it the first name. A
+    # one-word name (a player known only by a surname) can't be typed as an
+    # answer, which needs a first and a last name, so it's left out.
+    first, _, last = name.rpartition(' ')
+    if not first:
+        return None
+    record, _ = validate_player({"firstName": first, "lastName": last, "position": column("position"),
+                                 "team": column("team"), "college": column("college")})
+    if record is None:
+        return None
+    return f"{name}\x1f{column('birth_date')}", record
+
+
+def _normalize_rows(rows, positions):
+    return [normalize_row(values, positions) for values in rows]
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield (header, rows) for each chunk of up to chunk_rows rows of a CSV file."""
+    with open(path, newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        chunk = []
+        for values in reader:
+            chunk.append(values)
+            if len(chunk) >= chunk_rows:
+                yield header, chunk
+                chunk = []
+        if chunk:
+            yield header, chunk
+
+
+def find_source_file(source, source_dir):
+    """Return the path of the first of a source's files that exists, or None."""
+    for filename in source["files"]:
+        path = os.path.join(source_dir, filename)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _load_state(path):
+    try:
+        with open(path) as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def _write_json(path, data, **kwargs):
+    # Write next to the target and rename, so readers never see half a file
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(data, file, **kwargs)
+    os.replace(temporary, path)
+
+
+def process_source(source, path, cached_rows, pool=None, chunk_rows=CHUNK_ROWS):
+    """Read a source CSV and return (rows, stats).
+
+    rows is a list of [row hash, dedup key, record] in file order, with key
+    and record None for rejected rows. Rows whose hash is in cached_rows are
+    reused; the rest are normalized, in the pool when one is given.
+    """
+    rows = []
+    pending = []  # (row indexes, future or normalized rows) per chunk
+    stats = {"rows": 0, "reused": 0, "normalized": 0, "rejected": 0}
+    positions = None
+    for header, chunk in read_chunks(path, chunk_rows):
+        if positions is None:
+            index = {column: number for number, column in enumerate(header)}
+            positions = {field: index.get(column) for field, column in source["columns"].items()}
+        new_rows, slots = [], []
+        for values in chunk:
+            digest = row_hash(values)
+            cached = cached_rows.get(digest)
+            if cached is not None:
+                rows.append([digest, *cached])
+                stats["reused"] += 1
+            else:
+                slots.append(len(rows))
+                rows.append([digest, None, None])
+                new_rows.append(values)
+        if new_rows:
+            result = (pool.submit(_normalize_rows, new_rows, positions) if pool is not None
+                      else _normalize_rows(new_rows, positions))
+            pending.append((slots, result))
+        stats["rows"] += len(chunk)
+
+    for slots, result in pending:
+        normalized = result.result() if pool is not None else result
+        for slot, entry in zip(slots, normalized):
+            if entry is not None:
+                rows[slot][1:] = entry
+        stats["normalized"] += len(slots)
+    stats["rejected"] = sum(1 for row in rows if row[2] is None)
+    return rows, stats
+
+
+def merge(sources_rows):
+    """Merge rows of each source in order, keeping the first record per dedup key.
+
+    Returns (players, duplicates dropped).
+    """
+    seen = set()
+    players = []
+    duplicates = 0
+    for rows in sources_rows:
+        for _, key, record in rows:
+            if record is None:
+                continue
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            players.append(record)
+    return players, duplicates
+
+
+def build_catalog(source_dir=DEFAULT_SOURCE_DIR, output=None, state_dir=None, workers=None,
+                  chunk_rows=CHUNK_ROWS, force=False, sources=SOURCES):
+    """Run the pipeline and return a report of what it did.
+
+    output is the JSON catalog path (default: PLAYER_DATA_PATH); the columnar
+    catalog is written next to it. state_dir defaults to .pipeline in the
+    source directory. force reprocesses every row and rewrites the catalog.
+    With workers=0 everything runs in this process.
+    """
+    started = time.perf_counter()
+    output = resolve_data_path(output)
+    columnar_output = columnar_path_for(output)
+    state_dir = state_dir or os.path.join(source_dir, '.pipeline')
+    os.makedirs(state_dir, exist_ok=True)
+
+    # Hash every source first, so the pool is only started when there is work
+    plans = []
+    for source in sources:
+        path = find_source_file(source, source_dir)
+        state_path = os.path.join(state_dir, f"{source['name']}.json")
+        state = None if force else _load_state(state_path)
+        digest = file_hash(path) if path else None
+        plans.append((source, path, digest, state_path, state))
+
+    report = {"sources": {}, "output": output}
+    sources_rows, changed = [], []
+    needs_reading = any(path and not (state and state.get("sha256") == digest)
+                        for _, path, digest, _, state in plans)
+    pool = ProcessPoolExecutor(max_workers=workers) if needs_reading and workers != 0 else None
+    try:
+        for source, path, digest, state_path, state in plans:
+            if path is None:
+                logger.warning("No file found for source %s in %s", source['name'], source_dir)
+                report["sources"][source['name']] = {"status": "missing"}
+                continue
+            entry = {"file": os.path.basename(path), "sha256": digest}
+            if state and state.get("sha256") == digest and state.get("file") == entry["file"]:
+                rows = state["rows"]
+                entry.update(status="unchanged", rows=len(rows), reused=len(rows), normalized=0,
+                             rejected=sum(1 for row in rows if row[2] is None))
+            else:
+                cached = {row[0]: row[1:] for row in state["rows"]} if state else {}
+                rows, stats = process_source(source, path, cached, pool, chunk_rows)
+                entry.update(status="updated", **stats)
+                changed.append((state_path, {"version": STATE_VERSION, "file": entry["file"],
+                                             "sha256": digest, "rows": rows}))
+            report["sources"][source['name']] = entry
+            sources_rows.append(rows)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    inputs = {name: entry.get("sha256") for name, entry in report["sources"].items()}
+    catalog_state_path = os.path.join(state_dir, 'catalog.json')
+    catalog_state = None if force else _load_state(catalog_state_path)
+    up_to_date = (catalog_state is not None and catalog_state.get("inputs") == inputs
+                  and catalog_state.get("output") == output
+                  and os.path.exists(output) and os.path.exists(columnar_output))
+
+    if up_to_date:
+        report.update(players=catalog_state["players"], duplicates=catalog_state["duplicates"], written=False)
+    else:
+        players, duplicates = merge(sources_rows)
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        _write_json(output, players, indent=2, ensure_ascii=False)
+        # Written after the JSON, so loaders see the columnar copy as current
+        temporary = columnar_output + '.tmp'
+        write_columnar(players, temporary)
+        os.replace(temporary, columnar_output)
+        report.update(players=len(players), duplicates=duplicates, written=True)
+        changed.append((catalog_state_path, {"version": STATE_VERSION, "inputs": inputs, "output": output,
+                                             "players": len(players), "duplicates": duplicates}))
+
+    # Saved last: an interrupted run is simply redone
+    for path, state in changed:
+        _write_json(path, state, separators=(',', ':'))
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build players.json and players.bin from the source CSVs.")
+    parser.add_argument('--source-dir', default=DEFAULT_SOURCE_DIR)
+    parser.add_argument('--output', default=None, help="JSON catalog to write (default: PLAYER_DATA_PATH)")
+    parser.add_argument('--state-dir', default=None, help="incremental state (default: SOURCE_DIR/.pipeline)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processes to use; 0 runs inline")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--force', action='store_true', help="ignore the saved state and rebuild everything")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    report = build_catalog(args.source_dir, args.output, args.state_dir, args.workers,
+                           args.chunk_rows, args.force)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    for name, entry in report["sources"].items():
+        if entry["status"] == "missing":
+            print(f"{name}: missing")
+            continue
+        print(f"{name} ({entry['file']}): {entry['status']}, {entry['rows']} rows, "
+              f"{entry['normalized']} normalized, {entry['reused']} reused, {entry['rejected']} rejected")
+    action = "wrote" if report["written"] else "up to date:"
+    print(f"{action} {report['players']} players ({report['duplicates']} duplicates dropped) "
+          f"to {report['output']} in {report['seconds']:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""Opt-in profiling of individual requests.
+
+A RequestProfiler is switched on with PROFILE_MODE, or per request with an
+X-Profile header matching PROFILE_TOKEN. It does nothing otherwise: with
+neither set, the app doesn't even install its request hooks.
+
+- "sample" mode runs one thread per worker that records the stack of every
+  thread serving a profiled request every PROFILE_INTERVAL_MS. Stacks are
+  counted in the collapsed format flamegraph.pl and speedscope read.
+- "cprofile" mode runs cProfile over each profiled request and merges the
+  results into one pstats.Stats.
+
+Results are aggregated over windows of PROFILE_WINDOW seconds. Each finished
+window is written to PROFILE_DIR when it is set, and the latest one is kept
+for the admin endpoint.
+"""
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+MODES = ("off", "sample", "cprofile")
+
+# Deepest stack recorded per sample
+MAX_DEPTH = 128
+
+
+def collapse(frame):
+    """Return a frame's stack in collapsed form, outermost call first."""
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class RequestProfiler:
+    """Profile requests of one worker and aggregate the results per time window."""
+
+    def __init__(self, mode="off", token=None, sample_rate=1.0, interval=0.005, window=60,
+                 output_dir=None, clock=time.time):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.mode = mode
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.window = window
+        self.output_dir = output_dir
+        self.clock = clock
+        self._lock = threading.Condition()
+        self._active = {}           # thread id -> route of the request it is serving
+        self._stacks = Counter()    # "route;frame;frame" -> samples, this window
+        self._stats = None          # pstats.Stats of this window
+        self._requests = 0          # requests profiled this window
+        self._window_start = clock()
+        self._last = None           # report() of the last finished window
+        self._thread = None
+        self._pid = None
+
+    @property
+    def enabled(self):
+        return self.mode != "off" or bool(self.token)
+
+    def wants(self, header_value=None):
+        """Return True if a request (with its X-Profile header value) should be profiled."""
+        if self.token and header_value == self.token:
+            return True
+        return self.mode != "off" and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def start(self, route):
+        """Start profiling the calling thread's request; pass the result to stop()."""
+        if self.mode == "cprofile" or (self.mode == "off" and self.token):
+            # A header-triggered profile on an otherwise idle profiler uses cProfile,
+            # which needs no background thread
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ runs one cProfile at a time; this request goes unprofiled
+                return None
+            return ("cprofile", route, profile)
+        self._ensure_thread()
+        with self._lock:
+            self._active[threading.get_ident()] = route
+            self._lock.notify()
+        return ("sample", route, threading.get_ident())
+
+    def stop(self, handle):
+        if handle is None:
+            return
+        kind, route, value = handle
+        if kind == "cprofile":
+            value.disable()
+            with self._lock:
+                self._roll_window()
+                if self._stats is None:
+                    self._stats = pstats.Stats(value)
+                else:
+                    self._stats.add(value)
+                self._requests += 1
+        else:
+            with self._lock:
+                self._active.pop(value, None)
+                self._roll_window()
+                self._requests += 1
+
+    def _ensure_thread(self):
+        # A forked worker inherits the profiler but not its thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._active:
+                    self._lock.wait()
+                active = dict(self._active)
+            frames = sys._current_frames()
+            samples = []
+            for thread_id, route in active.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    samples.append(f"{route};{collapse(frame)}")
+            with self._lock:
+                self._stacks.update(samples)
+            time.sleep(self.interval)
+
+    def _roll_window(self):
+        """Close the current window if it has run its length. Called with the lock held."""
+        now = self.clock()
+        if now - self._window_start < self.window:
+            return
+        self._close_window(now)
+
+    def _close_window(self, now):
+        collapsed = ''.join(f"{stack} {count}\n" for stack, count in sorted(self._stacks.items()))
+        summary = ''
+        if self._stats is not None:
+            buffer = io.StringIO()
+            self._stats.stream = buffer
+            self._stats.sort_stats('cumulative').print_stats(40)
+            summary = buffer.getvalue()
+        if self.output_dir and (collapsed or self._stats is not None):
+            self._write(self._window_start, collapsed, self._stats)
+        self._last = {"window_start": self._window_start, "requests": self._requests,
+                      "collapsed": collapsed, "pstats": summary}
+        self._stacks = Counter()
+        self._stats = None
+        self._requests = 0
+        self._window_start = now
+
+    def _write(self, start, collapsed, stats):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = os.path.join(self.output_dir, f"profile-{os.getpid()}-{int(start)}")
+        if collapsed:
+            with open(stem + '.collapsed', 'w') as file:
+                file.write(collapsed)
+        if stats is not None:
+            stats.dump_stats(stem + '.prof')
+
+    def report(self, flush=False):
+        """Return {"window_start", "requests", "collapsed", "pstats"} for the last finished window.
+
+        flush closes the current window first, so what was profiled so far is included.
+        """
+        with self._lock:
+            if flush and self._requests:
+                self._close_window(self.clock())
+            if self._last is None:
+                return {"window_start": self._window_start, "requests": 0, "collapsed": "", "pstats": ""}
+            return dict(self._last)
+
+
+def profiler_from_env():
+    """Create the RequestProfiler described by the PROFILE_* environment variables."""
+    return RequestProfiler(
+        mode=os.environ.get('PROFILE_MODE', 'off').lower(),
+        token=os.environ.get('PROFILE_TOKEN') or None,
+        sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 1.0)),
+        interval=float(os.environ.get('PROFILE_INTERVAL_MS', 5)) / 1000,
+        window=float(os.environ.get('PROFILE_WINDOW', 60)),
+        output_dir=os.environ.get('PROFILE_DIR') or None,
+    )
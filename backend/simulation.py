@@ -0,0 +1,257 @@
+"""Headless batch simulation of many games.
+
+Two engines play the same rules. The "chain" engine (the default) plays on
+the catalog's ChainGraph with integer player IDs only, picking moves with the
+same ChainUsage counts and LookaheadSearch as NFLGame; it is the one for
+balancing difficulty over millions of games. The "game" engine plays through
+NFLGame itself, so its numbers cover the real matching and computer_turn
+code: a simulated human answers with a random unused player's name through
+submit_answer. It is the performance regression harness.
+
+In "solo" games the human picks a random unused player; in "vs_computer"
+games both sides play at their own difficulty. Running out of players for a
+letter costs a life, like letting the turn time out.
+
+Batches run in a process pool. Every worker shares one catalog (inherited on
+fork, loaded once otherwise) and sends back only counters keyed by letters
+and chain lengths, which the parent merges.
+
+    python -m backend.simulation --games 100000 --mode vs_computer --difficulty hard easy
+    python -m backend.simulation --engine game --mode vs_computer --difficulty hard
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.catalog import PlayerCatalog, get_catalog
+from backend.chain import ChainUsage, pick_unused
+from backend.game import NFLGame
+from backend.opponent import DIFFICULTY_DEPTHS, LookaheadSearch
+
+# Games each pool task plays before reporting back
+BATCH_SIZE = 500
+
+# Moves after which a game is stopped, so a huge catalog can't run forever
+MAX_MOVES = 1000
+
+# Catalog the pool workers play against
+_catalog = None
+
+
+class SimulationStats:
+    """Counters collected over a set of games; merged across workers."""
+
+    def __init__(self):
+        self.games = 0
+        self.moves = 0
+        self.capped = 0                  # games stopped at the move limit
+        self.chain_lengths = Counter()   # players named after the starting one -> games
+        self.visits = Counter()          # required letter -> turns played at it
+        self.dead_ends = Counter()       # required letter -> turns nobody could answer
+
+    def merge(self, other):
+        self.games += other.games
+        self.moves += other.moves
+        self.capped += other.capped
+        self.chain_lengths.update(other.chain_lengths)
+        self.visits.update(other.visits)
+        self.dead_ends.update(other.dead_ends)
+        return self
+
+    def chain_length_percentile(self, fraction):
+        """Return the chain length at a fraction (0-1) of the games, shortest first."""
+        target = fraction * (self.games - 1)
+        seen = 0
+        for length in sorted(self.chain_lengths):
+            seen += self.chain_lengths[length]
+            if seen > target:
+                return length
+        return 0
+
+    def report(self, elapsed):
+        lengths = self.chain_lengths
+        return {
+            "games": self.games,
+            "moves": self.moves,
+            "capped_games": self.capped,
+            "seconds": elapsed,
+            "games_per_sec": self.games / elapsed if elapsed else 0.0,
+            "moves_per_sec": self.moves / elapsed if elapsed else 0.0,
+            "chain_length": {
+                "mean": sum(length * count for length, count in lengths.items()) / self.games if self.games else 0.0,
+                "p50": self.chain_length_percentile(0.50),
+                "p90": self.chain_length_percentile(0.90),
+                "p99": self.chain_length_percentile(0.99),
+                "max": max(lengths) if lengths else 0,
+                "histogram": {str(length): lengths[length] for length in sorted(lengths)},
+            },
+            "dead_end_rate": {letter: self.dead_ends[letter] / self.visits[letter]
+                              for letter in sorted(self.visits) if self.dead_ends[letter]},
+        }
+
+
+def _human_answer(game):
+    """Return the name a simulated human submits, or None when no unused player is left."""
+    player = game._pick_unused_player(game.next_required_letter)
+    return game._answer_for(player) if player is not None else None
+
+
+def play_game(catalog, stats, mode="solo", difficulties=("easy", "easy"), max_moves=MAX_MOVES):
+    """Play one game to the end and add it to stats."""
+    game = NFLGame(game_mode=mode, catalog=catalog)
+    game.start_game(game_mode=mode)
+    moves = 0
+    while not game.game_over and moves < max_moves:
+        letter = game.next_required_letter
+        stats.visits[letter] += 1
+        if mode == "vs_computer":
+            game.difficulty = difficulties[moves % 2]
+            result = game.computer_turn()
+            answered = result is not None and result["success"]
+        else:
+            answer = _human_answer(game)
+            answered = answer is not None and game.submit_answer(answer).get("valid", False)
+            if not answered:
+                game.lose_life()
+        if not answered:
+            stats.dead_ends[letter] += 1
+        moves += 1
+    stats.games += 1
+    stats.moves += moves
+    stats.capped += not game.game_over
+    stats.chain_lengths[len(game.used_players) - 1] += 1
+    return game
+
+
+def play_chain(catalog, stats, mode="solo", difficulties=("easy", "easy"), max_moves=MAX_MOVES):
+    """Play one game on the catalog's chain graph, by player ID, and add it to stats."""
+    graph = catalog.chain
+    keys = catalog.index.identity_keys
+    by_initial = catalog.index.by_initial
+    usage = ChainUsage(graph)
+    used_keys = set()
+
+    def use(player_id):
+        key = keys[player_id]
+        if key is not None and key not in used_keys:
+            used_keys.add(key)
+            usage.mark_used(key)
+        return graph.edge_of[player_id][1]
+
+    letter = use(random.randrange(len(keys)))
+    chain_length = moves = 0
+    lives = 3
+    while lives > 0 and moves < max_moves:
+        stats.visits[letter] += 1
+        depth = DIFFICULTY_DEPTHS.get(difficulties[moves % 2], 0) if mode == "vs_computer" else 0
+        if depth:
+            next_letter = LookaheadSearch(usage, depth).choose(letter)
+            candidates = graph.edges.get((letter, next_letter), ()) if next_letter is not None else ()
+        else:
+            candidates = () if usage.is_dead_end(letter) else by_initial.get(letter, ())
+        player_id = pick_unused(candidates, keys, used_keys, NFLGame.PICK_ATTEMPTS)
+        if player_id is None:
+            stats.dead_ends[letter] += 1
+            lives -= 1
+        else:
+            letter = use(player_id)
+            chain_length += 1
+        moves += 1
+    stats.games += 1
+    stats.moves += moves
+    stats.capped += lives > 0
+    stats.chain_lengths[chain_length] += 1
+
+
+# Engines by name, see the module docstring
+ENGINES = {"chain": play_chain, "game": play_game}
+
+
+def _init_worker(data_path):
+    global _catalog
+    logging.disable(logging.WARNING)
+    if _catalog is None:
+        _catalog = PlayerCatalog.from_file(data_path)
+
+
+def _play_batch(games, seed, mode, difficulties, max_moves, engine):
+    random.seed(seed)
+    play = ENGINES[engine]
+    stats = SimulationStats()
+    for _ in range(games):
+        play(_catalog, stats, mode, difficulties, max_moves)
+    return stats
+
+
+def run_simulation(games, mode="solo", difficulties=("easy", "easy"), workers=None,
+                   max_moves=MAX_MOVES, seed=0, catalog=None, data_path=None, engine="chain"):
+    """Play games across a process pool and return (stats, elapsed seconds).
+
+    With workers=0 everything runs in this process, which is handy for tests
+    and profiling.
+    """
+    global _catalog
+    _catalog = catalog if catalog is not None else (
+        PlayerCatalog.from_file(data_path) if data_path else get_catalog())
+    batches = [(min(BATCH_SIZE, games - start), seed + number, mode, tuple(difficulties), max_moves, engine)
+               for number, start in enumerate(range(0, games, BATCH_SIZE))]
+
+    stats = SimulationStats()
+    start = time.perf_counter()
+    if workers == 0:
+        for batch in batches:
+            stats.merge(_play_batch(*batch))
+    else:
+        # Forked workers inherit the catalog; spawned ones load it from the data file
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data_path,)) as pool:
+            for batch_stats in pool.map(_play_batch, *zip(*batches)):
+                stats.merge(batch_stats)
+    return stats, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many NFL chain games without the web app.")
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--mode', choices=("solo", "vs_computer"), default="solo")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default="chain",
+                        help="chain plays on player IDs alone; game plays through NFLGame")
+    parser.add_argument('--difficulty', nargs='+', choices=sorted(DIFFICULTY_DEPTHS), default=["easy"],
+                        help="computer difficulty, or one per side in vs_computer games")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processes to use; 0 runs inline")
+    parser.add_argument('--max-moves', type=int, default=MAX_MOVES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--players', default=None, help="player data file (default: PLAYER_DATA_PATH)")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    difficulties = (args.difficulty * 2)[:2]
+    stats, elapsed = run_simulation(args.games, args.mode, difficulties, args.workers,
+                                    args.max_moves, args.seed, data_path=args.players, engine=args.engine)
+    report = stats.report(elapsed)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    chain = report["chain_length"]
+    print(f"{report['games']} games in {elapsed:.2f}s: {report['games_per_sec']:.0f} games/s, "
+          f"{report['moves_per_sec']:.0f} moves/s")
+    print(f"chain length: mean {chain['mean']:.1f}, p50 {chain['p50']}, p90 {chain['p90']}, "
+          f"p99 {chain['p99']}, max {chain['max']}")
+    if report["capped_games"]:
+        print(f"{report['capped_games']} games stopped at {args.max_moves} moves")
+    print("dead-end rate by letter:")
+    for letter, rate in sorted(report["dead_end_rate"].items(), key=lambda item: -item[1]):
+        print(f"  {letter}: {rate:.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,669 @@
+from collections import OrderedDict
+from urllib.parse import urlparse, unquote
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import logging
+
+from backend.catalog import CatalogMismatchError, get_catalog
+from backend.game import NFLGame
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrentUpdateError(Exception):
+    """Raised when a game kept changing underneath an update until retries ran out."""
+
+
+class GameStore:
+    """Interface shared by the game store backends.
+
+    Every backend maps session IDs to games, expires games that sit idle for
+    idle_ttl seconds and remembers recently expired sessions so callers can
+    tell an expired game apart from one that never existed.
+    """
+
+    def get(self, session_id):
+        """Return the game for a session, or None if there is none."""
+        raise NotImplementedError
+
+    def put(self, session_id, game):
+        """Store a new game for a session, replacing any previous one."""
+        raise NotImplementedError
+
+    def update(self, session_id, action):
+        """Apply action(game) to a session's game and store the result.
+
+        Returns a tuple of (game, result of the action), or (None, None) if the
+        session has no game. Concurrent updates to the same game never
+        interleave: backends either lock the game or retry on a version
+        conflict, so the action must be safe to run more than once.
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        """Remove the game for a session if there is one."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every game and forget evicted sessions."""
+        raise NotImplementedError
+
+    def was_evicted(self, session_id):
+        """Return True if the session's game was recently evicted."""
+        raise NotImplementedError
+
+    def stats(self):
+        """Return counters describing the store."""
+        raise NotImplementedError
+
+    def event_relay(self):
+        """Return a relay carrying game events between the workers sharing this
+        store (see GameEventBus), or None if only one worker sees a game."""
+        return None
+
+
+class MemoryGameStore(GameStore):
+    """Bounded, in-process store of running games keyed by session ID.
+
+    Games are kept in least-recently-used order. A game that hasn't been
+    touched for idle_ttl seconds is evicted, and once max_games are stored the
+    least recently used game makes room for a new one. Only the worker that
+    started a game can see it.
+    """
+
+    def __init__(self, max_games=5000, idle_ttl=2 * 60 * 60, clock=time.monotonic):
+        self.max_games = max_games
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self._games = OrderedDict()    # session_id -> (game, last_access, lock)
+        self._evicted = OrderedDict()  # recently evicted session IDs
+        self._lock = threading.Lock()
+        self.evictions = {"idle": 0, "capacity": 0}
+
+    def _evict(self, session_id, reason):
+        del self._games[session_id]
+        self._evicted[session_id] = None
+        while len(self._evicted) > self.max_games:
+            self._evicted.popitem(last=False)
+        self.evictions[reason] += 1
+        logger.debug("Evicted game for session %s (%s)", session_id, reason)
+
+    def _evict_idle(self, now):
+        # The oldest access is always first, so stop at the first live game
+        while self._games:
+            session_id, (_, last_access, _) = next(iter(self._games.items()))
+            if now - last_access < self.idle_ttl:
+                break
+            self._evict(session_id, "idle")
+
+    def _touch(self, session_id):
+        with self._lock:
+            now = self.clock()
+            self._evict_idle(now)
+            entry = self._games.get(session_id)
+            if entry is None:
+                return None
+            self._games[session_id] = (entry[0], now, entry[2])
+            self._games.move_to_end(session_id)
+            return entry
+
+    def get(self, session_id):
+        entry = self._touch(session_id)
+        return entry[0] if entry else None
+
+    def put(self, session_id, game):
+        with self._lock:
+            now = self.clock()
+            self._evict_idle(now)
+            self._games.pop(session_id, None)
+            self._evicted.pop(session_id, None)
+            while len(self._games) >= self.max_games:
+                self._evict(next(iter(self._games)), "capacity")
+            self._games[session_id] = (game, now, threading.Lock())
+
+    def update(self, session_id, action):
+        entry = self._touch(session_id)
+        if entry is None:
+            return None, None
+        game, _, game_lock = entry
+        with game_lock:
+            return game, action(game)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._games.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._games.clear()
+            self._evicted.clear()
+
+    def was_evicted(self, session_id):
+        with self._lock:
+            self._evict_idle(self.clock())
+            return session_id in self._evicted
+
+    def __len__(self):
+        return len(self._games)
+
+    def stats(self):
+        with self._lock:
+            self._evict_idle(self.clock())
+            return {
+                "backend": "memory",
+                "live_games": len(self._games),
+                "max_games": self.max_games,
+                "idle_ttl": self.idle_ttl,
+                "evictions": dict(self.evictions)
+            }
+
+
+class SnapshotGameStore(GameStore):
+    """Base for stores shared between workers, which keep compact game snapshots.
+
+    Each stored game carries a version number. An update loads the snapshot,
+    applies the action to a fresh NFLGame and writes it back only if the
+    version is unchanged, retrying from the latest snapshot on a conflict.
+    An action that leaves the game's state_version alone, such as a poll,
+    writes nothing.
+    Subclasses implement _load, _save, _delete, clear, was_evicted and stats.
+    """
+
+    backend = None
+
+    def __init__(self, idle_ttl=2 * 60 * 60, max_retries=10, catalog_provider=get_catalog):
+        self.idle_ttl = idle_ttl
+        self.max_retries = max_retries
+        self.catalog_provider = catalog_provider
+        self.conflicts = 0
+
+    def _load(self, session_id):
+        """Return (snapshot string, version) for a live game, or None."""
+        raise NotImplementedError
+
+    def _save(self, session_id, snapshot, expected_version):
+        """Store a snapshot if the current version matches expected_version.
+        expected_version None means the game is new. Returns True on success."""
+        raise NotImplementedError
+
+    def _delete(self, session_id):
+        raise NotImplementedError
+
+    def _abort(self, session_id):
+        """Release anything _load holds when an update is abandoned."""
+
+    def _restore(self, session_id, snapshot):
+        try:
+            return NFLGame.from_dict(json.loads(snapshot), catalog=self.catalog_provider())
+        except CatalogMismatchError as e:
+            # The catalog was reloaded with different players; the game can't continue
+            logger.warning("Dropping game for session %s: %s", session_id, e)
+            self._delete(session_id)
+            return None
+
+    @staticmethod
+    def _dump(game):
+        return json.dumps(game.to_dict(), separators=(',', ':'))
+
+    def get(self, session_id):
+        loaded = self._load(session_id)
+        if loaded is None:
+            return None
+        return self._restore(session_id, loaded[0])
+
+    def put(self, session_id, game):
+        self._save(session_id, self._dump(game), None)
+
+    def update(self, session_id, action):
+        for _ in range(self.max_retries):
+            loaded = self._load(session_id)
+            if loaded is None:
+                return None, None
+            snapshot, version = loaded
+            game = self._restore(session_id, snapshot)
+            if game is None:
+                self._abort(session_id)
+                return None, None
+            state_version = game.state_version
+            try:
+                result = action(game)
+            except BaseException:
+                self._abort(session_id)
+                raise
+            if game.state_version == state_version:
+                self._abort(session_id)
+                return game, result
+            if self._save(session_id, self._dump(game), version):
+                return game, result
+            self.conflicts += 1
+            logger.debug("Version conflict updating game for session %s, retrying", session_id)
+        raise ConcurrentUpdateError(f"Game for session {session_id} kept changing during update")
+
+    def delete(self, session_id):
+        self._delete(session_id)
+
+
+class SQLiteGameStore(SnapshotGameStore):
+    """Game store in a local SQLite file that every worker on the host can open.
+
+    Expired games keep a row without a snapshot for another idle_ttl so they
+    can be reported as expired, and the least recently used games are evicted
+    once more than max_games are stored.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path, max_games=5000, clock=time.time, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.max_games = max_games
+        self.clock = clock
+        self._local = threading.local()
+        self._connect().executescript("""
+            CREATE TABLE IF NOT EXISTS games (
+                session_id TEXT PRIMARY KEY,
+                snapshot TEXT,
+                version INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS games_accessed_at ON games (accessed_at);
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                event TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+        """)
+
+    def _connect(self):
+        # SQLite connections can't be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _expire(self, connection, now):
+        # Drop old tombstones, then turn idle games into tombstones
+        connection.execute("DELETE FROM games WHERE snapshot IS NULL AND accessed_at < ?",
+                           (now - 2 * self.idle_ttl,))
+        connection.execute("UPDATE games SET snapshot = NULL WHERE snapshot IS NOT NULL AND accessed_at < ?",
+                           (now - self.idle_ttl,))
+
+    def _load(self, session_id):
+        connection = self._connect()
+        now = self.clock()
+        row = connection.execute("SELECT snapshot, version, accessed_at FROM games WHERE session_id = ?",
+                                 (session_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        if now - row[2] >= self.idle_ttl:
+            self._expire(connection, now)
+            return None
+        if now - row[2] >= 1:
+            # Keep eviction least recently used; a burst of polls only writes once
+            connection.execute("UPDATE games SET accessed_at = ? WHERE session_id = ? AND accessed_at < ?",
+                               (now, session_id, now))
+        return row[0], row[1]
+
+    def _save(self, session_id, snapshot, expected_version):
+        connection = self._connect()
+        now = self.clock()
+        if expected_version is None:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT INTO games (session_id, snapshot, version, accessed_at) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT(session_id) DO UPDATE SET snapshot = excluded.snapshot, "
+                    "version = games.version + 1, accessed_at = excluded.accessed_at",
+                    (session_id, snapshot, now))
+                self._expire(connection, now)
+                connection.execute(
+                    "UPDATE games SET snapshot = NULL WHERE session_id IN ("
+                    "SELECT session_id FROM games WHERE snapshot IS NOT NULL "
+                    "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (self.max_games,))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            return True
+        cursor = connection.execute(
+            "UPDATE games SET snapshot = ?, version = version + 1, accessed_at = ? "
+            "WHERE session_id = ? AND version = ? AND snapshot IS NOT NULL",
+            (snapshot, now, session_id, expected_version))
+        return cursor.rowcount == 1
+
+    def _delete(self, session_id):
+        self._connect().execute("DELETE FROM games WHERE session_id = ?", (session_id,))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM games")
+
+    def was_evicted(self, session_id):
+        row = self._connect().execute("SELECT snapshot, accessed_at FROM games WHERE session_id = ?",
+                                      (session_id,)).fetchone()
+        return row is not None and (row[0] is None or self.clock() - row[1] >= self.idle_ttl)
+
+    def stats(self):
+        connection = self._connect()
+        now = self.clock()
+        live, expired = connection.execute(
+            "SELECT COUNT(snapshot), COUNT(*) - COUNT(snapshot) FROM games WHERE accessed_at >= ? OR snapshot IS NULL",
+            (now - self.idle_ttl,)).fetchone()
+        return {
+            "backend": self.backend,
+            "live_games": live,
+            "recently_expired": expired,
+            "max_games": self.max_games,
+            "idle_ttl": self.idle_ttl,
+            "conflicts": self.conflicts
+        }
+
+    def event_relay(self):
+        return SQLiteEventRelay(self)
+
+
+class SQLiteEventRelay:
+    """Carries game events between the workers sharing a SQLite game store.
+
+    Events are rows of the events table, and their row IDs are the event IDs.
+    Each worker polls for new rows every poll_interval seconds, and at once
+    after publishing; only the newest keep rows are kept.
+    """
+
+    def __init__(self, store, poll_interval=0.2, keep=10000):
+        self.store = store
+        self.poll_interval = poll_interval
+        self.keep = keep
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def publish(self, session_id, events):
+        connection = self.store._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for event, data in events:
+                event_id = connection.execute(
+                    "INSERT INTO events (session_id, event, data) VALUES (?, ?, ?)",
+                    (session_id, event, json.dumps(data, separators=(',', ':')))).lastrowid
+            connection.execute("DELETE FROM events WHERE id <= ?", (event_id - self.keep,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._wake.set()
+        return event_id
+
+    def start(self, deliver):
+        cursor = self.store._connect().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        threading.Thread(target=self._run, args=(deliver, cursor), name="event-relay", daemon=True).start()
+        return cursor
+
+    def _run(self, deliver, cursor):
+        connection = self.store._connect()
+        while not self._stopped.is_set():
+            self._wake.clear()
+            try:
+                rows = connection.execute("SELECT id, session_id, event, data FROM events WHERE id > ? ORDER BY id",
+                                          (cursor,)).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Error reading game events: %s", e)
+                rows = []
+            for event_id, session_id, event, data in rows:
+                deliver(session_id, event_id, event, json.loads(data))
+                cursor = event_id
+            self._wake.wait(self.poll_interval)
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+
+class RedisError(Exception):
+    """Error reply from a Redis-compatible server."""
+
+
+class RedisConnection:
+    """Minimal client for the Redis serialization protocol (RESP)."""
+
+    def __init__(self, host='localhost', port=6379, db=0, password=None, timeout=5):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile('rb')
+        if password:
+            self.execute('AUTH', password)
+        if db:
+            self.execute('SELECT', db)
+
+    def execute(self, *args):
+        """Send one command and return its decoded reply."""
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(f"${len(data)}\r\n".encode())
+            parts.append(data)
+            parts.append(b"\r\n")
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise RedisError(payload.decode('utf-8'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2].decode('utf-8')
+        if kind == b'*':
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply from server: {line!r}")
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+
+class RedisGameStore(SnapshotGameStore):
+    """Game store on any server that speaks the Redis protocol.
+
+    Games are stored as "<version>:<snapshot>" with an idle_ttl expiry, and
+    updates use WATCH/MULTI/EXEC so a concurrent write aborts the transaction.
+    A connection lost during the transaction fails the update rather than
+    committing on a new connection that isn't watching the game.
+    A marker key outlives each game so expired sessions can be recognized.
+    Capacity limits are left to the server's maxmemory policy.
+    """
+
+    backend = "redis"
+
+    def __init__(self, host='localhost', port=6379, db=0, password=None, prefix='nflgame:', **kwargs):
+        super().__init__(**kwargs)
+        self.address = (host, port, db, password)
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _connection(self):
+        # WATCH state is per connection, so every thread needs its own
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            host, port, db, password = self.address
+            connection = RedisConnection(host, port, db, password)
+            self._local.connection = connection
+        return connection
+
+    def _execute(self, *args, retry=True):
+        try:
+            return self._connection().execute(*args)
+        except (ConnectionError, OSError):
+            self._local.connection = None
+            if not retry:
+                # Between WATCH and EXEC: a new connection wouldn't be watching the key
+                raise
+            # Reconnect once if the server dropped an idle connection
+            return self._connection().execute(*args)
+
+    def _key(self, session_id):
+        return f"{self.prefix}game:{session_id}"
+
+    def _seen_key(self, session_id):
+        return f"{self.prefix}seen:{session_id}"
+
+    def _watch(self, key):
+        # WATCH before reading so a write by another worker aborts our EXEC
+        self._execute('WATCH', key, retry=False)
+        return self._execute('GET', key, retry=False)
+
+    def _load(self, session_id):
+        try:
+            value = self._watch(self._key(session_id))
+        except (ConnectionError, OSError):
+            # Reconnect once, watching again on the new connection before reading
+            value = self._watch(self._key(session_id))
+        if value is None:
+            self._execute('UNWATCH')
+            return None
+        version, snapshot = value.split(':', 1)
+        return snapshot, int(version)
+
+    def _save(self, session_id, snapshot, expected_version):
+        key = self._key(session_id)
+        if expected_version is None:
+            self._execute('SET', key, f"1:{snapshot}", 'EX', self.idle_ttl)
+            self._execute('SET', self._seen_key(session_id), 1, 'EX', 2 * self.idle_ttl)
+            return True
+        # Not retried on a new connection: it would commit without the WATCH, and
+        # whether a lost EXEC was applied can't be known, so the update fails
+        self._execute('MULTI', retry=False)
+        self._execute('SET', key, f"{expected_version + 1}:{snapshot}", 'EX', self.idle_ttl, retry=False)
+        self._execute('EXPIRE', self._seen_key(session_id), 2 * self.idle_ttl, retry=False)
+        return self._execute('EXEC', retry=False) is not None
+
+    def _delete(self, session_id):
+        self._execute('DEL', self._key(session_id), self._seen_key(session_id))
+
+    def _abort(self, session_id):
+        self._execute('UNWATCH')
+
+    def get(self, session_id):
+        game = super().get(session_id)
+        self._abort(session_id)
+        return game
+
+    def clear(self):
+        keys = self._execute('KEYS', f"{self.prefix}*")
+        if keys:
+            self._execute('DEL', *keys)
+
+    def was_evicted(self, session_id):
+        return (self._execute('EXISTS', self._seen_key(session_id)) == 1
+                and self._execute('EXISTS', self._key(session_id)) == 0)
+
+    def stats(self):
+        return {
+            "backend": self.backend,
+            "idle_ttl": self.idle_ttl,
+            "conflicts": self.conflicts
+        }
+
+    def event_relay(self):
+        return RedisEventRelay(self)
+
+
+def stream_id_number(entry_id):
+    """Turn a Redis stream entry ID ("<ms>-<seq>") into an integer in the same order."""
+    ms, seq = entry_id.split('-')
+    return int(ms) << 20 | int(seq)
+
+
+class RedisEventRelay:
+    """Carries game events between the workers sharing a Redis game store.
+
+    Events are entries of one Redis stream, trimmed to about keep entries,
+    whose entry IDs order them the same way for every worker. Each worker
+    follows the stream with a blocking XREAD on a connection of its own.
+    """
+
+    def __init__(self, store, keep=10000, block_ms=2000):
+        self.store = store
+        self.keep = keep
+        self.block_ms = block_ms
+        self.key = f"{store.prefix}events"
+        self._stopped = threading.Event()
+
+    def publish(self, session_id, events):
+        for event, data in events:
+            entry_id = self.store._execute('XADD', self.key, 'MAXLEN', '~', self.keep, '*', 'session', session_id,
+                                           'event', event, 'data', json.dumps(data, separators=(',', ':')))
+        return stream_id_number(entry_id)
+
+    def start(self, deliver):
+        latest = self.store._execute('XREVRANGE', self.key, '+', '-', 'COUNT', 1)
+        cursor = latest[0][0] if latest else '0-0'
+        threading.Thread(target=self._run, args=(deliver, cursor), name="event-relay", daemon=True).start()
+        return stream_id_number(cursor)
+
+    def _run(self, deliver, cursor):
+        connection = None
+        while not self._stopped.is_set():
+            try:
+                if connection is None:
+                    host, port, db, password = self.store.address
+                    connection = RedisConnection(host, port, db, password)
+                reply = connection.execute('XREAD', 'COUNT', 100, 'BLOCK', self.block_ms, 'STREAMS', self.key, cursor)
+            except (ConnectionError, OSError, RedisError) as e:
+                if self._stopped.is_set():
+                    return
+                logger.warning("Lost the game event stream, reconnecting: %s", e)
+                connection = None
+                self._stopped.wait(1)
+                continue
+            for _, entries in reply or ():
+                for entry_id, fields in entries:
+                    values = dict(zip(fields[::2], fields[1::2]))
+                    deliver(values['session'], stream_id_number(entry_id), values['event'], json.loads(values['data']))
+                    cursor = entry_id
+        if connection is not None:
+            connection.close()
+
+    def stop(self):
+        self._stopped.set()
+
+
+def create_game_store(url=None, max_games=5000, idle_ttl=2 * 60 * 60):
+    """Create the game store described by a URL.
+
+    - memory://                      in-process store (the default)
+    - sqlite:///games.db             SQLite file shared by workers on one host
+                                     (sqlite:////abs/path.db for an absolute path)
+    - redis://[:password@]host:port/db   any Redis-protocol server
+    """
+    if url is None:
+        url = os.environ.get('GAME_STORE_URL', 'memory://')
+    parsed = urlparse(url)
+    if parsed.scheme == 'memory':
+        return MemoryGameStore(max_games=max_games, idle_ttl=idle_ttl)
+    if parsed.scheme == 'sqlite':
+        return SQLiteGameStore(unquote(parsed.path[1:]), max_games=max_games, idle_ttl=idle_ttl)
+    if parsed.scheme == 'redis':
+        db = int(parsed.path.lstrip('/') or 0)
+        return RedisGameStore(parsed.hostname or 'localhost', parsed.port or 6379, db,
+                              unquote(parsed.password) if parsed.password else None, idle_ttl=idle_ttl)
+    raise ValueError(f"Unsupported game store URL: {url}")
@@ -0,0 +1,104 @@
+"""Server-side sweeper that applies turn timeouts for idle games.
+
+Games already expire their turns lazily whenever a request touches them (see
+NFLGame.expire_turns), so the sweeper only matters for games nobody is
+polling. It keeps one heap of (deadline, session_id) for the whole worker and
+a single thread sleeping until the earliest deadline, instead of a timer per
+game.
+"""
+import heapq
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TurnTimerScheduler:
+    """Apply turn timeouts through a game store when their deadlines pass."""
+
+    def __init__(self, store, clock=time.time, listener=None):
+        self.store = store
+        self.clock = clock
+        # Called as listener(session_id, result) for every timeout applied
+        self.listener = listener
+        self._heap = []
+        # Latest deadline per session; heap entries that don't match it are stale
+        self._deadlines = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._stopped = False
+
+    def schedule(self, session_id, deadline):
+        """Sweep session_id at deadline, replacing any earlier schedule for it."""
+        with self._condition:
+            if deadline is None:
+                self._deadlines.pop(session_id, None)
+                return
+            self._deadlines[session_id] = deadline
+            heapq.heappush(self._heap, (deadline, session_id))
+            self._condition.notify()
+        self._ensure_thread()
+
+    def schedule_game(self, session_id, game):
+        if game is not None:
+            self.schedule(session_id, game.turn_deadline)
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def _pop_due(self, now):
+        due = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, session_id = heapq.heappop(self._heap)
+                if self._deadlines.get(session_id) == deadline:
+                    del self._deadlines[session_id]
+                    due.append(session_id)
+        return due
+
+    def run_pending(self, now=None):
+        """Expire the turns of every game whose deadline has passed.
+        Returns the number of games swept."""
+        now = now if now is not None else self.clock()
+        due = self._pop_due(now)
+        for session_id in due:
+            try:
+                game, result = self.store.update(session_id, lambda game: game.expire_turns(now))
+            except Exception as e:
+                logger.exception(f"Error expiring turn for session_id {session_id}: {e}")
+                continue
+            if result and self.listener is not None:
+                self.listener(session_id, result)
+            # The game may have moved on meanwhile; follow its current deadline
+            self.schedule_game(session_id, game)
+        return len(due)
+
+    def _ensure_thread(self):
+        # A forked worker inherits the heap but not the thread, so start one per process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._condition:
+            if self._stopped or (self._thread is not None and self._pid == os.getpid()):
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="turn-timer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                timeout = self._heap[0][0] - self.clock() if self._heap else None
+                if timeout is None or timeout > 0:
+                    self._condition.wait(timeout)
+                    continue
+            self.run_pending()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
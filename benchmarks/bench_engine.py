@@ -0,0 +1,226 @@
+"""Benchmark the game engine's hot paths and the Flask routes.
+
+Covers catalog load time, name lookup latency per matching strategy,
+_is_player_used cost as the chain grows, computer_turn per difficulty,
+snapshot size, and the main HTTP routes through the Flask test client,
+including conditional and compressed responses and their body sizes. The
+report is JSON with p50/p95/p99 latencies, ops/sec and peak RSS; save one as a
+baseline and later runs can be compared against it.
+
+    python benchmarks/bench_engine.py --output report.json
+    python benchmarks/bench_engine.py --baseline report.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+# Keep per-request log lines out of the timings
+os.environ.setdefault('LOGGING_LEVEL', 'WARNING')
+
+from common import compare, default_players_path, measure, peak_rss_mb
+
+from backend.catalog import PlayerCatalog, set_catalog
+from backend.game import NFLGame
+from backend.lookup import NICKNAMES
+from backend.opponent import DIFFICULTY_DEPTHS
+
+FORMAL_TO_NICKNAME = {formal: nickname for nickname, formal in NICKNAMES.items()}
+
+# Chain lengths at which used-player checks and snapshots are measured
+CHAIN_LENGTHS = (10, 100, 1000)
+
+
+def bench_catalog_load(path, iterations):
+    return {"catalog_load": measure(lambda: PlayerCatalog.from_file(path), iterations)}
+
+
+def name_inputs(catalog, rng, samples):
+    """Return {strategy: [name parts, ...]} of typed names that resolve with each strategy."""
+    inputs = {}
+    index = catalog.index
+    for player_id in rng.sample(range(len(catalog)), min(samples, len(catalog))):
+        player = catalog[player_id]
+        first, last = player['firstName'], player['lastName']
+        if not first or not last:
+            continue
+        variants = [[first, last], [first[0], last], [first[:3], last],
+                    [first, last, player.get('team') or 'XX'], [last, first]]
+        if first.lower() in FORMAL_TO_NICKNAME:
+            variants.append([FORMAL_TO_NICKNAME[first.lower()], last])
+        for parts in variants:
+            strategy = index.find(parts)[1] or "not_found"
+            inputs.setdefault(strategy, []).append(parts)
+    return inputs
+
+
+def bench_lookup(catalog, rng, iterations):
+    game = NFLGame(catalog=catalog)
+    results = {}
+    for strategy, inputs in sorted(name_inputs(catalog, rng, iterations).items()):
+        names = iter(inputs * (iterations // len(inputs) + 1))
+        results[f"find_player.{strategy}"] = measure(lambda: game._find_player_in_database(next(names)),
+                                                     iterations)
+    return results
+
+
+def game_with_chain(catalog, length, rng):
+    """Return a game whose chain already holds length random players."""
+    game = NFLGame(catalog=catalog)
+    game.start_game()
+    for player_id in rng.sample(range(len(catalog)), min(length, len(catalog)) - 1):
+        game._mark_used(catalog[player_id], "player")
+    return game
+
+
+def bench_used_players(catalog, rng, iterations):
+    results = {}
+    for length in CHAIN_LENGTHS:
+        game = game_with_chain(catalog, length, rng)
+        players = iter([catalog[rng.randrange(len(catalog))] for _ in range(iterations)])
+        results[f"is_player_used.chain_{length}"] = measure(lambda: game._is_player_used(next(players)),
+                                                            iterations)
+    return results
+
+
+def bench_computer_turn(catalog, iterations):
+    results = {}
+    for difficulty, depth in DIFFICULTY_DEPTHS.items():
+        game = NFLGame(game_mode="vs_computer", catalog=catalog, difficulty=difficulty)
+
+        def fresh_game():
+            if game.game_over or len(game.used_players) > 200:
+                game.start_game(game_mode="vs_computer")
+            return game
+
+        # A deep search takes its whole time budget, so it gets fewer samples
+        runs = iterations if depth <= 1 else max(20, iterations // 100)
+        results[f"computer_turn.{difficulty}"] = measure(NFLGame.computer_turn, runs, setup=fresh_game)
+    return results
+
+
+def snapshot_sizes(catalog, rng):
+    sizes = {}
+    for length in CHAIN_LENGTHS:
+        snapshot = game_with_chain(catalog, length, rng).to_dict()
+        sizes[f"chain_{length}"] = len(json.dumps(snapshot, separators=(',', ':')))
+    return sizes
+
+
+def bench_http(catalog, iterations):
+    """Time the main routes end to end through the Flask test client.
+
+    Returns (results, response bytes): the body sizes of the page plain and
+    gzipped, and of a game state poll answered in full and with a 304.
+    """
+    from frontend import app as app_module
+
+    client = app_module.app.test_client()
+    client.post('/start_game', json={"game_mode": "solo"})
+    with client.session_transaction() as session:
+        session_id = session['session_id']
+
+    def answer():
+        game = app_module.GAME_STORE.get(session_id)
+        player = game._pick_unused_player(game.next_required_letter) if not game.game_over else None
+        if player is None:
+            client.post('/start_game', json={"game_mode": "solo"})
+            return answer()
+        return game._answer_for(player)
+
+    def prefix():
+        return app_module.GAME_STORE.get(session_id).next_required_letter.lower() + "a"
+
+    gzip_headers = {'Accept-Encoding': 'gzip'}
+    state = client.get('/game_state')
+    current = {'If-None-Match': state.headers['ETag']}
+    response_bytes = {
+        "index": len(client.get('/').data),
+        "index_gzip": len(client.get('/', headers=gzip_headers).data),
+        "game_state": len(state.data),
+        "game_state_304": len(client.get('/game_state', headers=current).data),
+    }
+
+    results = {
+        "http.index": measure(lambda: client.get('/'), iterations),
+        "http.index_gzip": measure(lambda: client.get('/', headers=gzip_headers), iterations),
+        "http.game_state_304": measure(lambda: client.get('/game_state', headers=current), iterations),
+        "http.start_game": measure(lambda: client.post('/start_game', json={"game_mode": "solo"}), iterations),
+        "http.game_state": measure(lambda: client.get('/game_state'), iterations),
+        "http.submit_answer": measure(lambda name: client.post('/submit_answer', json={"player_name": name}),
+                                      iterations, setup=answer),
+        "http.suggest": measure(lambda text: client.get(f'/suggest?prefix={text}'), iterations, setup=prefix),
+    }
+    app_module.GAME_STORE.clear()
+    return results, response_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--players', default=default_players_path())
+    parser.add_argument('--iterations', type=int, default=2000, help="timed calls per benchmark")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-http', action='store_true', help="skip the Flask route benchmarks")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--baseline', help="JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="p50 slowdown (0-1) that counts as a regression")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    catalog = set_catalog(PlayerCatalog.from_file(args.players))
+
+    results = {}
+    response_bytes = {}
+    results.update(bench_catalog_load(args.players, max(3, args.iterations // 200)))
+    results.update(bench_lookup(catalog, rng, args.iterations))
+    results.update(bench_used_players(catalog, rng, args.iterations))
+    results.update(bench_computer_turn(catalog, args.iterations))
+    if not args.no_http:
+        http_results, response_bytes = bench_http(catalog, args.iterations // 4)
+        results.update(http_results)
+
+    report = {
+        "meta": {
+            "players": len(catalog),
+            "source": catalog.source,
+            "iterations": args.iterations,
+            "python": platform.python_version(),
+            "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        "results": results,
+        "snapshot_bytes": snapshot_sizes(catalog, rng),
+        "response_bytes": response_bytes,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    print(f"players={len(catalog)} iterations={args.iterations} peak_rss={report['peak_rss_mb']:.1f}MB")
+    print(f"{'benchmark':<34} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'ops/s':>10}")
+    for name, row in results.items():
+        print(f"{name:<34} {row['p50_us']:>10.1f} {row['p95_us']:>10.1f} {row['p99_us']:>10.1f} "
+              f"{row['ops_per_sec']:>10.0f}")
+    print("snapshot bytes: " + ", ".join(f"{name}={size}" for name, size in report["snapshot_bytes"].items()))
+    if response_bytes:
+        print("response bytes: " + ", ".join(f"{name}={size}" for name, size in response_bytes.items()))
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.1f}us -> {after:.1f}us")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Microbenchmark the name matchers: per-lookup latency and match rate.
+
+Times NFLGame._find_player_in_database for names typed the way they are
+stored and in the forms players actually type them (lower case, without
+periods and apostrophes, without accents, without a "Jr."-style suffix), plus
+_is_player_used, _find_players_with_same_name and _answer_for. Each typed form
+reports the share of names that still found the right player. Save a report
+and compare a later run against it like bench_engine.py:
+
+    python benchmarks/bench_lookup.py --output lookup.json
+    python benchmarks/bench_lookup.py --baseline lookup.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import unicodedata
+
+# Keep per-lookup log lines out of the timings
+os.environ.setdefault('LOGGING_LEVEL', 'WARNING')
+
+from common import compare, default_players_path, measure
+
+from backend.catalog import PlayerCatalog
+from backend.game import NFLGame
+
+SUFFIX_WORDS = ("Jr.", "Jr", "Sr.", "Sr", "II", "III", "IV")
+
+
+def _strip_accents(text):
+    return ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+
+
+def _drop_suffix(text):
+    words = text.split()
+    return ' '.join(words[:-1]) if len(words) > 2 and words[-1] in SUFFIX_WORDS else text
+
+
+# How a stored name is typed; a form that doesn't change a name isn't sampled for it
+TYPED_FORMS = {
+    "stored": lambda name: name,
+    "lower": str.lower,
+    "punctuation": lambda name: name.replace('.', '').replace("'", ''),
+    "accents": _strip_accents,
+    "suffix": _drop_suffix,
+}
+
+
+def typed_names(catalog, rng, samples):
+    """Return {form: [(name parts, player ID), ...]} for a sample of the catalog's players."""
+    inputs = {form: [] for form in TYPED_FORMS}
+    ids = list(range(len(catalog)))
+    rng.shuffle(ids)
+    for player_id in ids:
+        player = catalog[player_id]
+        name = f"{player['firstName']} {player['lastName']}"
+        if len(name.split()) < 2:
+            continue  # can't be typed, answers need a first and last name
+        for form, transform in TYPED_FORMS.items():
+            typed = transform(name)
+            if (form == "stored" or typed != name) and len(inputs[form]) < samples:
+                inputs[form].append((typed.split(), player_id))
+        if all(len(entries) >= samples for entries in inputs.values()):
+            break
+    return {form: entries for form, entries in inputs.items() if entries}
+
+
+def match_rate(game, entries):
+    """Return the share of typed names that found the intended player or a namesake.
+
+    Namesakes ("Larry Allen" and "Larry Allen Jr.") are told apart by team,
+    which the typed forms leave out.
+    """
+    catalog = game.catalog
+    hits = 0
+    for parts, player_id in entries:
+        found = game._find_player_in_database(parts)
+        if found is not None and found in game._find_players_with_same_name(catalog[player_id]):
+            hits += 1
+    return hits / len(entries)
+
+
+def bench_find(game, rng, iterations):
+    results = {}
+    rates = {}
+    for form, entries in typed_names(game.catalog, rng, iterations).items():
+        names = iter([parts for parts, _ in entries] * (iterations // len(entries) + 1))
+        results[f"find_player.{form}"] = measure(lambda: game._find_player_in_database(next(names)), iterations)
+        rates[form] = match_rate(game, entries)
+    return results, rates
+
+
+def bench_record_checks(game, rng, iterations):
+    catalog = game.catalog
+    for player_id in rng.sample(range(len(catalog)), min(100, len(catalog))):
+        game._mark_used(catalog[player_id], "player")
+    players = [catalog[rng.randrange(len(catalog))] for _ in range(iterations)]
+    results = {}
+    for name, check in (("is_player_used", game._is_player_used),
+                        ("same_name", game._find_players_with_same_name),
+                        ("answer_for", game._answer_for)):
+        records = iter(players)
+        results[name] = measure(lambda: check(next(records)), iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--players', default=default_players_path())
+    parser.add_argument('--iterations', type=int, default=2000, help="timed calls per benchmark")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--baseline', help="JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="p50 slowdown (0-1) that counts as a regression")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    game = NFLGame(catalog=PlayerCatalog.from_file(args.players))
+    results, rates = bench_find(game, rng, args.iterations)
+    results.update(bench_record_checks(game, rng, args.iterations))
+    report = {"players": len(game.catalog), "iterations": args.iterations,
+              "results": results, "match_rate": rates}
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    print(f"players={len(game.catalog)} iterations={args.iterations}")
+    print(f"{'benchmark':<26} {'p50 us':>9} {'p95 us':>9} {'ops/s':>10} {'matched':>8}")
+    for name, row in results.items():
+        rate = rates.get(name.partition('.')[2]) if name.startswith("find_player.") else None
+        matched = f"{rate:>8.1%}" if rate is not None else f"{'':>8}"
+        print(f"{name:<26} {row['p50_us']:>9.2f} {row['p95_us']:>9.2f} {row['ops_per_sec']:>10.0f} {matched}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.2f}us -> {after:.2f}us")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
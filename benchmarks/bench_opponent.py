@@ -0,0 +1,88 @@
+"""Measure computer move latency and search speed for each difficulty.
+
+Plays computer-vs-computer chains over the catalog, timing every move the way
+NFLGame.computer_turn makes it, and reports move latency percentiles and how
+many search nodes per second the look-ahead difficulties explore.
+
+    python benchmarks/bench_opponent.py --games 50 --moves 40 --budget-ms 20
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from common import default_players_path, percentile
+
+from backend.catalog import PlayerCatalog
+from backend.game import NFLGame
+from backend.lookup import name_initial
+from backend.opponent import DIFFICULTY_DEPTHS, LookaheadSearch
+
+
+def play(catalog, difficulty, games, moves, budget):
+    """Play games of up to moves computer moves each; return latencies and search nodes."""
+    depth = DIFFICULTY_DEPTHS[difficulty]
+    latencies = []
+    nodes = 0
+    search_time = 0.0
+    for _ in range(games):
+        game = NFLGame(game_mode="vs_computer", catalog=catalog, difficulty=difficulty)
+        game.start_game(game_mode="vs_computer")
+        for _ in range(moves):
+            letter = game.next_required_letter
+            start = time.perf_counter()
+            if depth == 0:
+                player = game._pick_unused_player(letter)
+            else:
+                search = LookaheadSearch(game.chain, depth, budget)
+                next_letter = search.choose(letter)
+                player = game._pick_unused_player(letter, next_letter) if next_letter else None
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            if depth:
+                nodes += search.nodes
+                search_time += elapsed
+            if player is None:
+                break
+            game._mark_used(player, "computer")
+            game.next_required_letter = name_initial(player["lastName"])
+    latencies.sort()
+    return {
+        "difficulty": difficulty,
+        "moves": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "nodes_per_sec": nodes / search_time if search_time else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=50)
+    parser.add_argument('--moves', type=int, default=40, help="most computer moves per game")
+    parser.add_argument('--budget-ms', type=float, default=20.0, help="search time budget per move")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--players', default=default_players_path())
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    catalog = PlayerCatalog.from_file(args.players)
+    results = [play(catalog, difficulty, args.games, args.moves, args.budget_ms / 1000)
+               for difficulty in DIFFICULTY_DEPTHS]
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    print(f"players={len(catalog)} games={args.games} moves={args.moves} budget={args.budget_ms}ms")
+    print(f"{'difficulty':<10} {'moves':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'nodes/s':>10}")
+    for row in results:
+        print(f"{row['difficulty']:<10} {row['moves']:>7} {row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+              f"{row['max_ms']:>8.2f} {row['nodes_per_sec']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Compare concurrent-request capacity of the sync (gunicorn) and ASGI (uvicorn) servers.
+
+For each level in --slow-clients, that many connections trickle a request
+body one byte at a time for the whole run, like clients on a bad network,
+while --clients connections send normal /start_game requests back to back.
+A sync worker is tied up by each slow connection it accepts, while the ASGI
+server keeps serving everyone else in the meantime.
+
+    python benchmarks/bench_serving.py --workers 2 --slow-clients 0 2 8 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from common import ROOT, default_players_path, percentile
+
+SERVERS = {
+    "sync": ["gunicorn", "--workers", "{workers}", "--bind", "127.0.0.1:{port}", "frontend.app:app"],
+    "asgi": ["uvicorn", "--workers", "{workers}", "--host", "127.0.0.1", "--port", "{port}",
+             "--log-level", "warning", "frontend.asgi:app"],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, workers, players_path):
+    port = free_port()
+    command = [arg.format(workers=workers, port=port) for arg in SERVERS[kind]]
+    env = dict(os.environ, PLAYER_DATA_PATH=players_path, LOGGING_LEVEL='WARNING')
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1) as sock:
+                sock.sendall(b"GET /health HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n")
+                if sock.recv(12).startswith(b"HTTP/1.1 200"):
+                    return process, port
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+async def one_request(port):
+    body = json.dumps({"game_mode": "solo"}).encode()
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b"POST /start_game HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n"
+                 b"Content-Type: application/json\r\n"
+                 + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = await reader.readline()
+    await reader.read()
+    writer.close()
+    if not status.startswith(b"HTTP/1.1 200"):
+        raise RuntimeError(f"Unexpected response: {status!r}")
+    return time.perf_counter() - start
+
+
+async def slow_client(port, stop_at, byte_interval):
+    """Hold a connection open by sending a request body one byte at a time."""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"POST /start_game HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n"
+                     b"Content-Type: application/json\r\nContent-Length: 100000\r\n\r\n")
+        while time.perf_counter() < stop_at:
+            writer.write(b" ")
+            await writer.drain()
+            await asyncio.sleep(byte_interval)
+        writer.close()
+    except OSError:
+        pass
+
+
+async def load(port, clients, slow_clients, duration, byte_interval, timeout):
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    stop_at = start + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            try:
+                latencies.append(await asyncio.wait_for(one_request(port), timeout))
+            except (OSError, RuntimeError, asyncio.TimeoutError):
+                errors += 1
+
+    slow = [asyncio.create_task(slow_client(port, stop_at, byte_interval)) for _ in range(slow_clients)]
+    # Give the slow connections a head start so they are accepted first
+    await asyncio.sleep(0.2)
+    await asyncio.gather(*(client() for _ in range(clients)))
+    await asyncio.gather(*slow)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "slow_clients": slow_clients,
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=4, help="connections sending normal requests")
+    parser.add_argument('--slow-clients', type=int, nargs='+', default=[0, 1, 8],
+                        help="numbers of slow connections to test with")
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--byte-interval', type=float, default=0.5,
+                        help="seconds between the bytes a slow client sends")
+    parser.add_argument('--timeout', type=float, default=2.0, help="per-request timeout in seconds")
+    parser.add_argument('--players', default=default_players_path())
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for kind in SERVERS:
+        process, port = start_server(kind, args.workers, args.players)
+        try:
+            results[kind] = [asyncio.run(load(port, args.clients, slow, args.duration,
+                                              args.byte_interval, args.timeout))
+                             for slow in args.slow_clients]
+        finally:
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    print(f"workers={args.workers} clients={args.clients} duration={args.duration}s")
+    print(f"{'server':<6} {'slow':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for kind, rows in results.items():
+        for row in rows:
+            print(f"{kind:<6} {row['slow_clients']:>7} {row['requests_per_sec']:>9.1f} "
+                  f"{row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import glob
+import os
+import resource
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(ROOT)
+
+
+def default_players_path():
+    """Return the player data the benchmarks run against.
+
+    Uses data/players.json when it exists, otherwise the newest full backup so
+    the numbers reflect a realistic ~20k-player catalog.
+    """
+    path = os.path.join(ROOT, 'data', 'players.json')
+    if os.path.exists(path):
+        return path
+    backups = sorted(glob.glob(os.path.join(ROOT, 'data', 'backups', 'nfl_players_backup_*.json')))
+    if backups:
+        return backups[-1]
+    return path
+
+
+def percentile(sorted_values, fraction):
+    """Return the value at a fraction (0-1) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(operation, iterations, setup=None):
+    """Time operation() iterations times and summarize the latencies.
+
+    setup(), when given, runs untimed before every call and its result is
+    passed to operation.
+    """
+    latencies = []
+    for _ in range(iterations):
+        if setup is None:
+            start = time.perf_counter()
+            operation()
+        else:
+            argument = setup()
+            start = time.perf_counter()
+            operation(argument)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "n": iterations,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p95_us": percentile(latencies, 0.95) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+        "ops_per_sec": iterations / total if total else 0.0,
+    }
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def compare(results, baseline, threshold):
+    """Return (name, baseline p50, current p50) for results whose p50 grew by more than threshold (0-1)."""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before or "p50_us" not in current or not before.get("p50_us"):
+            continue
+        if current["p50_us"] > before["p50_us"] * (1 + threshold):
+            regressions.append((name, before["p50_us"], current["p50_us"]))
+    return regressions
@@ -1,51 +1,237 @@
 import sys
 import os
 import logging
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables from .env file if present (local development only)
 if os.path.exists('.env'):
     load_dotenv()
 
-# Configure logging
-logging_level = os.environ.get('LOGGING_LEVEL', 'DEBUG')
-numeric_level = getattr(logging, logging_level.upper(), logging.DEBUG)
-logging.basicConfig(level=numeric_level)
-logger = logging.getLogger(__name__)
-
 # Add the parent directory to the path so we can import the backend module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Flask, render_template, request, jsonify, session
+from backend.logs import TRACE_HEADER, EventLog, configure_logging, start_trace
+
+# Configure logging
+configure_logging()
+logger = logging.getLogger(__name__)
+log_event = EventLog(logger)
+
+from flask import Flask, Response, g, render_template, request, jsonify, session
+from backend.events import HEARTBEAT_SECONDS, GameEventBus, format_event
 from backend.game import NFLGame
+from backend.http_cache import StaticPage, etag_matches
+from backend.opponent import DIFFICULTY_DEPTHS
+from backend.catalog import get_catalog, reload_catalog
+from backend.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from backend.profiling import profiler_from_env
+from backend.store import create_game_store
+from backend.timers import TurnTimerScheduler
 
 app = Flask(__name__)
 # Use environment variable for secret key in production
 app.secret_key = os.environ.get('SECRET_KEY', 'nfl_game_secret_key')  # For session management
 
-# Create a global game instance that persists between requests
-# This avoids having to serialize/deserialize the entire players database
-GAME_INSTANCES = {}
+# Load the player catalog once per worker; every game shares it by reference
+get_catalog()
+
+# The page has no template variables, so it is rendered and compressed once per worker.
+# Its URL isn't versioned, so browsers keep it for INDEX_CACHE_SECONDS and then revalidate.
+INDEX_CACHE_SECONDS = int(os.environ.get('INDEX_CACHE_SECONDS', 24 * 60 * 60))
+with app.app_context():
+    INDEX_PAGE = StaticPage(render_template('index.html').encode('utf-8'), 'text/html; charset=utf-8',
+                            INDEX_CACHE_SECONDS)
+
+# Polls of /game_state revalidate every time; an unchanged game answers 304
+GAME_STATE_CACHE_CONTROL = 'private, no-cache'
+
+# Reload the catalog automatically when the data file changes on disk
+WATCH_PLAYER_DATA = os.environ.get('PLAYER_DATA_WATCH', 'False').lower() == 'true'
+
+# Server-side store of running games, bounded so idle sessions can't exhaust memory.
+# GAME_STORE_URL selects a backend shared by all workers (see create_game_store)
+GAME_STORE = create_game_store(
+    os.environ.get('GAME_STORE_URL', 'memory://'),
+    max_games=int(os.environ.get('GAME_STORE_MAX_GAMES', 5000)),
+    idle_ttl=int(os.environ.get('GAME_IDLE_TTL', 2 * 60 * 60))
+)
+
+# Request and game metrics served from /metrics, kept per worker process
+REQUESTS = REGISTRY.counter('nfl_http_requests_total', 'HTTP requests by route, method and status',
+                            ('route', 'method', 'status'))
+REQUEST_SECONDS = REGISTRY.histogram('nfl_http_request_duration_seconds', 'Time to build a response, by route',
+                                     ('route',))
+GAME_RESULTS = REGISTRY.counter('nfl_game_results_total',
+                                'Answer and timeout results, by error_type ("none" for a correct answer)',
+                                ('error_type',))
+REGISTRY.gauge('nfl_games_live', 'Games in the game store', function=lambda: GAME_STORE.stats().get('live_games'))
+REGISTRY.gauge('nfl_catalog_players', 'Players in the shared catalog', function=lambda: len(get_catalog()))
+REGISTRY.gauge('nfl_catalog_load_seconds', 'Time the shared catalog took to load',
+               function=lambda: get_catalog().load_seconds)
+REGISTRY.gauge('nfl_catalog_rejected_records', 'Player records the shared catalog rejected, by reason',
+               ('reason',), function=lambda: {(reason,): count for reason, count in get_catalog().rejected.items()})
+REGISTRY.gauge('nfl_catalog_degraded', '1 while the shared catalog is degraded (see /health)',
+               function=lambda: int(get_catalog().degraded))
+
+# Opt-in request profiling (PROFILE_MODE / PROFILE_TOKEN); off by default
+PROFILER = profiler_from_env()
+PROFILE_HEADER = 'X-Profile'
+
+# Game updates pushed to clients connected to /events; a shared game store
+# relays them to the streams every worker holds
+EVENT_BUS = GameEventBus(relay=GAME_STORE.event_relay())
+# Seconds a sync worker keeps one /events stream open; the browser reconnects after
+EVENT_STREAM_SECONDS = int(os.environ.get('EVENT_STREAM_SECONDS', 300))
+
+def publish_result(session_id, result):
+    """Count an answer or timeout result and push it to the session's listeners."""
+    if isinstance(result, dict) and "valid" in result:
+        GAME_RESULTS.inc(result.get("error_type", "none"))
+    EVENT_BUS.publish_result(session_id, result)
+
+# Apply turn timeouts in the background even when the client stops polling
+TURN_TIMER_SWEEP = os.environ.get('TURN_TIMER_SWEEP', 'True').lower() == 'true'
+TURN_TIMER = TurnTimerScheduler(GAME_STORE, listener=publish_result) if TURN_TIMER_SWEEP else None
+
+def current_catalog():
+    """Return the shared catalog, reloading it first if the data file changed."""
+    catalog = get_catalog()
+    if WATCH_PLAYER_DATA and catalog.is_stale():
+        logger.info("Player data file changed, reloading catalog")
+        catalog = reload_catalog()
+    return catalog
+
+def update_game(session_id, action):
+    """Apply action(game) to the session's game through the store.
+    Returns (game, result), or (None, None) if the session has no game."""
+    if not session_id:
+        return None, None
+    game, result = GAME_STORE.update(session_id, action)
+    schedule_turn_timer(session_id, game)
+    publish_result(session_id, result)
+    return game, result
+
+def schedule_turn_timer(session_id, game):
+    """Have the sweeper check the game again when its current turn times out."""
+    if TURN_TIMER is not None:
+        TURN_TIMER.schedule_game(session_id, game)
+
+def last_event_id(value):
+    """Parse a Last-Event-ID header, returning None if it is missing or malformed."""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+def event_chunks(session_id, last_id):
+    """Return (chunks, last_id) for the session's events after last_id."""
+    events, complete = EVENT_BUS.since(session_id, last_id)
+    chunks = [] if complete else [format_event("resync", {})]
+    for event_id, event, data in events:
+        chunks.append(format_event(event, data, event_id))
+        last_id = event_id
+    return chunks, last_id
+
+def no_game_error(session_id):
+    """Return (body, status) for a session without a running game."""
+    if session_id and GAME_STORE.was_evicted(session_id):
+        logger.info("Game expired for session_id: %s", session_id)
+        return {"error": "Your game expired. Please start a new game.", "error_type": "expired"}, 410
+    logger.warning("No game found for session_id: %s", session_id)
+    return {"error": "No active game. Please start a new game."}, 400
+
+def no_game_response(session_id):
+    """Return the error response for a session without a running game."""
+    body, status = no_game_error(session_id)
+    return jsonify(body), status
+
+@app.before_request
+def start_request():
+    g.request_started = time.perf_counter()
+    g.trace_id = start_trace(request.headers.get(TRACE_HEADER))
+
+@app.after_request
+def record_request(response):
+    """Count the request and its latency under its route, not its raw path."""
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, route)
+    REQUESTS.inc(route, request.method, str(response.status_code))
+    response.headers[TRACE_HEADER] = g.trace_id
+    return response
+
+# The profiling hooks also run for the requests frontend/asgi.py hands to this app,
+# on the worker thread serving each one; unless profiling is configured they only
+# check PROFILER.enabled
+@app.before_request
+def start_profile():
+    if PROFILER.enabled and PROFILER.wants(request.headers.get(PROFILE_HEADER)):
+        g.profile = PROFILER.start(request.url_rule.rule if request.url_rule else 'unmatched')
+
+@app.teardown_request
+def stop_profile(exc):
+    PROFILER.stop(g.pop('profile', None))
+
+@app.route('/admin/profile')
+def admin_profile():
+    """Serve the last profiling window as collapsed stacks, or as pstats text with ?format=pstats.
+    Needs the PROFILE_TOKEN in an X-Profile header; ?flush=1 includes the window in progress."""
+    if not PROFILER.token or request.headers.get(PROFILE_HEADER) != PROFILER.token:
+        return jsonify({"error": "Not found."}), 404
+    report = PROFILER.report(flush=request.args.get('flush', '').lower() in ('1', 'true'))
+    body = report["pstats"] if request.args.get('format') == 'pstats' else report["collapsed"]
+    response = Response(body, mimetype='text/plain')
+    response.headers['X-Profile-Window-Start'] = str(int(report["window_start"]))
+    response.headers['X-Profile-Requests'] = str(report["requests"])
+    return response
+
+def health_report():
+    """Return (body, status) for /health: 503 while the player catalog is degraded.
+
+    A catalog is degraded when it had to use the fallback players, stopped
+    reading early, or rejected too many records, so a broken deploy fails
+    its readiness check instead of serving an unplayable game.
+    """
+    catalog = get_catalog()
+    status = "degraded" if catalog.degraded else "healthy"
+    body = {"status": status, "games": GAME_STORE.stats(), "catalog": catalog.health()}
+    return body, 503 if catalog.degraded else 200
 
 # Health check endpoint for Render
 @app.route('/health')
 def health_check():
-    """Simple health check endpoint for monitoring."""
-    return jsonify({"status": "healthy"}), 200
+    """Readiness check for monitoring and the load balancer."""
+    body, status = health_report()
+    return jsonify(body), status
+
+@app.route('/metrics')
+def metrics():
+    """Request, game and catalog metrics in the Prometheus text format."""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
 
 @app.route('/')
 def index():
-    """Render the main game page."""
-    return render_template('index.html')
+    """Serve the main game page, pre-rendered and compressed."""
+    if app.debug:
+        # Pick up template edits while developing
+        return render_template('index.html')
+    status, body, headers = INDEX_PAGE.response(request.headers.get('Accept-Encoding'),
+                                                request.headers.get('If-None-Match'))
+    return Response(body, status=status, content_type=INDEX_PAGE.content_type, headers=headers)
 
 @app.route('/start_game', methods=['POST'])
 def start_game():
     """Start a new game and return the initial state."""
     # Get the requested game mode
     game_mode = request.json.get('game_mode', 'solo')
+    # How far ahead the computer looks in vs_computer mode
+    difficulty = request.json.get('difficulty', 'easy')
+    if difficulty not in DIFFICULTY_DEPTHS:
+        return jsonify({"error": f"Unknown difficulty: {difficulty}"}), 400
     
     # Create a new game instance with the specified mode
-    game = NFLGame(game_mode=game_mode)
+    game = NFLGame(game_mode=game_mode, catalog=current_catalog(), difficulty=difficulty)
     game_state = game.start_game(game_mode=game_mode)
     
     # Generate a unique session ID if not already present
@@ -53,9 +239,10 @@ def start_game():
         import uuid
         session['session_id'] = str(uuid.uuid4())
     
-    # Store the game instance in our server-side dictionary
+    # Store the game instance in our server-side store
     session_id = session['session_id']
-    GAME_INSTANCES[session_id] = game
+    GAME_STORE.put(session_id, game)
+    schedule_turn_timer(session_id, game)
     
     return jsonify(game_state)
 
@@ -64,60 +251,135 @@ def submit_answer():
     """Submit a player name and get the result."""
     # Get the player name from the request
     player_name = request.json.get('player_name', '')
-    logger.debug(f"Received answer: {player_name}")
-    
-    # Get the session ID
+    # history_version of the client's last response, so only new history is sent back
+    since = request.json.get('since')
+    # Submit the answer to this session's game and get the result
     session_id = session.get('session_id')
-    if not session_id or session_id not in GAME_INSTANCES:
-        logger.warning(f"No game found for session_id: {session_id}")
-        return jsonify({"error": "No active game. Please start a new game."}), 400
-    
-    # Get the game instance
-    game = GAME_INSTANCES[session_id]
-    
-    # Submit the answer and get the result
     try:
-        result = game.submit_answer(player_name)
-        logger.debug(f"Result: {result}")
+        game, result = update_game(session_id, lambda game: game.submit_answer(player_name, since))
+        if game is None:
+            return no_game_response(session_id)
+        log_event("submit_answer", logging.DEBUG, valid=result.get("valid"), error_type=result.get("error_type"),
+               lives=result.get("lives"))
         return jsonify(result)
     except Exception as e:
         logger.exception(f"Error processing answer: {e}")
         return jsonify({"error": "An error occurred processing your answer."}), 500
 
+def game_state_poll(since, if_none_match):
+    """Return the store action for a /game_state request.
+    
+    The action applies any timeout that is due and returns (state, etag).
+    state is None when if_none_match already names the current state, so an
+    unchanged game is neither rebuilt nor encoded.
+    """
+    def poll(game):
+        game.expire_turns()
+        etag = game.state_etag(since)
+        if etag_matches(if_none_match, etag):
+            return None, etag
+        return game.get_game_state(since), etag
+    return poll
+
 @app.route('/game_state', methods=['GET'])
 def get_game_state():
-    """Get the current game state."""
-    # Get the session ID
+    """Get the current game state, or 304 if the client's copy is current."""
+    # Get the game instance for this session
     session_id = session.get('session_id')
-    if not session_id or session_id not in GAME_INSTANCES:
-        return jsonify({"error": "No active game. Please start a new game."}), 400
+    # Goes through the store so a timeout applied while reading the state is saved
+    since = request.args.get('since')
+    game, polled = update_game(session_id, game_state_poll(since, request.headers.get('If-None-Match')))
+    if game is None:
+        return no_game_response(session_id)
     
-    # Get the game instance
-    game = GAME_INSTANCES[session_id]
-    
-    return jsonify(game.get_game_state())
+    state, etag = polled
+    response = Response(status=304) if state is None else jsonify(state)
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = GAME_STATE_CACHE_CONTROL
+    return response
 
 @app.route('/timer_expired', methods=['POST'])
 def timer_expired():
     """Handle timer expiration."""
-    # Get the session ID
+    # Handle timer expiration for this session's game
     session_id = session.get('session_id')
-    if not session_id or session_id not in GAME_INSTANCES:
-        logger.warning(f"No game found for session_id: {session_id}")
-        return jsonify({"error": "No active game. Please start a new game."}), 400
-    
-    # Get the game instance
-    game = GAME_INSTANCES[session_id]
-    
-    # Handle timer expiration
     try:
-        result = game.timer_expired()
-        logger.debug(f"Timer expired result: {result}")
+        game, result = update_game(session_id, lambda game: game.timer_expired())
+        if game is None:
+            return no_game_response(session_id)
+        log_event("timer_expired", logging.DEBUG, lives=result.get("lives"), game_over=result.get("game_over"))
         return jsonify(result)
     except Exception as e:
         logger.exception(f"Error handling timer expiration: {e}")
         return jsonify({"error": "An error occurred processing the timer expiration."}), 500
 
+# Most autocomplete entries a /suggest request may ask for
+SUGGEST_MAX_LIMIT = 20
+
+def suggest_response(game, args):
+    """Build the /suggest body and Cache-Control header for a game and the query args."""
+    prefix = args.get('prefix', '')
+    try:
+        limit = min(max(int(args.get('limit', 8)), 1), SUGGEST_MAX_LIMIT)
+    except ValueError:
+        limit = 8
+    exclude_used = args.get('exclude_used', '').lower() in ('1', 'true')
+    body = {"prefix": prefix, "suggestions": game.suggest(prefix, limit, exclude_used)}
+    # Without exclude_used the entries only depend on the prefix, since a
+    # prefix can only start with the required letter while it's required
+    cache_control = 'no-store' if exclude_used else 'private, max-age=300'
+    return body, cache_control
+
+@app.route('/suggest', methods=['GET'])
+def suggest():
+    """Autocomplete a partly typed player name for the current turn."""
+    session_id = session.get('session_id')
+    game = GAME_STORE.get(session_id) if session_id else None
+    if game is None:
+        return no_game_response(session_id)
+    body, cache_control = suggest_response(game, request.args)
+    response = jsonify(body)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+@app.route('/events', methods=['GET'])
+def game_events():
+    """Stream this session's game updates as Server-Sent Events."""
+    session_id = session.get('session_id')
+    if not session_id or GAME_STORE.get(session_id) is None:
+        return no_game_response(session_id)
+    # Resume after the last event the browser saw, or start from now
+    last_id = last_event_id(request.headers.get('Last-Event-ID'))
+    if last_id is None:
+        last_id = EVENT_BUS.last_id(session_id)
+    
+    def stream(last_id):
+        wake = threading.Event()
+        EVENT_BUS.subscribe(session_id, wake.set)
+        try:
+            yield "retry: 2000\n\n"
+            closes_at = time.monotonic() + EVENT_STREAM_SECONDS
+            while True:
+                wake.clear()
+                chunks, last_id = event_chunks(session_id, last_id)
+                yield from chunks
+                # Pending events are always sent, so with EVENT_STREAM_SECONDS=0 the
+                # browser's reconnects poll instead of holding a sync worker
+                if time.monotonic() >= closes_at:
+                    return
+                if wake.wait(HEARTBEAT_SECONDS):
+                    continue
+                game = GAME_STORE.get(session_id)
+                if game is None:
+                    yield format_event("expired", {})
+                    return
+                yield format_event("tick", game.turn_status())
+        finally:
+            EVENT_BUS.unsubscribe(session_id, wake.set)
+    
+    return Response(stream(last_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 if __name__ == '__main__':
     # Use environment variables for production settings
     debug_mode = os.environ.get('DEBUG', 'True').lower() == 'true'
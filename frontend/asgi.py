@@ -0,0 +1,234 @@
+"""ASGI entry point serving the game on an async event loop.
+
+/events streams are served natively, so a held stream costs a coroutine
+instead of a worker thread. Every other request goes to the Flask app in
+frontend/app.py through a small WSGI bridge running on a worker thread, so
+the routes, request hooks (metrics, tracing, profiling), session cookie and
+error responses are Flask's own. Run it with:
+
+    uvicorn frontend.asgi:app
+    gunicorn -k uvicorn.workers.UvicornWorker frontend.asgi:app
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from http.cookies import SimpleCookie
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from itsdangerous import BadSignature
+from backend.events import HEARTBEAT_SECONDS, format_event
+from backend.logs import TRACE_HEADER, start_trace
+from frontend.app import (EVENT_BUS, GAME_STORE, REQUEST_SECONDS, REQUESTS, app as flask_app, current_catalog,
+                          event_chunks, last_event_id, no_game_error)
+
+# Read the same signed cookie the Flask app uses for its session
+SESSION_SERIALIZER = flask_app.session_interface.get_signing_serializer(flask_app)
+SESSION_COOKIE = flask_app.config['SESSION_COOKIE_NAME']
+SESSION_MAX_AGE = int(flask_app.permanent_session_lifetime.total_seconds())
+
+
+async def run_blocking(function, *args):
+    # Store backends may do network or disk I/O, so keep them off the event loop
+    return await asyncio.to_thread(function, *args)
+
+
+def wsgi_environ(scope, body):
+    """Build the WSGI environ for an ASGI HTTP scope and its complete body."""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        if key == 'CONTENT_LENGTH':
+            continue
+        if key != 'CONTENT_TYPE':
+            key = f"HTTP_{key}"
+        value = value.decode('latin-1')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def call_flask(scope, body):
+    """Run one request through the Flask app and return (status, headers, body).
+
+    Runs on a worker thread from start to close, so Flask's request hooks,
+    including the per-thread profiler, see the whole request.
+    """
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+    chunks = flask_app(wsgi_environ(scope, body), start_response)
+    try:
+        content = b''.join(chunks)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    return response['status'], response['headers'], content
+
+
+def session_id_of(headers):
+    """Return the session_id from the Flask session cookie in the request headers, or None."""
+    cookie = SimpleCookie(headers.get('cookie', ''))
+    morsel = cookie.get(SESSION_COOKIE)
+    if morsel is None:
+        return None
+    try:
+        return SESSION_SERIALIZER.loads(morsel.value, max_age=SESSION_MAX_AGE).get('session_id')
+    except BadSignature:
+        return None
+
+
+async def game_events(headers):
+    """Stream this session's game updates as Server-Sent Events.
+    Returns (status, content type, body), the body an async generator when streaming."""
+    session_id = session_id_of(headers)
+    game = await run_blocking(GAME_STORE.get, session_id) if session_id else None
+    if game is None:
+        body, status = await run_blocking(no_game_error, session_id)
+        return status, 'application/json', json.dumps(body).encode('utf-8')
+    # Resume after the last event the browser saw, or start from now
+    last_id = last_event_id(headers.get('last-event-id'))
+    if last_id is None:
+        last_id = EVENT_BUS.last_id(session_id)
+    return 200, 'text/event-stream', event_stream(session_id, last_id)
+
+
+async def event_stream(session_id, last_id):
+    """Yield the session's events as they are published, with a tick when idle."""
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+
+    def notify():
+        # Events are published from worker threads as well as the loop
+        loop.call_soon_threadsafe(wake.set)
+
+    EVENT_BUS.subscribe(session_id, notify)
+    try:
+        yield b"retry: 2000\n\n"
+        while True:
+            wake.clear()
+            chunks, last_id = event_chunks(session_id, last_id)
+            for chunk in chunks:
+                yield chunk.encode('utf-8')
+            try:
+                await asyncio.wait_for(wake.wait(), HEARTBEAT_SECONDS)
+                continue
+            except asyncio.TimeoutError:
+                pass
+            game = await run_blocking(GAME_STORE.get, session_id)
+            if game is None:
+                yield format_event("expired", {}).encode('utf-8')
+                return
+            yield format_event("tick", game.turn_status()).encode('utf-8')
+    finally:
+        EVENT_BUS.unsubscribe(session_id, notify)
+
+
+async def serve_events(scope, receive, send):
+    """Serve GET /events, counting it in the request metrics like Flask's routes."""
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+    started = time.perf_counter()
+    # run_blocking copies this task's context, and with it the trace, to its thread
+    trace_id = start_trace(headers.get(TRACE_HEADER.lower()))
+    status, content_type, body = await game_events(headers)
+    REQUEST_SECONDS.observe(time.perf_counter() - started, '/events')
+    REQUESTS.inc('/events', 'GET', str(status))
+
+    response_headers = [(b'content-type', content_type.encode()), (TRACE_HEADER.lower().encode(), trace_id.encode())]
+    if isinstance(body, bytes):
+        response_headers.append((b'content-length', str(len(body)).encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': body})
+        return
+    response_headers += [(b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')]
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send_stream(body, receive, send)
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            current_catalog()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def send_stream(body, receive, send):
+    """Send chunks from an async generator until it ends or the client disconnects."""
+    async def until_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    disconnected = asyncio.ensure_future(until_disconnect())
+    try:
+        while True:
+            # Wait for the next chunk or the disconnect, whichever comes first
+            next_chunk = asyncio.ensure_future(body.__anext__())
+            await asyncio.wait({next_chunk, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_chunk.done():
+                next_chunk.cancel()
+                await asyncio.gather(next_chunk, return_exceptions=True)
+                return
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnected.cancel()
+        await body.aclose()
+
+
+async def app(scope, receive, send):
+    """ASGI application."""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    if scope['method'] == 'GET' and scope['path'] == '/events':
+        await read_body(receive)
+        await serve_events(scope, receive, send)
+        return
+    status, headers, body = await run_blocking(call_flask, scope, await read_body(receive))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
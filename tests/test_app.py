@@ -0,0 +1,183 @@
+import unittest
+import sys
+import os
+import gzip
+
+# Add the parent directory to the path so we can import the frontend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import catalog as catalog_module
+from backend.catalog import PlayerCatalog, set_catalog
+from frontend import app as app_module
+
+PLAYERS = [
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Brett", "lastName": "Favre", "position": "QB", "team": "GB", "college": "Southern Miss"},
+    {"firstName": "Fran", "lastName": "Tarkenton", "position": "QB", "team": "MIN", "college": "Georgia"},
+]
+
+
+class TestRoutes(unittest.TestCase):
+    def setUp(self):
+        """Set up a test client over a small catalog and an empty game store."""
+        self.previous_catalog = catalog_module._catalog
+        set_catalog(PlayerCatalog(PLAYERS))
+        self.store = app_module.GAME_STORE
+        self.store.clear()
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        set_catalog(self.previous_catalog)
+        self.store.clear()
+
+    def start_game(self, game_mode="solo"):
+        response = self.client.post('/start_game', json={"game_mode": game_mode})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_submit_answer_round_trip(self):
+        """Test that a started game accepts answers through the store."""
+        state = self.start_game()
+        self.assertEqual(len(self.store), 1)
+        response = self.client.post('/submit_answer', json={"player_name": "Nobody Here"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("error_type", response.get_json())
+        self.assertEqual(self.client.get('/game_state').get_json()["lives"], state["lives"])
+
+    def test_start_game_difficulty(self):
+        """Test that vs_computer games keep their difficulty and unknown ones are rejected."""
+        response = self.client.post('/start_game', json={"game_mode": "vs_computer", "difficulty": "hard"})
+        self.assertEqual(response.status_code, 200)
+        with self.client.session_transaction() as session:
+            self.assertEqual(self.store.get(session['session_id']).difficulty, "hard")
+        response = self.client.post('/start_game', json={"game_mode": "vs_computer", "difficulty": "expert"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_metrics(self):
+        """Test that /metrics reports route latency and answer results by error type."""
+        self.start_game()
+        self.client.post('/submit_answer', json={"player_name": "Tom"})
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        text = response.get_data(as_text=True)
+        self.assertIn('nfl_http_requests_total{route="/start_game",method="POST",status="200"}', text)
+        self.assertIn('nfl_http_request_duration_seconds_count{route="/submit_answer"}', text)
+        self.assertIn('nfl_game_results_total{error_type="format"}', text)
+        self.assertIn('nfl_games_live 1', text)
+        self.assertIn('nfl_catalog_players 3', text)
+
+    def test_health_reports_catalog(self):
+        """Test that /health is ready with a good catalog and answers 503 with a degraded one."""
+        response = self.client.get('/health')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["catalog"]["players"], 3)
+        catalog = PlayerCatalog(PLAYERS + ["not a player"])
+        set_catalog(catalog)
+        response = self.client.get('/health')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()["status"], "degraded")
+        self.assertEqual(response.get_json()["catalog"]["rejected"], {"not_an_object": 1})
+
+    def test_trace_id(self):
+        """Test that a client's request ID is echoed back and one is made up otherwise."""
+        response = self.client.get('/health', headers={"X-Request-ID": "abc-123"})
+        self.assertEqual(response.headers["X-Request-ID"], "abc-123")
+        self.assertEqual(len(self.client.get('/health').headers["X-Request-ID"]), 16)
+
+    def test_no_game(self):
+        """Test that a session without a game gets a 400."""
+        response = self.client.post('/submit_answer', json={"player_name": "Tom Brady"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_expired_game(self):
+        """Test that an evicted game reports that it expired."""
+        self.start_game()
+        with self.client.session_transaction() as session:
+            session_id = session['session_id']
+        self.store._evict(session_id, "idle")
+        for response in (self.client.get('/game_state'),
+                         self.client.post('/timer_expired'),
+                         self.client.post('/submit_answer', json={"player_name": "Tom Brady"})):
+            self.assertEqual(response.status_code, 410)
+            self.assertEqual(response.get_json()["error_type"], "expired")
+
+    def test_suggest(self):
+        """Test that /suggest completes names for the current letter with cache headers."""
+        self.assertEqual(self.client.get('/suggest?prefix=t').status_code, 400)
+        self.start_game()
+        with self.client.session_transaction() as session:
+            game = self.store.get(session['session_id'])
+        game.next_required_letter = "T"
+
+        response = self.client.get('/suggest?prefix=to')
+        self.assertEqual(response.headers['Cache-Control'], 'private, max-age=300')
+        self.assertEqual([entry["answer"] for entry in response.get_json()["suggestions"]], ["Tom Brady"])
+        self.assertEqual(self.client.get('/suggest?prefix=br').get_json()["suggestions"], [])
+
+        game._mark_used(game.players[0], "player")
+        response = self.client.get('/suggest?prefix=to&exclude_used=1&limit=bad')
+        self.assertEqual(response.headers['Cache-Control'], 'no-store')
+        self.assertEqual(response.get_json()["suggestions"], [])
+
+    def test_game_state_etag(self):
+        """Test that an unchanged game answers a poll with its ETag with an empty 304."""
+        self.start_game()
+        response = self.client.get('/game_state')
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+        response = self.client.get('/game_state', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+        self.client.post('/timer_expired')
+        response = self.client.get('/game_state', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["lives"], 2)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_index_is_precompressed(self):
+        """Test that the page is served gzipped with a long max-age and revalidates with a 304."""
+        plain = self.client.get('/')
+        self.assertEqual(plain.status_code, 200)
+        self.assertIn('max-age=86400', plain.headers['Cache-Control'])
+        response = self.client.get('/', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        self.assertLess(len(response.data), len(plain.data) // 3)
+        response = self.client.get('/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+    def test_event_stream(self):
+        """Test that /events replays a timeout published since the client's last event."""
+        self.assertEqual(self.client.get('/events').status_code, 400)
+        self.start_game()
+        self.client.post('/timer_expired')
+        response = self.client.get('/events', headers={'Last-Event-ID': '0'})
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        chunks = iter(response.response)
+        self.assertTrue(next(chunks).startswith(b'retry:'))
+        event = next(chunks).decode()
+        response.close()
+        self.assertIn('event: life_lost', event)
+        self.assertIn('"lives": 2', event)
+
+    def test_event_stream_without_hold(self):
+        """Test that with EVENT_STREAM_SECONDS=0 a stream sends pending events and ends."""
+        self.start_game()
+        self.client.post('/timer_expired')
+        previous = app_module.EVENT_STREAM_SECONDS
+        app_module.EVENT_STREAM_SECONDS = 0
+        try:
+            response = self.client.get('/events', headers={'Last-Event-ID': '0'})
+            chunks = list(response.response)
+        finally:
+            app_module.EVENT_STREAM_SECONDS = previous
+        self.assertEqual(len(chunks), 2)
+        self.assertIn('event: life_lost', chunks[1].decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+import sys
+import os
+import asyncio
+import json
+
+# Add the parent directory to the path so we can import the frontend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import catalog as catalog_module
+from backend.catalog import PlayerCatalog, set_catalog
+from backend.profiling import RequestProfiler
+from frontend import app as app_module
+from frontend.asgi import app as asgi_app
+
+PLAYERS = [
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Brett", "lastName": "Favre", "position": "QB", "team": "GB", "college": "Southern Miss"},
+    {"firstName": "Fran", "lastName": "Tarkenton", "position": "QB", "team": "MIN", "college": "Georgia"},
+]
+
+
+def call(method, path, body=None, cookie=None, headers=()):
+    """Send one request through the ASGI app and return (status, headers, body)."""
+    headers = [(b'content-type', b'application/json')] + [(name.encode(), value.encode()) for name, value in headers]
+    if cookie:
+        headers.append((b'cookie', cookie.encode()))
+    path, _, query = path.partition('?')
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(), 'headers': headers}
+    incoming = [{'type': 'http.request', 'body': json.dumps(body).encode() if body is not None else b''}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    response_headers = {name.decode(): value.decode() for name, value in sent[0]['headers']}
+    return sent[0]['status'], response_headers, sent[1]['body']
+
+
+class TestASGIApp(unittest.TestCase):
+    def setUp(self):
+        """Use a small catalog and an empty game store."""
+        self.previous_catalog = catalog_module._catalog
+        set_catalog(PlayerCatalog(PLAYERS))
+        app_module.GAME_STORE.clear()
+
+    def tearDown(self):
+        set_catalog(self.previous_catalog)
+        app_module.GAME_STORE.clear()
+
+    def test_game_flow(self):
+        """Test that a session started over ASGI keeps its game across requests."""
+        status, headers, body = call('POST', '/start_game', {"game_mode": "solo"})
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["lives"], 3)
+        cookie = headers['set-cookie'].split(';')[0]
+
+        status, _, body = call('POST', '/timer_expired', cookie=cookie)
+        self.assertEqual(json.loads(body)["lives"], 2)
+        status, _, body = call('GET', '/game_state', cookie=cookie)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["lives"], 2)
+
+        status, _, body = call('POST', '/submit_answer', {"player_name": "Nobody"}, cookie=cookie)
+        self.assertEqual(json.loads(body)["error_type"], "format")
+
+    def test_session_is_shared_with_flask(self):
+        """Test that the Flask app accepts the session cookie set over ASGI."""
+        _, headers, _ = call('POST', '/start_game', {"game_mode": "solo"})
+        name, value = headers['set-cookie'].split(';')[0].split('=', 1)
+        client = app_module.app.test_client()
+        client.set_cookie(name, value)
+        self.assertEqual(client.get('/game_state').status_code, 200)
+
+    def test_flask_routes_and_hooks(self):
+        """Test that requests other than /events get the Flask app's own responses and hooks."""
+        _, headers, _ = call('POST', '/start_game', {"game_mode": "solo"})
+        cookie = headers['set-cookie'].split(';')[0]
+        status, headers, body = call('GET', '/suggest?prefix=Tom', cookie=cookie)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["prefix"], "Tom")
+        self.assertEqual(headers['cache-control'], 'private, max-age=300')
+        self.assertIn('x-request-id', headers)
+        status, headers, body = call('GET', '/metrics')
+        self.assertIn(b'route="/suggest"', body)
+
+    def test_profiled_request(self):
+        """Test that a request sent with the profiling token through ASGI shows up in /admin/profile."""
+        previous = app_module.PROFILER
+        app_module.PROFILER = RequestProfiler(token="secret")
+        try:
+            self.assertEqual(call('GET', '/admin/profile', headers=[('X-Profile', 'wrong')])[0], 404)
+            self.assertEqual(call('GET', '/health', headers=[('X-Profile', 'secret')])[0], 200)
+            call('GET', '/health')
+            status, headers, body = call('GET', '/admin/profile?flush=1&format=pstats',
+                                         headers=[('X-Profile', 'secret')])
+        finally:
+            app_module.PROFILER = previous
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['x-profile-requests'], '1')
+        self.assertIn(b'health_report', body)
+
+    def test_errors(self):
+        """Test the responses for missing games, unknown routes and bad bodies."""
+        self.assertEqual(call('GET', '/game_state')[0], 400)
+        self.assertEqual(call('GET', '/nope')[0], 404)
+        self.assertEqual(call('GET', '/submit_answer')[0], 405)
+        self.assertEqual(call('POST', '/start_game')[0], 400)
+        status, _, body = call('GET', '/events')
+        self.assertEqual((status, json.loads(body)["error"]), (400, "No active game. Please start a new game."))
+        status, headers, body = call('GET', '/')
+        self.assertEqual(status, 200)
+        self.assertIn(b'<html', body.lower())
+
+    def test_conditional_requests(self):
+        """Test that game state and the page answer a matching If-None-Match with an empty 304."""
+        _, headers, _ = call('POST', '/start_game', {"game_mode": "solo"})
+        cookie = headers['set-cookie'].split(';')[0]
+        status, headers, _ = call('GET', '/game_state', cookie=cookie)
+        self.assertEqual(status, 200)
+        status, headers, body = call('GET', '/game_state', cookie=cookie, headers=[('If-None-Match', headers['etag'])])
+        self.assertEqual((status, body), (304, b''))
+        self.assertNotIn('content-length', headers)
+
+        status, headers, body = call('GET', '/', headers=[('Accept-Encoding', 'gzip')])
+        self.assertEqual((status, headers['content-encoding']), (200, 'gzip'))
+        self.assertEqual(int(headers['content-length']), len(body))
+        status, _, body = call('GET', '/', headers=[('If-None-Match', headers['etag']), ('Accept-Encoding', 'gzip')])
+        self.assertEqual((status, body), (304, b''))
+
+    def test_event_stream(self):
+        """Test that /events streams a published timeout until the client disconnects."""
+        _, headers, _ = call('POST', '/start_game', {"game_mode": "solo"})
+        cookie = headers['set-cookie'].split(';')[0]
+        call('POST', '/timer_expired', cookie=cookie)
+        scope = {'type': 'http', 'method': 'GET', 'path': '/events',
+                 'headers': [(b'cookie', cookie.encode()), (b'last-event-id', b'0')]}
+        sent = []
+
+        async def run():
+            disconnect = asyncio.Event()
+            first = True
+
+            async def receive():
+                nonlocal first
+                if first:
+                    first = False
+                    return {'type': 'http.request', 'body': b''}
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+                if b'life_lost' in message.get('body', b''):
+                    disconnect.set()
+
+            await asyncio.wait_for(asgi_app(scope, receive, send), 5)
+
+        asyncio.run(run())
+        response_headers = dict(sent[0]['headers'])
+        self.assertEqual(response_headers[b'content-type'], b'text/event-stream')
+        body = b''.join(message.get('body', b'') for message in sent[1:])
+        self.assertIn(b'event: life_lost', body)
+
+
+if __name__ == "__main__":
+    unittest.main()
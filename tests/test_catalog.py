@@ -0,0 +1,129 @@
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import catalog as catalog_module
+from backend.catalog import (PlayerCatalog, get_catalog, iter_json_array, new_clean_sets, reload_catalog, set_catalog,
+                             validate_player)
+from backend.game import NFLGame
+
+PLAYERS = [
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Brett", "lastName": "Favre", "position": "QB", "team": "GB", "college": "Southern Miss"},
+]
+
+
+class TestPlayerCatalog(unittest.TestCase):
+    def setUp(self):
+        """Write a small player file and remember the current shared catalog."""
+        self.previous = catalog_module._catalog
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'players.json')
+        with open(self.path, 'w') as file:
+            json.dump(PLAYERS, file)
+
+    def tearDown(self):
+        set_catalog(self.previous)
+        self.tmpdir.cleanup()
+
+    def test_games_share_catalog(self):
+        """Test that games reference the shared catalog instead of reloading it."""
+        set_catalog(PlayerCatalog.from_file(self.path))
+        first = NFLGame()
+        second = NFLGame(game_mode="vs_computer")
+        self.assertIs(first.catalog, get_catalog())
+        self.assertIs(first.players, second.players)
+        self.assertEqual(len(first.players), 2)
+
+    def test_reload_keeps_running_games(self):
+        """Test that reloading swaps the catalog only for new games."""
+        set_catalog(PlayerCatalog.from_file(self.path))
+        game = NFLGame()
+        with open(self.path, 'w') as file:
+            json.dump(PLAYERS[:1], file)
+        new_catalog = reload_catalog(self.path)
+        self.assertIs(get_catalog(), new_catalog)
+        self.assertEqual(len(game.players), 2)
+        self.assertEqual(len(NFLGame().players), 1)
+
+    def test_is_stale(self):
+        """Test that a catalog notices when its data file changes."""
+        catalog = PlayerCatalog.from_file(self.path)
+        self.assertFalse(catalog.is_stale())
+        os.utime(self.path, (0, 0))
+        self.assertTrue(catalog.is_stale())
+
+    def test_missing_file_uses_fallback(self):
+        """Test that a missing data file falls back to the built-in players."""
+        catalog = PlayerCatalog.from_file(os.path.join(self.tmpdir.name, 'missing.json'))
+        self.assertIsNone(catalog.source)
+        self.assertEqual(len(catalog), 3)
+        self.assertFalse(catalog.is_stale())
+        self.assertTrue(catalog.degraded)
+        self.assertTrue(catalog.health()["fallback"])
+
+    def test_clean_catalog_is_not_degraded(self):
+        """Test that a good data file loads as is and reports its load time."""
+        catalog = PlayerCatalog.from_file(self.path)
+        self.assertFalse(catalog.degraded)
+        self.assertEqual(catalog.normalized, 0)
+        self.assertEqual(catalog.health()["rejected"], {})
+        self.assertIsNotNone(catalog.health()["load_seconds"])
+
+    def test_validate_player(self):
+        """Test that names are cleaned up and records without both names are rejected."""
+        player, reason = validate_player({"firstName": " 'Omar ", "lastName": "Ellison",
+                                          "position": "wr", "team": "LAC", "college": "None"})
+        self.assertIsNone(reason)
+        self.assertEqual(player, {"firstName": "Omar", "lastName": "Ellison", "position": "WR",
+                                  "team": "LAC", "college": ""})
+        self.assertIs(validate_player(PLAYERS[0])[0], PLAYERS[0])
+        self.assertEqual(validate_player({"firstName": "'", "lastName": ""}), (None, "missing_name"))
+        self.assertEqual(validate_player({"lastName": "Brady"}), (None, "missing_name"))
+        self.assertEqual(validate_player({"firstName": "Tom", "lastName": " "}), (None, "missing_name"))
+        self.assertEqual(validate_player({"firstName": "", "lastName": "Brady"}, new_clean_sets()),
+                         (None, "missing_name"))
+        self.assertEqual(validate_player({"firstName": "Tom", "lastName": 12}), (None, "bad_value"))
+        self.assertEqual(validate_player(["Tom", "Brady"]), (None, "not_an_object"))
+
+    def test_rejected_records_degrade_catalog(self):
+        """Test that bad records are counted, left out, and mark the catalog degraded."""
+        with open(self.path, 'w') as file:
+            json.dump(PLAYERS + [{"firstName": "'Omar", "lastName": "Ellison"}, "Joe Montana",
+                                 {"position": "QB"}, {"firstName": "Gates", "lastName": ""}], file)
+        catalog = PlayerCatalog.from_file(self.path)
+        self.assertEqual([player["firstName"] for player in catalog], ["Tom", "Brett", "Omar"])
+        self.assertEqual(catalog.rejected, {"not_an_object": 1, "missing_name": 2})
+        self.assertEqual(catalog.normalized, 1)
+        self.assertTrue(catalog.degraded)
+        self.assertEqual(catalog.index.find(["Omar", "Ellison"]), (2, "exact"))
+
+    def test_truncated_file_keeps_players_read(self):
+        """Test that a file cut off partway keeps the players before the break but is degraded."""
+        with open(self.path, 'w') as file:
+            file.write(json.dumps(PLAYERS)[:-20])
+        catalog = PlayerCatalog.from_file(self.path)
+        self.assertEqual(len(catalog), 1)
+        self.assertFalse(catalog.fallback)
+        self.assertIsNotNone(catalog.error)
+        self.assertTrue(catalog.degraded)
+
+    def test_iter_json_array(self):
+        """Test that the streaming reader handles elements split across reads."""
+        text = ' [ {"a": [1, 2]} ,\n"x", 123 ] '
+        for chunk_size in (1, 3, 64):
+            self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size)), json.loads(text))
+        self.assertEqual(list(iter_json_array(io.StringIO('[]'))), [])
+        for bad in ('{}', '[1 2]', '[1,'):
+            with self.assertRaises(ValueError):
+                list(iter_json_array(io.StringIO(bad), 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
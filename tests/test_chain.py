@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog import PlayerCatalog
+from backend.game import NFLGame
+from backend.lookup import identity_key
+
+PLAYERS = [
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Tony", "lastName": "Romo", "position": "QB", "team": "DAL", "college": "Eastern Illinois"},
+    {"firstName": "Brett", "lastName": "Favre", "position": "QB", "team": "GB", "college": "Southern Miss"},
+    {"firstName": "Ryan", "lastName": "Tannehill", "position": "QB", "team": "", "college": "Texas A&M"},
+    {"firstName": "Fred", "lastName": "Xavier", "position": "WR", "team": "NYJ", "college": "Hofstra"},
+]
+
+
+class TestChainGraph(unittest.TestCase):
+    def setUp(self):
+        """Set up a game over a small catalog with a duplicate record and a dead end."""
+        self.catalog = PlayerCatalog(PLAYERS)
+        self.graph = self.catalog.chain
+        self.game = NFLGame(catalog=self.catalog)
+
+    def test_transitions(self):
+        """Test that edges and capacities count players by their initials."""
+        self.assertIs(self.catalog.chain, self.graph)
+        self.assertEqual(self.graph.edges[("T", "B")], [0, 1])
+        self.assertEqual(self.graph.transitions("T"), {"B": 2, "R": 1})
+        self.assertEqual(self.graph.capacity["T"], 3)
+        self.assertEqual(self.graph.transitions("Q"), {})
+
+    def test_counts_follow_used_players(self):
+        """Test that using a player takes every record with its identity out of the counts once."""
+        self.assertEqual(self.game.moves_remaining("T"), 3)
+        self.game._mark_used(self.game.players[0], "player")
+        self.game._mark_used(self.game.players[1], "player")
+        self.assertEqual(self.game.moves_remaining("T"), 1)
+        self.assertEqual(self.game.chain.edge_remaining("T", "B"), 0)
+        self.assertEqual(self.game.chain.next_letters("T"), {"R": 1})
+
+        # A record missing its team is never used up
+        self.game._mark_used(self.game.players[4], "player")
+        self.assertEqual(self.game.moves_remaining("R"), 1)
+
+    def test_reachability_and_dead_ends(self):
+        """Test that reachability follows open edges and empty letters are dead ends."""
+        self.assertEqual(self.game.chain.reachable("T"), {"T", "B", "R", "F", "X"})
+        self.assertEqual(self.game.chain.dead_ends(), ["X"])
+        self.game._mark_used(self.game.players[2], "player")
+        self.game._mark_used(self.game.players[0], "player")
+        self.assertEqual(self.game.chain.reachable("T"), {"T"})
+        self.assertEqual(self.game.chain.dead_ends(), ["T", "X"])
+
+    def test_computer_skips_dead_end(self):
+        """Test that the computer gives up on an exhausted letter and the counts survive a snapshot."""
+        self.game.next_required_letter = "B"
+        self.game._mark_used(self.game.players[3], "player")
+        self.assertIsNone(self.game._pick_unused_player("B"))
+        self.assertFalse(self.game.computer_turn()["success"])
+
+        restored = NFLGame.from_dict(self.game.to_dict(), catalog=self.catalog)
+        self.assertEqual(restored.moves_remaining("B"), 0)
+        restored.start_game()
+        key = identity_key(restored.current_player)
+        self.assertEqual(sum(restored.chain.used_by_letter.values()), len(self.graph.ids_by_key.get(key, ())))
+
+
+if __name__ == "__main__":
+    unittest.main()
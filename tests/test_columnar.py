@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog import PlayerCatalog
+from backend.columnar import ColumnarPlayers, PlayerView, write_columnar
+from backend.game import NFLGame
+
+PLAYERS = [
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "NE", "college": "Michigan"},
+    {"firstName": "Amon-Ra St.", "lastName": "Brown", "position": "WR", "team": "DET", "college": "USC"},
+    {"firstName": "Zoë", "lastName": "Ångström", "position": "K", "team": ""},
+]
+
+
+class TestColumnarCatalog(unittest.TestCase):
+    def setUp(self):
+        """Write the same players as JSON and as a columnar catalog."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmpdir.name, 'players.json')
+        self.bin_path = os.path.join(self.tmpdir.name, 'players.bin')
+        with open(self.json_path, 'w') as file:
+            json.dump(PLAYERS, file)
+        write_columnar(PLAYERS, self.bin_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        """Test that every record reads back exactly, including missing fields."""
+        players = ColumnarPlayers(self.bin_path)
+        self.assertEqual(len(players), len(PLAYERS))
+        self.assertEqual([dict(p) for p in players], PLAYERS)
+        self.assertNotIn("college", players[3])
+        self.assertEqual(players[3].get("college", "Unknown"), "Unknown")
+        self.assertEqual(players[-1]["firstName"], "Zoë")
+
+    def test_records_decode_in_bulk(self):
+        """Test that records() yields the same dicts as reading every view."""
+        players = ColumnarPlayers(self.bin_path)
+        self.assertEqual(list(players.records()), [dict(p) for p in players])
+
+    def test_columnar_file_needing_cleanup_is_copied(self):
+        """Test that a columnar catalog with dirty records loads cleaned, as plain dicts."""
+        write_columnar(PLAYERS + [{"firstName": "'Omar", "lastName": "Ellison", "team": "LAC", "position": "WR"}],
+                       self.bin_path)
+        catalog = PlayerCatalog.from_file(self.bin_path)
+        self.assertNotIsInstance(catalog.players, ColumnarPlayers)
+        self.assertEqual(catalog[4]["firstName"], "Omar")
+        self.assertEqual(catalog.normalized, 1)
+
+    def test_catalog_prefers_columnar_file(self):
+        """Test that a JSON path loads the memory-mapped catalog next to it."""
+        catalog = PlayerCatalog.from_file(self.json_path)
+        self.assertEqual(catalog.source, self.bin_path)
+        self.assertIsInstance(catalog[0], PlayerView)
+        self.assertEqual(catalog.version, PlayerCatalog(PLAYERS).version)
+
+    def test_corrupt_columnar_file_falls_back_to_json(self):
+        """Test that an unreadable columnar file falls back to the JSON data."""
+        with open(self.bin_path, 'wb') as file:
+            file.write(b"not a catalog")
+        catalog = PlayerCatalog.from_file(self.json_path)
+        self.assertEqual(catalog.source, self.json_path)
+        self.assertEqual(list(catalog), PLAYERS)
+
+    def test_game_over_columnar_catalog(self):
+        """Test that games play and snapshot against view-backed players."""
+        catalog = PlayerCatalog.from_file(self.bin_path)
+        game = NFLGame(catalog=catalog)
+        game.current_player = catalog[0]
+        game._mark_used(catalog[0], "starting")
+        game.next_required_letter = "T"
+        result = game.submit_answer("Tom Brady NE")
+        self.assertTrue(result["valid"])
+        self.assertEqual(game.current_player.player_id, 1)
+        self.assertTrue(game._is_player_used({"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "NE"}))
+
+        restored = NFLGame.from_dict(game.to_dict(), catalog=catalog)
+        self.assertEqual(restored.get_game_state(), game.get_game_state())
+
+
+if __name__ == "__main__":
+    unittest.main()
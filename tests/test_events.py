@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.events import GameEventBus, format_event, result_events
+
+
+class TestResultEvents(unittest.TestCase):
+    def test_valid_answer_with_failed_computer_turn(self):
+        """Test that a computer miss becomes a move, a life lost and game over."""
+        computer = {"success": False, "message": "Computer couldn't find a player", "lives": 0, "game_over": True}
+        result = {"valid": True, "lives": 1, "game_over": False, "computer_turn": computer}
+        events = result_events(result)
+        self.assertEqual([event for event, _ in events], ["answer", "computer_move", "life_lost", "game_over"])
+        self.assertNotIn("computer_turn", events[0][1])
+        self.assertEqual(events[-1][1], {"lives": 0})
+
+    def test_only_state_changes_are_events(self):
+        """Test that rejected answers and plain state dicts publish nothing."""
+        self.assertEqual(result_events({"valid": False, "error_type": "not_found", "lives": 3}), [])
+        self.assertEqual(result_events({"lives": 3, "game_over": False}), [])
+        self.assertEqual(result_events(None), [])
+        timeout = {"valid": False, "error_type": "timeout", "lives": 2, "game_over": False}
+        self.assertEqual(result_events(timeout), [("life_lost", timeout)])
+
+    def test_format_event(self):
+        """Test the text/event-stream encoding."""
+        self.assertEqual(format_event("tick", {"lives": 3}, 7), 'id: 7\nevent: tick\ndata: {"lives": 3}\n\n')
+
+
+class TestGameEventBus(unittest.TestCase):
+    def setUp(self):
+        self.bus = GameEventBus(history=2)
+
+    def test_subscribers_are_woken(self):
+        """Test that publishing notifies only the session's listeners."""
+        woken = []
+        self.bus.subscribe("s1", lambda: woken.append("s1"))
+        self.bus.publish("s2", "tick", {})
+        event_id = self.bus.publish("s1", "life_lost", {"lives": 2})
+        self.assertEqual(woken, ["s1"])
+        self.assertEqual(self.bus.since("s1", 0), ([(event_id, "life_lost", {"lives": 2})], True))
+        self.assertEqual(self.bus.last_id("s1"), event_id)
+
+    def test_resync_after_history_overflow(self):
+        """Test that a client behind the kept history is told to resync."""
+        first = self.bus.publish("s1", "answer", {})
+        self.bus.publish("s1", "answer", {})
+        self.bus.publish("s1", "answer", {})
+        events, complete = self.bus.since("s1", 0)
+        self.assertFalse(complete)
+        self.assertEqual(len(events), 2)
+        self.assertTrue(self.bus.since("s1", first)[1])
+
+    def test_idle_channels_are_evicted(self):
+        """Test that channels without listeners don't accumulate past the limit."""
+        bus = GameEventBus(max_channels=2)
+        bus.subscribe("listening", lambda: None)
+        for session_id in ("a", "b", "c"):
+            bus.publish(session_id, "tick", {})
+        self.assertEqual(set(bus._channels), {"listening", "c"})
+
+
+if __name__ == "__main__":
+    unittest.main()
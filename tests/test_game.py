@@ -6,6 +6,10 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.game import NFLGame
+from backend.catalog import CatalogMismatchError, PlayerCatalog
+from backend.chain import ChainUsage
+import json
+import string
 
 class TestNFLGame(unittest.TestCase):
     def setUp(self):
@@ -106,5 +110,156 @@ class TestNFLGame(unittest.TestCase):
         self.assertEqual(self.game.lives, 0)
 
 
+class TestComputerTurn(unittest.TestCase):
+    def setUp(self):
+        """Set up a vs_computer game over a small fixed catalog."""
+        self.catalog = PlayerCatalog([
+            {"firstName": "Adam", "lastName": "Thielen", "position": "WR", "team": "CAR", "college": "Minnesota State"},
+            {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+            {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "NE", "college": "Michigan"},
+            {"firstName": "Peyton", "lastName": "Manning", "position": "QB", "team": "", "college": "Tennessee"},
+        ])
+        self.game = NFLGame(game_mode="vs_computer", catalog=self.catalog)
+        self.game.start_game(game_mode="vs_computer")
+        self.game.used_players = []
+        self.game.used_keys = set()
+        self.game.chain = ChainUsage(self.catalog.chain)
+    
+    def test_computer_uses_each_player_once(self):
+        """Test that the computer exhausts the candidates for a letter and then loses a life."""
+        picked = []
+        for _ in range(2):
+            self.game.next_required_letter = "T"
+            result = self.game.computer_turn()
+            self.assertTrue(result["success"])
+            picked.append(self.game.current_player["team"])
+        self.assertCountEqual(picked, ["TB", "NE"])
+        
+        self.game.next_required_letter = "T"
+        result = self.game.computer_turn()
+        self.assertFalse(result["success"])
+        self.assertEqual(self.game.lives, 2)
+    
+    def test_player_without_team_is_never_used(self):
+        """Test that a player with a position but no team can't be told apart from namesakes."""
+        for _ in range(2):
+            self.game.next_required_letter = "P"
+            self.assertTrue(self.game.computer_turn()["success"])
+        self.assertFalse(self.game._is_player_used(self.catalog[3]))
+    
+    def test_same_name_different_team_is_unused(self):
+        """Test that a namesake on another team is not treated as used."""
+        self.game._mark_used(self.catalog[1], "player")
+        self.assertTrue(self.game._is_player_used(dict(self.catalog[1])))
+        self.assertFalse(self.game._is_player_used(self.catalog[2]))
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        """Set up a vs_computer game over a catalog with a player for every letter pair."""
+        self.catalog = PlayerCatalog([
+            {"firstName": f"{first}ames", "lastName": f"{last}ones", "position": "WR", "team": "KC", "college": "Iowa"}
+            for first in string.ascii_uppercase for last in string.ascii_uppercase
+        ])
+        self.game = NFLGame(game_mode="vs_computer", catalog=self.catalog)
+        self.game.start_game(game_mode="vs_computer")
+        for _ in range(15):
+            self.game.computer_turn()
+        self.game.lives = 2
+    
+    def test_round_trip(self):
+        """Test that a snapshot restores the same game state."""
+        restored = NFLGame.from_dict(self.game.to_dict(), catalog=self.catalog)
+        self.assertEqual(restored.get_game_state(), self.game.get_game_state())
+        self.assertIs(restored.current_player, self.game.current_player)
+        self.assertEqual(restored.used_keys, self.game.used_keys)
+    
+    def test_snapshot_is_compact(self):
+        """Test that a snapshot references players instead of embedding the database."""
+        snapshot = json.dumps(self.game.to_dict())
+        self.assertLess(len(snapshot), 1024)
+        self.assertNotIn("players", self.game.to_dict())
+    
+    def test_catalog_mismatch_is_refused(self):
+        """Test that restoring against a different catalog raises."""
+        other = PlayerCatalog(list(self.catalog)[:-1])
+        with self.assertRaises(CatalogMismatchError):
+            NFLGame.from_dict(self.game.to_dict(), catalog=other)
+    
+    def test_legacy_dict_is_migrated(self):
+        """Test that the old format with full player records still restores."""
+        legacy = {
+            "players": list(self.catalog),
+            "used_players": [dict(p) for p in self.game.used_players],
+            "used_players_details": self.game.used_players_details,
+            "lives": self.game.lives,
+            "current_player": dict(self.game.current_player),
+            "next_required_letter": self.game.next_required_letter,
+            "game_over": False,
+            "game_mode": "vs_computer",
+            "turn": "player"
+        }
+        restored = NFLGame.from_dict(legacy, catalog=self.catalog)
+        # Old snapshots carry no deadline, so the restored game gets a fresh turn
+        self.assertIsNotNone(restored.turn_deadline)
+        restored.turn_deadline = self.game.turn_deadline
+        restored.game_id = self.game.game_id
+        self.assertEqual(restored.get_game_state(), self.game.get_game_state())
+        self.assertIs(restored.current_player, self.game.current_player)
+        self.assertEqual(restored.to_dict(), self.game.to_dict())
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        """Set up a solo game over a catalog with a player for every letter pair."""
+        self.catalog = PlayerCatalog([
+            {"firstName": f"{first}ames", "lastName": f"{last}ones", "position": "WR", "team": "KC", "college": "Iowa"}
+            for first in string.ascii_uppercase for last in string.ascii_uppercase
+        ])
+        self.game = NFLGame(catalog=self.catalog)
+        self.state = self.game.start_game()
+    
+    def answer(self):
+        letter = self.game.next_required_letter
+        last = "Z" if letter != "Z" else "Y"
+        return f"{letter}ames {last}ones"
+    
+    def test_full_history_without_version(self):
+        """Test that old clients still get the whole used player list."""
+        self.assertEqual(len(self.state["used_players_details"]), 1)
+        result = self.game.submit_answer(self.answer())
+        self.assertEqual(len(result["used_players_details"]), 2)
+        self.assertNotIn("used_players_added", result)
+    
+    def test_only_new_entries_since_version(self):
+        """Test that a client sending its last version gets only the new entries."""
+        result = self.game.submit_answer(self.answer(), since=self.state["history_version"])
+        self.assertNotIn("used_players_details", result)
+        self.assertEqual([d["turn"] for d in result["used_players_added"]], ["player"])
+        state = self.game.get_game_state(since=result["history_version"])
+        self.assertEqual(state["used_players_added"], [])
+    
+    def test_unknown_version_gets_full_history(self):
+        """Test that versions from another game or past the end force a full resync."""
+        count = len(self.game.used_players_details)
+        for since in (f"other:{count}", f"{self.game.game_id}:{count + 1}", f"{self.game.game_id}:x", 3):
+            self.assertIn("used_players_details", self.game.get_game_state(since=since))
+        restored = NFLGame.from_dict(self.game.to_dict(), catalog=self.catalog)
+        self.assertIn("used_players_added", restored.get_game_state(since=self.state["history_version"]))
+    
+    def test_state_etag(self):
+        """Test that the state ETag changes with the game and the history asked for, and survives a snapshot."""
+        etag = self.game.state_etag()
+        self.assertEqual(self.game.state_etag(), etag)
+        self.assertNotEqual(self.game.state_etag(since=self.state["history_version"]), etag)
+        self.game.submit_answer(self.answer())
+        self.assertNotEqual(self.game.state_etag(), etag)
+        etag = self.game.state_etag()
+        restored = NFLGame.from_dict(self.game.to_dict(), catalog=self.catalog)
+        self.assertEqual(restored.state_etag(), etag)
+        self.game.timer_expired()
+        self.assertNotEqual(self.game.state_etag(), etag)
+
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
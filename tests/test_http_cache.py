@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+import gzip
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.http_cache import StaticPage, etag_matches
+
+
+class TestEtagMatches(unittest.TestCase):
+    def test_weak_comparison(self):
+        """Test that If-None-Match lists, wildcards and W/ prefixes are matched."""
+        self.assertTrue(etag_matches('"a"', '"a"'))
+        self.assertTrue(etag_matches('"b", W/"a"', '"a"'))
+        self.assertTrue(etag_matches('"a"', 'W/"a"'))
+        self.assertTrue(etag_matches('*', 'W/"a"'))
+        self.assertFalse(etag_matches('"b"', '"a"'))
+        self.assertFalse(etag_matches(None, '"a"'))
+
+
+class TestStaticPage(unittest.TestCase):
+    def setUp(self):
+        """Build a page large enough to be compressed."""
+        self.body = b'<html>' + b'<p>NFL chain game</p>' * 200 + b'</html>'
+        self.page = StaticPage(self.body, 'text/html; charset=utf-8', 3600)
+
+    def test_negotiates_encoding(self):
+        """Test that gzip is served when accepted and the plain page otherwise."""
+        coding, body = self.page.select('br;q=0, gzip;q=0.5')
+        self.assertEqual(coding, 'gzip')
+        self.assertEqual(gzip.decompress(body), self.body)
+        self.assertEqual(self.page.select('gzip;q=0'), (None, self.body))
+        self.assertEqual(self.page.select(None), (None, self.body))
+
+    def test_response_headers_and_304(self):
+        """Test that each encoding has its own ETag and a matching one gets an empty 304."""
+        status, body, headers = self.page.response('gzip')
+        headers = dict(headers)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Cache-Control'], 'public, max-age=3600')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertNotEqual(headers['ETag'], self.page.etag(None))
+        self.assertEqual(self.page.response('gzip', headers['ETag'])[:2], (304, b''))
+        self.assertEqual(self.page.response(None, headers['ETag'])[0], 200)
+
+    def test_small_page_is_not_compressed(self):
+        """Test that tiny bodies are only kept uncompressed."""
+        page = StaticPage(b'ok', 'text/plain', 60)
+        self.assertEqual(page.select('gzip'), (None, b'ok'))
+        self.assertNotIn('Vary', dict(page.headers(None)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import json
+import logging
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.logs import EventLog, JsonFormatter, TextFormatter, TraceFilter, start_trace
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, formatter):
+        super().__init__()
+        self.lines = []
+        self.addFilter(TraceFilter())
+        self.setFormatter(formatter)
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        """Set up a logger that keeps its formatted JSON lines."""
+        self.logger = logging.getLogger('tests.logs')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.handler = ListHandler(JsonFormatter())
+        self.logger.handlers = [self.handler]
+        self.now = 100.0
+
+    def make_log(self, **kwargs):
+        return EventLog(self.logger, clock=lambda: self.now, **kwargs)
+
+    def test_json_event_with_trace(self):
+        """Test that events are written as JSON with their fields and the request's trace ID."""
+        trace_id = start_trace()
+        self.assertTrue(self.make_log()("answer", outcome="correct", chain=3))
+        line = json.loads(self.handler.lines[0])
+        self.assertEqual((line["message"], line["outcome"], line["chain"]), ("answer", "correct", 3))
+        self.assertEqual(line["trace_id"], trace_id)
+
+    def test_disabled_level_and_sampling(self):
+        """Test that disabled levels and a zero sample rate write nothing."""
+        log_event = self.make_log(sample_rates={"lookup": 0.0})
+        self.assertFalse(log_event("answer", logging.DEBUG, outcome="correct"))
+        self.assertFalse(log_event("lookup", strategy="exact"))
+        self.assertEqual(self.handler.lines, [])
+
+    def test_rate_limit_reports_dropped_lines(self):
+        """Test that an event over its per-second limit is dropped and the count reported later."""
+        log_event = self.make_log(rate_limit=2)
+        written = [log_event("answer") for _ in range(5)]
+        self.assertEqual(written, [True, True, False, False, False])
+        self.assertTrue(log_event("other"))
+        self.now += 1
+        self.assertTrue(log_event("answer"))
+        self.assertEqual(json.loads(self.handler.lines[-1])["dropped"], 3)
+
+    def test_text_format_and_trace_ids(self):
+        """Test that the text format appends fields and bad client trace IDs are replaced."""
+        self.handler.setFormatter(TextFormatter('[%(trace_id)s] %(message)s'))
+        self.assertEqual(start_trace("abc-123"), "abc-123")
+        self.make_log()("answer", outcome="format")
+        self.assertEqual(self.handler.lines[0], "[abc-123] answer outcome=format")
+        self.assertEqual(len(start_trace("x" * 500)), 16)
+        self.assertEqual(len(start_trace("bad\nid")), 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
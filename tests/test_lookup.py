@@ -0,0 +1,220 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog import PlayerCatalog
+from backend.fuzzy import TrigramIndex, edit_distance
+from backend.game import NFLGame
+from backend.lookup import PlayerIndex, fold_name, name_keys, name_splits, parse_name
+
+PLAYERS = [
+    {"firstName": "Mike", "lastName": "Williams", "position": "WR", "team": "LAC", "college": "Clemson"},
+    {"firstName": "Mike", "lastName": "Williams", "position": "WR", "team": "TB", "college": "Syracuse"},
+    {"firstName": "Michael", "lastName": "Thomas", "position": "WR", "team": "NO", "college": "Ohio State"},
+    {"firstName": "Michael", "lastName": "Thomas", "position": "S", "team": "NYG", "college": "Stanford"},
+    {"firstName": "Patrick", "lastName": "Mahomes", "position": "QB", "team": "KC", "college": "Texas Tech"},
+    {"firstName": "Patrick", "lastName": "Surtain", "position": "CB", "team": "DEN", "college": "Alabama"},
+    {"firstName": "Peyton", "lastName": "Manning", "position": "QB", "team": "", "college": "Tennessee"},
+    {"firstName": "Eli", "lastName": "Manning", "position": "QB", "team": "", "college": "Ole Miss"},
+    {"firstName": "Christian", "lastName": "McCaffrey", "position": "RB", "team": "SF", "college": "Stanford"},
+    {"firstName": "D'Andre", "lastName": "Swift", "position": "RB", "team": "CHI", "college": "Georgia"},
+    {"firstName": "Dé'Von", "lastName": "Achane", "position": "RB", "team": "MIA", "college": "Texas A&M"},
+    {"firstName": "Odell", "lastName": "Beckham Jr.", "position": "WR", "team": "MIA", "college": "LSU"},
+    {"firstName": "Gerald Dixon", "lastName": "Jr.", "position": "DT", "team": "DAL", "college": "South Carolina"},
+    {"firstName": "Amon-Ra St.", "lastName": "Brown", "position": "WR", "team": "DET", "college": "USC"},
+    {"firstName": "Billy Ray", "lastName": "Smith", "position": "LB", "team": "LAC", "college": "Arkansas"},
+    {"firstName": "Equanimeous", "lastName": "St. Brown", "position": "WR", "team": "CHI", "college": "Notre Dame"},
+    {"firstName": "Josh", "lastName": "Allen", "position": "C", "team": "ARI", "college": "Louisiana Tech"},
+    {"firstName": "Josh", "lastName": "Hines-Allen", "position": "LB", "team": "JAX", "college": "Kentucky"},
+    {"firstName": "Émile", "lastName": "Élie", "position": "K", "team": "NE", "college": "Laval"},
+]
+
+
+class TestPlayerIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up a game over a small catalog with tricky names."""
+        self.game = NFLGame(catalog=PlayerCatalog(PLAYERS))
+        self.index = self.game.catalog.index
+
+    def assertFinds(self, text, expected_id, strategy):
+        player_id, found_strategy = self.index.find(text.split())
+        self.assertEqual((player_id, found_strategy), (expected_id, strategy))
+
+    def test_exact_match_prefers_first(self):
+        """Test that duplicate names resolve to the first player in the catalog."""
+        self.assertFinds("mike WILLIAMS", 0, "exact")
+
+    def test_exact_match_with_team(self):
+        """Test that a trailing team code picks the matching duplicate."""
+        self.assertFinds("Mike Williams TB", 1, "exact_team")
+        self.assertFinds("Mike Williams NYJ", 0, "exact")
+
+    def test_nickname_match(self):
+        """Test that nicknames map to the formal first name."""
+        self.assertFinds("Mike Thomas", 2, "nickname")
+        self.assertFinds("Mike Thomas NYG", 3, "nickname")
+
+    def test_initial_match(self):
+        """Test that an initial only matches when it is unambiguous or a team is given."""
+        self.assertFinds("C McCaffrey", 8, "initial")
+        self.assertFinds("P Manning", 6, "initial")
+        self.assertFinds("M Thomas NYG", 3, "initial")
+        self.assertFinds("M Thomas DAL", None, None)
+
+    def test_prefix_match(self):
+        """Test that partial first names match in both directions."""
+        self.assertFinds("Pat Mahomes", 4, "prefix")
+        self.assertFinds("Christianson McCaffrey", 8, "prefix")
+        self.assertFinds("Pey Manning", 6, "prefix")
+        self.assertFinds("Pat Smith", None, None)
+
+    def test_prefix_needs_a_stored_first_name(self):
+        """Test that a record without a first name isn't matched by any typed first name."""
+        index = PlayerIndex([{"firstName": "", "lastName": "Anderson", "team": ""}])
+        self.assertEqual(index.find(["Qwerty", "Anderson"]), (None, None))
+
+    def test_folded_names_match(self):
+        """Test that accents, punctuation and suffixes don't stop a typed name from matching."""
+        self.assertFinds("DAndre Swift", 9, "exact")
+        self.assertFinds("d\u2019andre SWIFT", 9, "exact")
+        self.assertFinds("De'Von Achane", 10, "exact")
+        self.assertFinds("Devon Achane", 10, "exact")
+        self.assertFinds("Odell Beckham", 11, "exact")
+        self.assertFinds("Odell Beckham Jr.", 11, "exact")
+        self.assertFinds("Odell Beckham Jr MIA", 11, "exact_team")
+        self.assertFinds("Gerald Dixon", 12, "exact")
+        self.assertFinds("Gerald Dixon Jr.", 12, "exact")
+        self.assertFinds("G. Dixon", 12, "initial")
+        self.assertEqual(self.index.complete("d'and"), [9])
+
+    def test_name_keys(self):
+        """Test that names fold to casefolded, accent- and punctuation-free keys."""
+        self.assertEqual(fold_name("  Dé'Von "), "devon")
+        self.assertEqual(fold_name("Amon-Ra"), "amon ra")
+        self.assertEqual(fold_name("A.J."), "aj")
+        self.assertEqual(name_keys("Amon-Ra", "St. Brown"), ("amon ra", "st brown"))
+        self.assertEqual(name_keys("Odell", "Beckham Jr."), ("odell", "beckham"))
+        self.assertEqual(name_keys("Billy Ray Smith", "Jr."), ("billy ray", "smith"))
+        self.assertEqual(name_keys("Gates", "III"), ("gates", "iii"))
+        query = parse_name(["odell", "beckham", "jr.", "mia"])
+        self.assertEqual((query.words, query.full, query.team), (["odell", "beckham"], "odell beckham", "MIA"))
+        self.assertEqual(query.whole.full, "odell beckham jr mia")
+        self.assertIsNone(parse_name(["Odell", "Beckham", "Jr."]).whole)
+        query = parse_name(["Odell", "Beckham"])
+        self.assertIs(parse_name(query), query)
+
+    def test_multi_word_names(self):
+        """Test that names of three or more words match however the catalog splits them."""
+        self.assertFinds("Amon-Ra St. Brown", 13, "exact")
+        self.assertFinds("amon ra st brown", 13, "exact")
+        self.assertFinds("Amon-Ra St. Brown DET", 13, "exact_team")
+        self.assertFinds("Equanimeous St. Brown", 15, "exact")
+        self.assertFinds("Equanimeous St Brown CHI", 15, "exact_team")
+        self.assertFinds("Equ St. Brown", 15, "prefix")
+        self.assertFinds("Billy Ray Smith", 14, "exact")
+        self.assertFinds("B Smith LAC", 14, "initial")
+        self.assertFinds("Mike Williams TB", 1, "exact_team")
+        self.assertEqual(self.index.complete("amon ra"), [13])
+        self.assertEqual(self.index.suggest(["Amon-Ra", "St.", "Brwn"], "A"), [13])
+        self.game.next_required_letter = "A"
+        self.assertTrue(self.game.submit_answer("Amon-Ra St. Brown")["valid"])
+
+    def test_hyphenated_last_name(self):
+        """Test that a hyphenated last name isn't read as a first name plus another player's last name."""
+        self.assertFinds("Joshua Hines-Allen", 17, "prefix")
+        self.assertFinds("Josh Hines Allen", 17, "exact")
+        self.assertFinds("Joshua Allen", 16, "prefix")
+
+    def test_name_splits(self):
+        """Test that candidate splits try the typed first word first, then the shortest last name."""
+        self.assertEqual(name_splits(["amon", "ra", "st", "brown"]),
+                         [("amon", "ra st brown"), ("amon ra st", "brown"), ("amon ra", "st brown")])
+        self.assertEqual(name_splits(["josh", "allen"]), [("josh", "allen")])
+        self.assertEqual(name_splits(["tom"]), [])
+        self.assertEqual(name_splits(["a", "b", "c", "d", "e", "f"]), [])
+
+    def test_namesakes_use_precomputed_keys(self):
+        """Test that same-name checks and used checks work for catalog records and copies of them."""
+        players = self.game.players
+        self.assertEqual(self.game._find_players_with_same_name(players[0]), [players[0], players[1]])
+        self.assertEqual(self.game._find_players_with_same_name(dict(players[12])), [players[12]])
+        self.assertEqual(self.game._answer_for(players[1]), "Mike Williams TB")
+        self.game._mark_used(players[11], "player")
+        self.assertTrue(self.game._is_player_used(dict(players[11])))
+        self.assertFalse(self.game._is_player_used(players[10]))
+
+    def test_game_returns_catalog_player(self):
+        """Test that the game resolves IDs back to the shared player records."""
+        player = self.game._find_player_in_database(["Patrick", "Surtain"])
+        self.assertIs(player, self.game.players[5])
+        self.assertIsNone(self.game._find_player_in_database(["Nobody", "Here"]))
+
+    def test_did_you_mean(self):
+        """Test that misspelled names suggest the closest players for the required letter."""
+        self.game.next_required_letter = "P"
+        result = self.game.submit_answer("Patrik Mahomse")
+        self.assertEqual(result["error_type"], "not_found")
+        self.assertEqual(result["did_you_mean"], ["Patrick Mahomes"])
+        self.game.next_required_letter = "M"
+        self.assertEqual(self.game.submit_answer("Mike Wiliams")["did_you_mean"],
+                         ["Mike Williams LAC", "Mike Williams TB"])
+        self.assertEqual(self.game.submit_answer("Mxyz Wbcd")["did_you_mean"], [])
+
+    def test_suggestions_respect_team_and_used_players(self):
+        """Test that a team narrows namesakes and used players are never suggested."""
+        self.assertEqual(self.index.suggest(["Michael", "Tomas", "nyg"], "M"), [3])
+        self.game._mark_used(self.game.players[3], "player")
+        self.assertEqual(self.index.suggest(["Michael", "Tomas", "nyg"], "M", used_keys=self.game.used_keys), [2])
+        self.assertEqual(self.index.suggest(["Michael", "Tomas"], "M", max_distance=0), [])
+
+    def test_complete_prefix(self):
+        """Test that completion walks names in order and skips used players."""
+        self.assertEqual(self.index.complete("mi"), [2, 3, 0, 1])
+        self.assertEqual(self.index.complete("Michael  T", limit=1), [2])
+        self.game._mark_used(self.game.players[0], "player")
+        self.assertEqual(self.index.complete("mike", used_keys=self.game.used_keys), [1])
+        self.assertEqual(self.index.complete("zz"), [])
+
+    def test_game_suggest(self):
+        """Test that suggestions only complete names starting with the required letter."""
+        self.game.next_required_letter = "P"
+        self.assertEqual([entry["answer"] for entry in self.game.suggest("pat")],
+                         ["Patrick Mahomes", "Patrick Surtain"])
+        self.assertEqual(self.game.suggest("Mike"), [])
+        self.game.next_required_letter = "M"
+        self.assertEqual([entry["answer"] for entry in self.game.suggest("Mike W")],
+                         ["Mike Williams LAC", "Mike Williams TB"])
+
+    def test_accented_initials(self):
+        """Test that suggestions, letter checks and required letters agree on accented initials."""
+        self.assertIn(18, self.index.by_initial["E"])
+        self.game.next_required_letter = "E"
+        self.assertEqual([entry["answer"] for entry in self.game.suggest("emi")], ["Émile Élie"])
+        self.assertEqual([entry["answer"] for entry in self.game.suggest("Émi")], ["Émile Élie"])
+        result = self.game.submit_answer("Émile Élie")
+        self.assertTrue(result["valid"])
+        self.assertEqual(self.game.next_required_letter, "E")
+
+
+class TestEditDistance(unittest.TestCase):
+    def test_bounded_distance(self):
+        """Test that swaps count as one edit and distances past the limit stop early."""
+        self.assertEqual(edit_distance("bardy", "brady", 2), 1)
+        self.assertEqual(edit_distance("kitten", "sitting", 3), 3)
+        self.assertEqual(edit_distance("kitten", "sitting", 2), 3)
+        self.assertEqual(edit_distance("abcdef", "xyz", 2), 3)
+
+    def test_trigram_search_finds_swaps(self):
+        """Test that a swap of neighbouring letters, which changes four trigrams, is still found."""
+        index = TrigramIndex(["tom brady", "brett favre"])
+        self.assertEqual(index.search("tom brday", 1, 5), [(1, "tom brady")])
+        self.assertEqual(index.search("tmo brady", 1, 5), [(1, "tom brady")])
+        self.assertEqual(index.search("tom brdy", 1, 5), [(1, "tom brady")])
+        self.assertEqual(index.search("tmo brdya", 1, 5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
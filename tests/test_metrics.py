@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog import PlayerCatalog
+from backend.game import LOOKUPS, NFLGame
+from backend.metrics import Registry
+
+PLAYERS = [
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+]
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_and_gauge(self):
+        """Test that counters add up per label set and gauges can be read at render time."""
+        requests = self.registry.counter('requests_total', 'Requests', ('route',))
+        requests.inc('/a')
+        requests.inc('/a', amount=2)
+        requests.inc('/b "quoted"')
+        self.registry.gauge('players', 'Players', function=lambda: 42)
+        self.registry.gauge('missing', 'Not known yet', function=lambda: None)
+        text = self.registry.render()
+        self.assertIn('# TYPE requests_total counter', text)
+        self.assertIn('requests_total{route="/a"} 3', text)
+        self.assertIn('requests_total{route="/b \\"quoted\\""} 1', text)
+        self.assertIn('players 42', text)
+        self.assertNotIn('\nmissing ', text)
+
+    def test_histogram_buckets(self):
+        """Test that histogram buckets are cumulative and end with +Inf, sum and count."""
+        latency = self.registry.histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value, '/a')
+        lines = self.registry.render().splitlines()
+        self.assertIn('latency_seconds_bucket{route="/a",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{route="/a",le="1.0"} 2', lines)
+        self.assertIn('latency_seconds_bucket{route="/a",le="+Inf"} 3', lines)
+        self.assertIn('latency_seconds_sum{route="/a"} 5.55', lines)
+        self.assertIn('latency_seconds_count{route="/a"} 3', lines)
+        self.assertEqual(latency.count('/a'), 3)
+
+    def test_same_name_reuses_metric(self):
+        """Test that registering a metric twice returns the first one."""
+        first = self.registry.counter('hits_total', 'Hits')
+        self.assertIs(self.registry.counter('hits_total', 'Hits'), first)
+
+    def test_lookup_strategies_are_counted(self):
+        """Test that game lookups count the strategy that matched."""
+        game = NFLGame(catalog=PlayerCatalog(PLAYERS))
+        exact, missing = LOOKUPS.value("exact"), LOOKUPS.value("not_found")
+        game._find_player_in_database(["Tom", "Brady"])
+        game._find_player_in_database(["Nobody", "Here"])
+        self.assertEqual(LOOKUPS.value("exact"), exact + 1)
+        self.assertEqual(LOOKUPS.value("not_found"), missing + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
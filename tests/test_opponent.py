@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog import PlayerCatalog
+from backend.game import NFLGame
+from backend.opponent import LookaheadSearch
+
+# From A, the computer can move to B, where the fewest players are left, but
+# every B player leads to Z, which has none, so the human's answer would leave
+# the computer stuck. Moving to C instead keeps the chain going.
+PLAYERS = [
+    {"firstName": "Adam", "lastName": "Bell", "position": "WR", "team": "KC", "college": "Iowa"},
+    {"firstName": "Al", "lastName": "Cole", "position": "WR", "team": "KC", "college": "Iowa"},
+    {"firstName": "Bob", "lastName": "Zed", "position": "QB", "team": "NE", "college": "Duke"},
+    {"firstName": "Bill", "lastName": "Zane", "position": "QB", "team": "NE", "college": "Duke"},
+    {"firstName": "Carl", "lastName": "Dunn", "position": "RB", "team": "GB", "college": "Utah"},
+    {"firstName": "Cam", "lastName": "Dell", "position": "RB", "team": "GB", "college": "Utah"},
+    {"firstName": "Cy", "lastName": "Dorn", "position": "RB", "team": "GB", "college": "Utah"},
+    {"firstName": "Dan", "lastName": "Cook", "position": "TE", "team": "SF", "college": "Rice"},
+    {"firstName": "Dave", "lastName": "Cass", "position": "TE", "team": "SF", "college": "Rice"},
+    {"firstName": "Dom", "lastName": "Cruz", "position": "TE", "team": "SF", "college": "Rice"},
+]
+
+
+class TestLookaheadSearch(unittest.TestCase):
+    def setUp(self):
+        """Set up a vs_computer game over the trap catalog."""
+        self.catalog = PlayerCatalog(PLAYERS)
+        self.game = NFLGame(game_mode="vs_computer", catalog=self.catalog)
+        self.game.next_required_letter = "A"
+
+    def test_medium_leaves_fewest_options(self):
+        """Test that one move of look-ahead sends the human to the letter with fewest players."""
+        self.assertEqual(LookaheadSearch(self.game.chain, 1).choose("A"), "B")
+
+    def test_hard_avoids_trap(self):
+        """Test that a deeper search sees the human's reply dead-ends the computer."""
+        search = LookaheadSearch(self.game.chain, 6)
+        self.assertEqual(search.choose("A"), "C")
+        self.assertGreater(search.nodes, 0)
+        self.assertGreaterEqual(search.depth_reached, 2)
+
+    def test_budget_falls_back_to_ordering(self):
+        """Test that a search out of time keeps the best move of the last finished pass."""
+        ticks = iter(range(0, 10 ** 6, 10))
+        search = LookaheadSearch(self.game.chain, 6, budget=1, clock=lambda: next(ticks))
+        self.assertEqual(search.choose("A"), "B")
+        self.assertEqual(search.depth_reached, 1)
+
+    def test_no_moves(self):
+        """Test that a letter without unused players has no move."""
+        self.assertIsNone(LookaheadSearch(self.game.chain, 6).choose("Z"))
+
+    def test_computer_turn_by_difficulty(self):
+        """Test that the difficulty picks the computer's player and survives a snapshot."""
+        self.game.difficulty = "hard"
+        result = self.game.computer_turn()
+        self.assertTrue(result["success"])
+        self.assertEqual(self.game.current_player["lastName"], "Cole")
+
+        restored = NFLGame.from_dict(self.game.to_dict(), catalog=self.catalog)
+        self.assertEqual(restored.difficulty, "hard")
+        restored.next_required_letter = "A"
+        restored.difficulty = "medium"
+        restored.computer_turn()
+        self.assertEqual(restored.current_player["lastName"], "Bell")
+
+
+if __name__ == "__main__":
+    unittest.main()
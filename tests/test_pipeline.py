@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.columnar import ColumnarPlayers
+from backend.pipeline import build_catalog, normalize_row
+
+PLAYERS_CSV = """display_name,first_name,last_name,birth_date,college_name,position,jersey_number,height,weight,team_abbr,draft_club,headshot,draftround
+Tom Brady,Tom,Brady,1977-08-03,Michigan,QB,12,76,225,TB,NE,,6
+Amon-Ra St. Brown,Amon-Ra,St. Brown,1999-10-24,USC,WR,14,72,202,DET,DET,,4
+"""
+
+OLD_PLAYERS_CSV = """name,first_name,last_name,birth_city,birth_state,birth_country,birth_date,college,draft_team,draft_round,draft_pick,draft_year,position,height,weight,death_date,death_city,death_state,death_country,year_start,year_end
+Tom Brady,Tom,Brady,,,,1977-08-03,Michigan,,,,,QB,6-4,225,,,,,2000,2022
+Faye  Abbott,Faye,Abbott,,,,1895-08-16,Syracuse,,,,,FB,,182,,,,,1921,1929
+ Gates,,,,,,,,,,,,G,,,,,,,1920,1920
+,,,,,,,,,,,,,,,,,,,,
+"""
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.directory, 'backups')
+        os.makedirs(self.source_dir)
+        self.output = os.path.join(self.directory, 'players.json')
+        self.write_source('players.csv', PLAYERS_CSV)
+        self.write_source('players_old.csv', OLD_PLAYERS_CSV)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_source(self, filename, text):
+        with open(os.path.join(self.source_dir, filename), 'w') as file:
+            file.write(text)
+
+    def build(self, **kwargs):
+        return build_catalog(self.source_dir, self.output, workers=0, **kwargs)
+
+    def read_output(self):
+        with open(self.output) as file:
+            return json.load(file)
+
+    def test_normalize_row(self):
+        """Test that rows are cleaned and split into first and last name."""
+        positions = {"display_name": 0, "birth_date": 1, "team": 2}
+        key, record = normalize_row([" Amon-Ra  St. Brown ", "1999-10-24", "DET"], positions)
+        self.assertEqual(key, "Amon-Ra St. Brown\x1f1999-10-24")
+        self.assertEqual(record, {"firstName": "Amon-Ra St.", "lastName": "Brown", "position": "",
+                                  "team": "DET", "college": ""})
+        self.assertIsNone(normalize_row([" Gates", "", ""], positions))
+        self.assertEqual(normalize_row(["'Omar Ellison", "", "lac"], positions)[1]["firstName"], "Omar")
+        self.assertIsNone(normalize_row(["", "", ""], positions))
+
+    def test_merges_sources_first_row_wins(self):
+        """Test that both sources are merged, deduplicated and written as JSON and columnar."""
+        report = self.build()
+        players = self.read_output()
+        self.assertEqual([player["lastName"] for player in players], ["Brady", "Brown", "Abbott"])
+        self.assertEqual(players[0]["team"], "TB")  # from players.csv, not the old list
+        self.assertEqual(report["duplicates"], 1)
+        self.assertEqual(report["sources"]["players_old"]["rejected"], 2)
+        self.assertTrue(report["written"])
+        columnar = ColumnarPlayers(os.path.join(self.directory, 'players.bin'))
+        self.assertEqual([dict(player) for player in columnar], players)
+
+    def test_unchanged_sources_are_skipped(self):
+        """Test that a second run with the same inputs reads nothing and writes nothing."""
+        self.build()
+        mtime = os.path.getmtime(self.output)
+        report = self.build()
+        self.assertFalse(report["written"])
+        self.assertEqual(report["players"], 3)
+        self.assertEqual({entry["status"] for entry in report["sources"].values()}, {"unchanged"})
+        self.assertEqual(os.path.getmtime(self.output), mtime)
+
+    def test_only_changed_rows_are_normalized(self):
+        """Test that editing one row reprocesses just that row and updates the catalog."""
+        self.build()
+        self.write_source('players.csv', PLAYERS_CSV.replace("USC,WR", "USC,TE"))
+        report = self.build()
+        self.assertEqual(report["sources"]["players"]["status"], "updated")
+        self.assertEqual(report["sources"]["players"]["normalized"], 1)
+        self.assertEqual(report["sources"]["players"]["reused"], 1)
+        self.assertEqual(report["sources"]["players_old"]["status"], "unchanged")
+        self.assertTrue(report["written"])
+        self.assertEqual(self.read_output()[1]["position"], "TE")
+
+    def test_missing_source_and_force(self):
+        """Test that a missing source is reported and force rebuilds everything."""
+        os.remove(os.path.join(self.source_dir, 'players_old.csv'))
+        report = self.build()
+        self.assertEqual(report["sources"]["players_old"], {"status": "missing"})
+        self.assertEqual(report["players"], 2)
+        report = self.build(force=True)
+        self.assertTrue(report["written"])
+        self.assertEqual(report["sources"]["players"]["normalized"], 2)
+
+    def test_process_pool(self):
+        """Test that normalizing chunks in worker processes gives the same catalog."""
+        build_catalog(self.source_dir, self.output, workers=2, chunk_rows=1)
+        self.assertEqual(len(self.read_output()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
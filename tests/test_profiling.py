@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog import PlayerCatalog
+from backend.game import NFLGame
+from backend.profiling import RequestProfiler
+
+PLAYERS = [
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Brett", "lastName": "Favre", "position": "QB", "team": "GB", "college": "Southern Miss"},
+]
+
+
+def busy_answers(seconds):
+    """Submit answers for a while so a profiler has something to see."""
+    game = NFLGame(catalog=PlayerCatalog(PLAYERS))
+    game.start_game()
+    stop_at = time.perf_counter() + seconds
+    while time.perf_counter() < stop_at:
+        game.submit_answer("Nobody Here")
+
+
+class TestRequestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_profiler(self, **kwargs):
+        return RequestProfiler(clock=lambda: self.now, **kwargs)
+
+    def test_wants(self):
+        """Test that profiling is off by default and a matching token turns it on per request."""
+        self.assertFalse(self.make_profiler().enabled)
+        profiler = self.make_profiler(token="secret")
+        self.assertTrue(profiler.enabled)
+        self.assertFalse(profiler.wants())
+        self.assertFalse(profiler.wants("wrong"))
+        self.assertTrue(profiler.wants("secret"))
+        self.assertTrue(self.make_profiler(mode="sample").wants())
+        with self.assertRaises(ValueError):
+            RequestProfiler(mode="always")
+
+    def test_cprofile_window(self):
+        """Test that cProfile results are merged per window and written when the window ends."""
+        profiler = self.make_profiler(mode="cprofile", window=60, output_dir=self.tmpdir.name)
+        for _ in range(2):
+            handle = profiler.start("/submit_answer")
+            busy_answers(0.01)
+            profiler.stop(handle)
+        self.assertEqual(profiler.report()["requests"], 0)
+
+        self.now += 61
+        profiler.stop(profiler.start("/game_state"))
+        report = profiler.report()
+        self.assertEqual(report["requests"], 2)
+        self.assertIn("submit_answer", report["pstats"])
+        self.assertEqual([name.endswith('.prof') for name in os.listdir(self.tmpdir.name)], [True])
+
+    def test_sampled_stacks(self):
+        """Test that sampling records collapsed stacks under the request's route."""
+        profiler = self.make_profiler(mode="sample", interval=0.001)
+        handle = profiler.start("/submit_answer")
+        busy_answers(0.1)
+        profiler.stop(handle)
+        report = profiler.report(flush=True)
+        self.assertEqual(report["requests"], 1)
+        lines = report["collapsed"].splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(all(line.startswith("/submit_answer;") for line in lines))
+        self.assertTrue(any("game.py:submit_answer" in line for line in lines))
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog import PlayerCatalog
+from backend.simulation import SimulationStats, play_chain, play_game, run_simulation
+
+# Every chain runs T -> B -> F -> T until the players run out
+PLAYERS = [
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Brett", "lastName": "Favre", "position": "QB", "team": "GB", "college": "Southern Miss"},
+    {"firstName": "Fran", "lastName": "Tarkenton", "position": "QB", "team": "MIN", "college": "Georgia"},
+]
+
+
+class TestSimulation(unittest.TestCase):
+    def setUp(self):
+        self.catalog = PlayerCatalog(PLAYERS)
+
+    def test_solo_game_uses_every_player(self):
+        """Test that a solo game names every player, then loses its lives at the dead end."""
+        stats = SimulationStats()
+        game = play_game(self.catalog, stats, mode="solo")
+        self.assertTrue(game.game_over)
+        self.assertEqual(stats.chain_lengths, {2: 1})
+        self.assertEqual(stats.moves, 5)
+        self.assertEqual(sum(stats.dead_ends.values()), 3)
+
+    def test_vs_computer_and_move_cap(self):
+        """Test that computer-vs-computer games play out and long games stop at the cap."""
+        stats = SimulationStats()
+        play_game(self.catalog, stats, mode="vs_computer", difficulties=("hard", "easy"))
+        play_game(self.catalog, stats, mode="vs_computer", max_moves=1)
+        self.assertEqual(stats.games, 2)
+        self.assertEqual(stats.capped, 1)
+
+    def test_chain_engine_matches_game_engine(self):
+        """Test that games played on player IDs alone end like the ones played through NFLGame."""
+        for mode, difficulties in (("solo", ("easy", "easy")), ("vs_computer", ("hard", "medium"))):
+            chain_stats, game_stats = SimulationStats(), SimulationStats()
+            play_chain(self.catalog, chain_stats, mode, difficulties)
+            play_game(self.catalog, game_stats, mode, difficulties)
+            self.assertEqual(chain_stats.chain_lengths, game_stats.chain_lengths)
+            self.assertEqual(chain_stats.moves, game_stats.moves)
+            self.assertEqual(sum(chain_stats.dead_ends.values()), sum(game_stats.dead_ends.values()))
+
+    def test_run_merges_batches(self):
+        """Test that batches from the pool and inline runs add up to the same report."""
+        for workers, engine in ((0, "chain"), (2, "chain"), (0, "game")):
+            stats, elapsed = run_simulation(1200, workers=workers, catalog=self.catalog, engine=engine)
+            report = stats.report(elapsed)
+            self.assertEqual(report["games"], 1200)
+            self.assertEqual(report["chain_length"]["p50"], 2)
+            self.assertEqual(sum(stats.dead_ends.values()), 3 * 1200)
+            self.assertTrue(all(0 < rate < 1 for rate in report["dead_end_rate"].values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
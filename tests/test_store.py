@@ -0,0 +1,438 @@
+import unittest
+import sys
+import os
+import socketserver
+import tempfile
+import threading
+import time
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog import PlayerCatalog
+from backend.events import GameEventBus
+from backend.game import NFLGame
+from backend.store import MemoryGameStore, RedisGameStore, SQLiteGameStore, create_game_store
+
+PLAYERS = [
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Brett", "lastName": "Favre", "position": "QB", "team": "GB", "college": "Southern Miss"},
+    {"firstName": "Fran", "lastName": "Tarkenton", "position": "QB", "team": "MIN", "college": "Georgia"},
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryGameStore(unittest.TestCase):
+    def setUp(self):
+        """Set up a small store driven by a fake clock."""
+        self.clock = FakeClock()
+        self.store = MemoryGameStore(max_games=2, idle_ttl=60, clock=self.clock)
+
+    def test_idle_games_expire(self):
+        """Test that games untouched for longer than the TTL are evicted."""
+        self.store.put("a", "game-a")
+        self.clock.now = 59
+        self.assertEqual(self.store.get("a"), "game-a")
+        self.clock.now = 118
+        self.assertEqual(self.store.get("a"), "game-a")
+        self.clock.now = 178
+        self.assertIsNone(self.store.get("a"))
+        self.assertTrue(self.store.was_evicted("a"))
+        self.assertFalse(self.store.was_evicted("never-started"))
+        self.assertEqual(self.store.stats()["evictions"], {"idle": 1, "capacity": 0})
+
+    def test_least_recently_used_game_is_evicted_at_capacity(self):
+        """Test that a full store evicts the game accessed longest ago."""
+        self.store.put("a", "game-a")
+        self.store.put("b", "game-b")
+        self.store.get("a")
+        self.store.put("c", "game-c")
+        self.assertIsNone(self.store.get("b"))
+        self.assertEqual(self.store.get("a"), "game-a")
+        self.assertEqual(self.store.get("c"), "game-c")
+        stats = self.store.stats()
+        self.assertEqual(stats["live_games"], 2)
+        self.assertEqual(stats["evictions"]["capacity"], 1)
+
+    def test_restarting_clears_eviction(self):
+        """Test that starting a new game for an evicted session makes it live again."""
+        self.store.put("a", "game-a")
+        self.clock.now = 61
+        self.assertIsNone(self.store.get("a"))
+        self.store.put("a", "game-a2")
+        self.assertFalse(self.store.was_evicted("a"))
+        self.assertEqual(self.store.get("a"), "game-a2")
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough of the Redis protocol for RedisGameStore."""
+
+    def handle(self):
+        server = self.server
+        watched = {}
+        queued = None
+        while True:
+            command = self._read_command()
+            if command is None:
+                return
+            name = command[0].upper()
+            if name == 'MULTI':
+                queued = []
+                self._reply('OK')
+            elif name == 'EXEC':
+                with server.lock:
+                    if any(server.version(key) != version for key, version in watched.items()):
+                        self.wfile.write(b"*-1\r\n")
+                    else:
+                        replies = [server.run(queued_command) for queued_command in queued]
+                        self.wfile.write(f"*{len(replies)}\r\n".encode())
+                        for reply in replies:
+                            self._reply(reply)
+                watched, queued = {}, None
+            elif queued is not None:
+                queued.append(command)
+                self._reply('QUEUED')
+            elif name == 'WATCH':
+                with server.lock:
+                    for key in command[1:]:
+                        # Watching a key twice keeps the first version, as in Redis
+                        watched.setdefault(key, server.version(key))
+                self._reply('OK')
+            elif name == 'UNWATCH':
+                watched = {}
+                self._reply('OK')
+            elif name == 'XREAD':
+                self._reply(server.read_stream(command))
+            else:
+                with server.lock:
+                    self._reply(server.run(command))
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2].decode())
+        return args
+
+    def _reply(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(value, int):
+            self.wfile.write(f":{value}\r\n".encode())
+        elif isinstance(value, list):
+            self.wfile.write(f"*{len(value)}\r\n".encode())
+            for item in value:
+                self._reply(item)
+        elif value in ('OK', 'QUEUED'):
+            self.wfile.write(f"+{value}\r\n".encode())
+        else:
+            data = value.encode()
+            self.wfile.write(f"${len(data)}\r\n".encode() + data + b"\r\n")
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeRedisHandler)
+        self.lock = threading.Lock()
+        self.data = {}      # key -> (value, expires_at)
+        self.versions = {}  # key -> number of writes
+        self.streams = {}   # key -> [(entry ID, fields)]
+        self.stream_added = threading.Condition(self.lock)
+        self.last_entry = (0, 0)
+
+    def version(self, key):
+        self._expire(key)
+        return self.versions.get(key, 0)
+
+    def _expire(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.time():
+            self._write(key, None)
+
+    def _write(self, key, entry):
+        if entry is None:
+            self.data.pop(key, None)
+        else:
+            self.data[key] = entry
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def run(self, command):
+        name, args = command[0].upper(), command[1:]
+        for key in args[:1]:
+            self._expire(key)
+        if name == 'GET':
+            entry = self.data.get(args[0])
+            return entry[0] if entry else None
+        if name == 'SET':
+            expires_at = time.time() + int(args[3]) if len(args) > 3 else None
+            self._write(args[0], (args[1], expires_at))
+            return 'OK'
+        if name == 'EXPIRE':
+            entry = self.data.get(args[0])
+            if entry:
+                self.data[args[0]] = (entry[0], time.time() + int(args[1]))
+            return int(entry is not None)
+        if name == 'EXISTS':
+            return int(args[0] in self.data)
+        if name == 'DEL':
+            deleted = [key for key in args if key in self.data]
+            for key in deleted:
+                self._write(key, None)
+            return len(deleted)
+        if name == 'KEYS':
+            prefix = args[0].rstrip('*')
+            return [key for key in self.data if key.startswith(prefix)]
+        if name == 'XADD':
+            ms = int(time.time() * 1000)
+            self.last_entry = (ms, 0) if ms > self.last_entry[0] else (self.last_entry[0], self.last_entry[1] + 1)
+            entry_id = '%d-%d' % self.last_entry
+            self.streams.setdefault(args[0], []).append((entry_id, args[args.index('*') + 1:]))
+            self.stream_added.notify_all()
+            return entry_id
+        if name == 'XREVRANGE':
+            entries = self.streams.get(args[0], [])[::-1][:int(args[4])]
+            return [[entry_id, fields] for entry_id, fields in entries]
+        raise ValueError(f"Unsupported command {name}")
+
+    def _entries_after(self, key, after):
+        return [[entry_id, fields] for entry_id, fields in self.streams.get(key, [])
+                if tuple(map(int, entry_id.split('-'))) > after]
+
+    def read_stream(self, command):
+        """XREAD COUNT n BLOCK ms STREAMS key id, waiting up to ms for entries after id."""
+        key, after = command[-2], tuple(map(int, command[-1].split('-')))
+        with self.stream_added:
+            self.stream_added.wait_for(lambda: self._entries_after(key, after), int(command[4]) / 1000)
+            entries = self._entries_after(key, after)
+        return [[key, entries]] if entries else None
+
+
+class SharedStoreTests:
+    """Tests every backend shared between workers must pass."""
+
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.catalog = PlayerCatalog(PLAYERS)
+        self.store = self.make_store()
+        self.game = NFLGame(catalog=self.catalog)
+        self.game.start_game()
+
+    def test_round_trip(self):
+        """Test that a game stored by one store instance is visible to another."""
+        self.store.put("a", self.game)
+        other = self.make_store()
+        restored = other.get("a")
+        self.assertEqual(restored.get_game_state(), self.game.get_game_state())
+        self.assertIsNone(other.get("missing"))
+        self.assertFalse(other.was_evicted("missing"))
+
+    def test_update_persists(self):
+        """Test that an update is applied and written back."""
+        self.store.put("a", self.game)
+        game, result = self.store.update("a", lambda game: game.timer_expired())
+        self.assertEqual(result["lives"], 2)
+        self.assertEqual(self.make_store().get("a").lives, 2)
+        self.assertEqual(self.store.update("missing", lambda game: game.timer_expired()), (None, None))
+
+    def test_unchanged_game_is_not_written(self):
+        """Test that an update that leaves state_version alone, like a poll, writes nothing."""
+        self.store.put("a", self.game)
+        saves = []
+        save = self.store._save
+        self.store._save = lambda *args: saves.append(args) or save(*args)
+        game, state = self.store.update("a", lambda game: game.get_game_state())
+        self.assertEqual(state["lives"], 3)
+        self.assertEqual(saves, [])
+        self.store.update("a", lambda game: game.lose_life())
+        self.assertEqual(len(saves), 1)
+        self.assertEqual(self.make_store().get("a").lives, 2)
+
+    def test_concurrent_updates_do_not_lose_writes(self):
+        """Test that simultaneous updates from different workers are all applied."""
+        self.store.put("a", self.game)
+        stores = [self.make_store() for _ in range(4)]
+        barrier = threading.Barrier(len(stores))
+
+        def lose_life(store):
+            barrier.wait()
+            store.update("a", lambda game: game.lose_life())
+
+        threads = [threading.Thread(target=lose_life, args=(store,)) for store in stores]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.store.get("a").lives, -1)
+
+    def test_conflicting_write_retries(self):
+        """Test that an update retries from the latest snapshot after a conflict."""
+        self.store.put("a", self.game)
+        other = self.make_store()
+        calls = []
+
+        def lose_life(game):
+            if not calls:
+                other.update("a", lambda game: game.lose_life())
+            calls.append(game.lives)
+            game.lose_life()
+
+        self.store.update("a", lose_life)
+        self.assertEqual(calls, [3, 2])
+        self.assertEqual(self.store.get("a").lives, 1)
+        self.assertEqual(self.store.conflicts, 1)
+
+    def test_events_reach_other_workers(self):
+        """Test that an event published by one worker reaches every worker's bus under the same ID."""
+        buses = [GameEventBus(relay=store.event_relay()) for store in (self.store, self.make_store())]
+        try:
+            woken = [threading.Event() for _ in buses]
+            for bus, wake in zip(buses, woken):
+                bus.subscribe("a", wake.set)
+            start = buses[1].last_id("a")
+            event_id = buses[0].publish("a", "life_lost", {"lives": 2})
+            for bus, wake in zip(buses, woken):
+                self.assertTrue(wake.wait(5))
+                self.assertEqual(bus.since("a", start), ([(event_id, "life_lost", {"lives": 2})], True))
+
+            # A worker that starts listening later can't replay the event, so it asks for a resync
+            late = GameEventBus(relay=self.make_store().event_relay())
+            buses.append(late)
+            late.subscribe("a", lambda: None)
+            self.assertEqual(late.since("a", start), ([], False))
+            self.assertEqual(late.since("a", late.last_id("a")), ([], True))
+        finally:
+            for bus in buses:
+                bus.relay.stop()
+
+
+class TestSQLiteGameStore(SharedStoreTests, unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'games.db')
+        self.clock = FakeClock()
+        super().setUp()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_store(self):
+        return SQLiteGameStore(self.path, max_games=2, idle_ttl=60, clock=self.clock,
+                               catalog_provider=lambda: self.catalog)
+
+    def test_idle_and_capacity_eviction(self):
+        """Test that idle games expire and the oldest game makes room for a new one."""
+        self.store.put("a", self.game)
+        self.clock.now = 61
+        self.assertIsNone(self.store.get("a"))
+        self.assertTrue(self.store.was_evicted("a"))
+
+        self.store.put("b", self.game)
+        self.clock.now = 62
+        self.store.put("c", self.game)
+        self.clock.now = 63
+        self.store.put("d", self.game)
+        self.assertIsNone(self.store.get("b"))
+        self.assertTrue(self.store.was_evicted("b"))
+        self.assertIsNotNone(self.store.get("d"))
+        self.assertEqual(self.store.stats()["live_games"], 2)
+
+    def test_least_recently_used_game_is_evicted_at_capacity(self):
+        """Test that a full store evicts the game accessed longest ago."""
+        self.store.put("a", self.game)
+        self.clock.now = 1
+        self.store.put("b", self.game)
+        self.clock.now = 2
+        self.store.get("a")
+        self.clock.now = 3
+        self.store.put("c", self.game)
+        self.assertIsNone(self.store.get("b"))
+        self.assertTrue(self.store.was_evicted("b"))
+        self.assertIsNotNone(self.store.get("a"))
+        self.assertIsNotNone(self.store.get("c"))
+        self.assertEqual(self.store.stats()["live_games"], 2)
+
+    def test_created_from_url(self):
+        """Test that a sqlite:// URL creates a SQLite store."""
+        store = create_game_store(f"sqlite:///{self.path}")
+        self.assertIsInstance(store, SQLiteGameStore)
+        self.assertEqual(store.path, self.path)
+
+
+class TestRedisGameStore(SharedStoreTests, unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeRedisServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        with self.server.lock:
+            self.server.data.clear()
+            self.server.streams.clear()
+        super().setUp()
+
+    def make_store(self):
+        host, port = self.server.server_address
+        return RedisGameStore(host, port, idle_ttl=60, catalog_provider=lambda: self.catalog)
+
+    def test_deleted_game_is_reported_expired(self):
+        """Test that a game whose key expired is reported as evicted."""
+        self.store.put("a", self.game)
+        with self.server.lock:
+            self.server.run(['DEL', self.store._key("a")])
+        self.assertIsNone(self.store.get("a"))
+        self.assertTrue(self.store.was_evicted("a"))
+
+    def test_dropped_connection_inside_update(self):
+        """Test that a connection lost between WATCH and EXEC fails the update instead of writing unwatched."""
+        self.store.put("a", self.game)
+
+        def drop_connection(game):
+            self.store._local.connection.close()
+            game.lose_life()
+
+        with self.assertRaises(OSError):
+            self.store.update("a", drop_connection)
+        self.assertEqual(self.store.get("a").lives, 3)
+
+        # A connection dropped while idle is replaced, and watched again, by the next update
+        self.store._local.connection.close()
+        self.store.update("a", lambda game: game.lose_life())
+        self.assertEqual(self.store.get("a").lives, 2)
+
+    def test_catalog_mismatch_releases_watch(self):
+        """Test that a game dropped for a catalog mismatch doesn't leave its key watched."""
+        self.store.put("a", self.game)
+        self.catalog = PlayerCatalog(PLAYERS[:2])
+        self.assertEqual(self.store.update("a", lambda game: game.lose_life()), (None, None))
+        self.assertIsNone(self.make_store().get("a"))
+
+        game = NFLGame(catalog=self.catalog)
+        game.start_game()
+        self.store.put("a", game)
+        self.store.update("a", lambda game: game.lose_life())
+        self.assertEqual(self.store.get("a").lives, 2)
+        self.assertEqual(self.store.conflicts, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the backend module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.catalog import PlayerCatalog
+from backend.game import NFLGame
+from backend.store import MemoryGameStore
+from backend.timers import TurnTimerScheduler
+
+PLAYERS = [
+    {"firstName": "Tom", "lastName": "Brady", "position": "QB", "team": "TB", "college": "Michigan"},
+    {"firstName": "Brett", "lastName": "Favre", "position": "QB", "team": "GB", "college": "Southern Miss"},
+    {"firstName": "Fran", "lastName": "Tarkenton", "position": "QB", "team": "MIN", "college": "Georgia"},
+]
+
+
+class TestTurnTimer(unittest.TestCase):
+    def setUp(self):
+        """Start a game whose turn times out at a known deadline."""
+        self.game = NFLGame(catalog=PlayerCatalog(PLAYERS))
+        self.game.start_game()
+        self.deadline = self.game.turn_deadline
+
+    def test_turn_expires_lazily(self):
+        """Test that a passed deadline costs a life before the game state is read."""
+        self.assertIsNone(self.game.expire_turns(self.deadline - 1))
+        result = self.game.expire_turns(self.deadline)
+        self.assertEqual(result["error_type"], "timeout")
+        self.assertEqual(self.game.lives, 2)
+        self.assertEqual(self.game.turn_deadline, self.deadline + NFLGame.TURN_SECONDS)
+
+    def test_missed_turns_all_count(self):
+        """Test that an abandoned game loses a life per missed turn and ends."""
+        self.game.expire_turns(self.deadline + 10 * NFLGame.TURN_SECONDS)
+        self.assertTrue(self.game.game_over)
+        self.assertEqual(self.game.lives, 0)
+        self.assertIsNone(self.game.turn_deadline)
+
+    def test_client_timeout_is_not_applied_twice(self):
+        """Test that the client endpoint reports a timeout the server already applied."""
+        self.game.expire_turns(self.deadline)
+        result = self.game.timer_expired(self.deadline + 1)
+        self.assertEqual(result["error_type"], "timeout")
+        self.assertEqual(self.game.lives, 2)
+
+    def test_deadline_survives_snapshot(self):
+        """Test that a restored game keeps the server's deadline."""
+        restored = NFLGame.from_dict(self.game.to_dict(), catalog=self.game.catalog)
+        self.assertEqual(restored.turn_deadline, self.deadline)
+        restored.expire_turns(self.deadline)
+        self.assertEqual(restored.lives, 2)
+
+
+class TestTurnTimerScheduler(unittest.TestCase):
+    def setUp(self):
+        """Store a game and schedule it without starting the sweeper thread."""
+        self.store = MemoryGameStore()
+        self.scheduler = TurnTimerScheduler(self.store)
+        self.scheduler._ensure_thread = lambda: None
+        self.game = NFLGame(catalog=PlayerCatalog(PLAYERS))
+        self.game.start_game()
+        self.store.put("s1", self.game)
+        self.scheduler.schedule_game("s1", self.game)
+
+    def test_sweep_applies_timeout_and_reschedules(self):
+        """Test that a due game loses a life and is scheduled for its next turn."""
+        deadline = self.game.turn_deadline
+        self.assertEqual(self.scheduler.run_pending(deadline - 1), 0)
+        self.assertEqual(self.scheduler.run_pending(deadline), 1)
+        self.assertEqual(self.store.get("s1").lives, 2)
+        self.assertEqual(self.scheduler._deadlines["s1"], deadline + NFLGame.TURN_SECONDS)
+
+    def test_rescheduled_game_is_not_swept_early(self):
+        """Test that an answered turn replaces the old deadline in the heap."""
+        deadline = self.game.turn_deadline
+        self.scheduler.schedule("s1", deadline + 60)
+        self.assertEqual(self.scheduler.run_pending(deadline), 0)
+        self.assertEqual(self.store.get("s1").lives, 3)
+        self.assertEqual(len(self.scheduler), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()